@@ -0,0 +1,131 @@
+"""
+Benchmark de regresión del escritor de partes de make-plaintext.
+
+Genera un archivo sintético de muchas líneas, ejecuta make-plaintext.py en un
+proceso hijo y mide el tiempo y el pico de memoria (RSS) con `os.wait4`. Para
+comparar, ejecuta también el algoritmo anterior (todo en memoria y con
+`lines[available_lines:]` en cada vuelta) sobre un archivo más pequeño, ya
+que su coste es cuadrático.
+
+Uso:
+    python bench-plaintext.py [--lines 10000000] [--legacy-lines 1000000]
+                              [--max-rss-mb N]
+
+Con `--max-rss-mb` el script termina con error si la versión actual supera
+ese pico de memoria.
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+from typing import Dict
+
+from maketools.profiling import run_child
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_synthetic_file(directory: str, lines: int) -> str:
+    """Crea `directory/big.txt` con `lines` líneas."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, 'big.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        block = 10000
+        for start in range(0, lines, block):
+            f.write(''.join(f"line {i} lorem ipsum\n" for i in range(start, min(start + block, lines))))
+    return path
+
+
+def legacy_process(directory: str, max_lines: int = 2000):
+    """El algoritmo anterior de make-plaintext.process_directory, sin caché."""
+    file_counter = 1
+    current_lines = 0
+    buffer = []
+
+    def flush():
+        nonlocal file_counter
+        with open(f"legacy_{file_counter}.txt", 'w', encoding='utf-8') as out:
+            for item in buffer:
+                info = json.loads(item['info'])
+                info['index'] = item['index']
+                out.write(f'"""{json.dumps(info, ensure_ascii=False)}"""\n\n')
+                out.write(item['content'])
+        file_counter += 1
+
+    for name in sorted(os.listdir(directory)):
+        file_info = json.dumps({"relativePath": name}, ensure_ascii=False)
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            content = f.read()
+        lines = content.splitlines()
+        index = 0
+        while lines:
+            available_lines = max(1, max_lines - current_lines)
+            chunk = lines[:available_lines]
+            buffer.append({'content': '\n'.join(chunk) + '\n', 'info': file_info, 'index': index})
+            current_lines += len(chunk) + 2
+            lines = lines[available_lines:]
+            index += 1
+            if current_lines >= max_lines:
+                flush()
+                buffer = []
+                current_lines = 0
+    if buffer:
+        flush()
+
+
+def bench(label: str, lines: int, workdir: str, legacy: bool) -> Dict[str, float]:
+    source = os.path.join(workdir, f"{label}-src")
+    output = os.path.join(workdir, f"{label}-out")
+    make_synthetic_file(source, lines)
+    os.makedirs(output)
+
+    if legacy:
+        command = [sys.executable, os.path.abspath(__file__), '--legacy-run', source]
+    else:
+        command = [sys.executable, os.path.join(HERE, 'make-plaintext.py'), source, '--no-cache']
+
+    result = run_child(command, output)
+    result['lines'] = lines
+    shutil.rmtree(source)
+    shutil.rmtree(output)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del escritor de partes de make-plaintext.")
+    parser.add_argument("--lines", type=int, default=10_000_000, help="Líneas del archivo sintético")
+    parser.add_argument("--legacy-lines", type=int, default=1_000_000,
+                        help="Líneas para el algoritmo anterior (0 para omitirlo)")
+    parser.add_argument("--max-rss-mb", type=float, default=None,
+                        help="Falla si la versión actual supera este pico de memoria")
+    parser.add_argument("--legacy-run", metavar="DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.legacy_run:
+        legacy_process(args.legacy_run)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench-plaintext-')
+    try:
+        rows = []
+        if args.legacy_lines:
+            rows.append(('anterior', bench('legacy', args.legacy_lines, workdir, legacy=True)))
+        rows.append(('actual', bench('stream', args.lines, workdir, legacy=False)))
+    finally:
+        shutil.rmtree(workdir)
+
+    print(f"{'versión':<10} {'líneas':>12} {'segundos':>9} {'RSS máx (MB)':>13} {'salida (MB)':>12}")
+    for label, r in rows:
+        print(f"{label:<10} {r['lines']:>12,} {r['seconds']:>9.2f} {r['peak_rss_mb']:>13.1f} "
+              f"{r['output_bytes'] / (1024 * 1024):>12.1f}")
+
+    current = rows[-1][1]
+    if args.max_rss_mb is not None and current['peak_rss_mb'] > args.max_rss_mb:
+        print(f"\nRegresión: pico de memoria {current['peak_rss_mb']:.1f} MB > {args.max_rss_mb} MB")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
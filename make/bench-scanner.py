@@ -0,0 +1,138 @@
+"""
+Benchmark del recorrido de directorios de los scripts de `make/`.
+
+Compara el recorrido anterior (un `os.walk` por herramienta, dos en
+make-markdown, más un `os.stat` por archivo) con el escaneo único de
+`maketools.scanner.scan_tree`, contando llamadas a `scandir` y `stat`.
+Los contadores envuelven `os.scandir` y `DirEntry`, así que el tiempo se
+mide aparte, sin ellos (el mejor de varias ejecuciones).
+
+En Linux `DirEntry.stat()` hace la misma llamada al sistema que `os.stat`,
+así que el escaneo no reduce los `stat` por archivo: lo que ahorra son los
+recorridos repetidos (la mitad de `scandir` en make-markdown).
+
+Uso:
+    python bench-scanner.py [ruta_del_directorio]
+
+Sin argumentos genera un árbol sintético en un directorio temporal.
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+from typing import Callable, Dict
+
+# Ejecuciones sin instrumentar de cada caso; se toma la más rápida
+TIMING_RUNS = 5
+
+from maketools.profiling import count_calls
+from maketools.scanner import iter_files, scan_tree
+
+
+def measure(func: Callable[[], None]) -> Dict[str, float]:
+    """
+    Cuenta las llamadas a `os.scandir` y `os.stat` de una ejecución de
+    `func` y la cronometra en otras `TIMING_RUNS`, sin los contadores.
+    """
+    with count_calls() as counters:
+        func()
+
+    elapsed = float('inf')
+    for _ in range(TIMING_RUNS):
+        start = time.perf_counter()
+        func()
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    return {'scandir': counters.scandir, 'stat': counters.stat, 'seconds': elapsed}
+
+
+def _legacy_walk(directory: str, stat_files: bool):
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if d != 'node_modules']
+        for name in sorted(files):
+            if stat_files:
+                os.stat(os.path.join(root, name))
+
+
+def legacy_markdown(directory: str):
+    # generate_tree_structure + process_directory (con os.stat por archivo)
+    _legacy_walk(directory, stat_files=False)
+    _legacy_walk(directory, stat_files=True)
+
+
+def legacy_single(directory: str):
+    # make-tree y make-plaintext
+    _legacy_walk(directory, stat_files=False)
+
+
+def legacy_zip(directory: str):
+    # zipfile.ZipFile.write hace un os.stat por archivo
+    _legacy_walk(directory, stat_files=True)
+
+
+def _exclude(name: str, rel_path: str, is_dir: bool) -> bool:
+    return is_dir and name == 'node_modules'
+
+
+def scanner_markdown(directory: str):
+    for _ in iter_files(scan_tree(directory, _exclude)):
+        pass
+
+
+def scanner_single(directory: str):
+    for _ in iter_files(scan_tree(directory, _exclude, with_stat=False)):
+        pass
+
+
+def scanner_zip(directory: str):
+    # El tamaño y la fecha salen del manifiesto; ZipStreamWriter no vuelve
+    # a hacer os.stat (compress_file solo hace fstat del archivo abierto)
+    for _ in iter_files(scan_tree(directory, _exclude)):
+        pass
+
+
+def make_synthetic_tree(root: str, dirs: int = 200, files_per_dir: int = 50):
+    """Crea `dirs` directorios con `files_per_dir` archivos pequeños cada uno."""
+    for d in range(dirs):
+        path = os.path.join(root, f"pkg{d % 10}", f"mod{d}")
+        os.makedirs(path, exist_ok=True)
+        for f in range(files_per_dir):
+            with open(os.path.join(path, f"file{f}.py"), 'w', encoding='utf-8') as fh:
+                fh.write(f"# {d}/{f}\n")
+    excluded = os.path.join(root, 'node_modules', 'dep')
+    os.makedirs(excluded, exist_ok=True)
+    for f in range(files_per_dir):
+        with open(os.path.join(excluded, f"index{f}.js"), 'w', encoding='utf-8') as fh:
+            fh.write("module.exports = {};\n")
+
+
+def main():
+    temp_dir = None
+    if len(sys.argv) > 1:
+        directory = sys.argv[1]
+    else:
+        temp_dir = tempfile.mkdtemp(prefix='bench-scanner-')
+        directory = temp_dir
+        make_synthetic_tree(directory)
+
+    cases = [
+        ('make-markdown', legacy_markdown, scanner_markdown),
+        ('make-tree / make-plaintext', legacy_single, scanner_single),
+        ('make-zip', legacy_zip, scanner_zip),
+    ]
+
+    try:
+        print(f"Directorio: {directory}\n")
+        print(f"{'herramienta':<28} {'modo':<8} {'scandir':>8} {'stat':>8} {'segundos':>9}")
+        for name, before, after in cases:
+            for label, func in (('antes', before), ('después', after)):
+                result = measure(lambda: func(directory))
+                print(f"{name:<28} {label:<8} {result['scandir']:>8} {result['stat']:>8} {result['seconds']:>9.4f}")
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Benchmark reproducible de los scripts de `make/` (make-markdown,
+make-plaintext, make-tree y make-zip).
+
+Genera un árbol sintético con la forma pedida (número de archivos,
+profundidad, distribución de tamaños, proporción de binarios y número de
+reglas de exclusión) en un directorio temporal, ejecuta cada herramienta en
+un proceso hijo y registra el tiempo, el pico de memoria (RSS), los bytes
+generados y, con `--count-calls`, las llamadas a `scandir`/`stat`/`open` y
+las lecturas/escrituras del proceso. Con `--profile` guarda además un volcado
+de `cProfile` (.prof) o de `tracemalloc` (.txt) por ejecución. Los
+contadores y perfiles solo ven el proceso principal de cada herramienta,
+no los procesos del pool de make-zip.
+
+Los resultados se escriben en JSON para comparar entre commits:
+
+    python bench-tools.py --output antes.json
+    git checkout otra-rama
+    python bench-tools.py --output despues.json --compare antes.json
+
+Uso:
+    python bench-tools.py [--files 2000] [--depth 4] [--fanout 4]
+                          [--median-kb 4] [--size-sigma 1.2] [--binary-ratio 0.05]
+                          [--rules 20] [--seed 1] [--tools markdown,plaintext,tree,zip]
+                          [--repeat 3] [--count-calls] [--profile cprofile|tracemalloc]
+                          [--profile-dir DIR] [--output bench-tools.json]
+                          [--compare ANTERIOR.json]
+"""
+import os
+import sys
+import json
+import math
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from contextlib import ExitStack
+from datetime import datetime
+from statistics import median
+from typing import Dict, List, Optional
+
+from maketools.profiling import count_calls, read_proc_io, run_child
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Script y argumentos de cada herramienta; SRC es el árbol sintético
+TOOLS = {
+    'markdown': ('make-markdown.py', ['SRC', '--no-cache']),
+    'plaintext': ('make-plaintext.py', ['SRC', '--no-cache']),
+    'tree': ('make-tree.py', ['SRC', '--no-index']),
+    'zip': ('make-zip.py', ['SRC', '-q', '-o', 'out.zip']),
+}
+
+_WORDS = ('def', 'return', 'import', 'class', 'self', 'value', 'result', 'data',
+          'for', 'in', 'if', 'else', 'None', 'True', 'config', 'path', 'items')
+
+
+def _text_content(rng: random.Random, size: int) -> bytes:
+    lines = []
+    total = 0
+    while total < size:
+        indent = '    ' * rng.randint(0, 3)
+        line = indent + ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(2, 10))) + '\n'
+        lines.append(line)
+        total += len(line)
+    return ''.join(lines).encode('utf-8')[:size]
+
+
+def _binary_content(rng: random.Random, size: int) -> bytes:
+    # Cabecera PNG para que el sniffing la reconozca, el resto aleatorio
+    header = b'\x89PNG\r\n\x1a\n'
+    return header + rng.randbytes(max(size - len(header), 0))
+
+
+def make_synthetic_tree(root: str, files: int, depth: int, fanout: int, median_kb: float,
+                        size_sigma: float, binary_ratio: float, seed: int,
+                        max_file_bytes: int = 4 * 1024 * 1024) -> Dict[str, int]:
+    """
+    Crea un árbol de directorios con `fanout` subdirectorios por nivel hasta
+    `depth` niveles y reparte `files` archivos entre ellos. Los tamaños siguen
+    una distribución log-normal con mediana `median_kb` KB. Un 5 % de los
+    archivos son `.log` y hay un `node_modules/`, para que las reglas de
+    exclusión tengan algo que excluir. Con la misma semilla el árbol es
+    idéntico.
+    """
+    rng = random.Random(seed)
+    dirs = ['']
+    frontier = ['']
+    for level in range(depth):
+        next_frontier = []
+        for parent in frontier:
+            for i in range(fanout):
+                path = os.path.join(parent, f"{'pkg' if level == 0 else 'mod'}{i}")
+                next_frontier.append(path)
+        dirs.extend(next_frontier)
+        frontier = next_frontier
+    dirs.append('node_modules')
+    for path in dirs:
+        os.makedirs(os.path.join(root, path), exist_ok=True)
+
+    mu = math.log(median_kb * 1024)
+    stats = {'files': 0, 'bytes': 0, 'binary': 0, 'dirs': len(dirs)}
+    for i in range(files):
+        directory = rng.choice(dirs)
+        size = min(int(rng.lognormvariate(mu, size_sigma)), max_file_bytes)
+        if rng.random() < binary_ratio:
+            name, content = f"asset{i}.png", _binary_content(rng, size)
+            stats['binary'] += 1
+        else:
+            extension = '.log' if rng.random() < 0.05 else rng.choice(('.py', '.js', '.md', '.txt'))
+            name, content = f"file{i}{extension}", _text_content(rng, size)
+        with open(os.path.join(root, directory, name), 'wb') as f:
+            f.write(content)
+        stats['files'] += 1
+        stats['bytes'] += len(content)
+    return stats
+
+
+def make_exceptions(path: str, rules: int):
+    """
+    Escribe un archivo `exceptions` con `rules` reglas. Las primeras excluyen
+    de verdad (`node_modules/`, `*.log`); el resto son nombres, globs y rutas
+    que no aparecen en el árbol, como en un proyecto real.
+    """
+    lines = ['node_modules/', '*.log']
+    kinds = ('build{0}/', '*.tmp{0}', 'cache{0}.db', 'pkg0/generated{0}/**', '!keep{0}.log')
+    i = 0
+    while len(lines) < rules:
+        lines.append(kinds[i % len(kinds)].format(i))
+        i += 1
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines[:max(rules, 0)]) + '\n')
+
+
+def child_main(config_path: str):
+    """
+    Ejecuta una herramienta dentro de este proceso con los contadores o el
+    perfilador pedidos y guarda sus resultados junto a la configuración.
+    """
+    import runpy
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    script = config['script']
+    sys.argv = [script] + config['args']
+    sys.path.insert(0, os.path.dirname(script))
+
+    result = {}
+    profiler = None
+    if config.get('profile') == 'cprofile':
+        import cProfile
+        profiler = cProfile.Profile()
+    elif config.get('profile') == 'tracemalloc':
+        import tracemalloc
+        tracemalloc.start(25)
+
+    io_before = read_proc_io()
+    with ExitStack() as stack:
+        calls = stack.enter_context(count_calls()) if config.get('count_calls') else None
+        if profiler is not None:
+            profiler.enable()
+            stack.callback(profiler.disable)
+        runpy.run_path(script, run_name='__main__')
+    if calls is not None:
+        result['calls'] = calls.as_dict()
+
+    io_after = read_proc_io()
+    if io_after:
+        result['syscr'] = io_after['syscr'] - io_before.get('syscr', 0)
+        result['syscw'] = io_after['syscw'] - io_before.get('syscw', 0)
+
+    if profiler is not None:
+        profiler.dump_stats(config['profile_out'])
+    elif config.get('profile') == 'tracemalloc':
+        import tracemalloc
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        with open(config['profile_out'], 'w', encoding='utf-8') as f:
+            f.write(f"Pico trazado: {peak / (1024 * 1024):.1f} MB\n\n")
+            for stat in snapshot.statistics('lineno')[:30]:
+                f.write(f"{stat}\n")
+        result['traced_peak_mb'] = peak / (1024 * 1024)
+
+    with open(config['result_out'], 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+
+def run_tool(tool: str, source: str, workdir: str, exceptions: str, count: bool,
+             profile: Optional[str], profile_dir: Optional[str], run_index: int) -> Dict[str, float]:
+    """Ejecuta una herramienta en un directorio de salida vacío y devuelve sus métricas."""
+    script, args = TOOLS[tool]
+    output = os.path.join(workdir, f"{tool}-out")
+    os.makedirs(output)
+    shutil.copy(exceptions, os.path.join(output, 'exceptions'))
+    args = [source if a == 'SRC' else a for a in args]
+    script_path = os.path.join(HERE, script)
+
+    config_path = None
+    if count or profile:
+        config_path = os.path.join(workdir, f"{tool}-child.json")
+        result_path = os.path.join(workdir, f"{tool}-child-result.json")
+        suffix = 'prof' if profile == 'cprofile' else 'txt'
+        config = {
+            'script': script_path,
+            'args': args,
+            'count_calls': count,
+            'profile': profile,
+            'profile_out': os.path.join(profile_dir or '.', f"{tool}-{run_index}.{suffix}"),
+            'result_out': result_path,
+        }
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        command = [sys.executable, os.path.abspath(__file__), '--child', config_path]
+    else:
+        command = [sys.executable, script_path] + args
+
+    try:
+        metrics = run_child(command, output)
+        if config_path is not None:
+            with open(result_path, 'r', encoding='utf-8') as f:
+                metrics.update(json.load(f))
+            if profile:
+                metrics['profile'] = config['profile_out']
+    finally:
+        shutil.rmtree(output)
+        if config_path is not None:
+            os.remove(config_path)
+            if os.path.exists(result_path):
+                os.remove(result_path)
+    return metrics
+
+
+def summarize(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    seconds = [r['seconds'] for r in runs]
+    summary = {
+        'seconds_min': min(seconds),
+        'seconds_median': median(seconds),
+        'peak_rss_mb': max(r['peak_rss_mb'] for r in runs),
+        'output_bytes': runs[-1]['output_bytes'],
+    }
+    for key in ('syscr', 'syscw', 'traced_peak_mb'):
+        if key in runs[-1]:
+            summary[key] = runs[-1][key]
+    if 'calls' in runs[-1]:
+        summary.update(runs[-1]['calls'])
+    return summary
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def print_table(results: Dict[str, Dict[str, float]], previous: Optional[Dict[str, Dict[str, float]]] = None):
+    header = f"{'herramienta':<11} {'segundos':>9} {'RSS máx (MB)':>13} {'salida (KB)':>12} {'stat':>8} {'open':>7}"
+    if previous:
+        header += f" {'Δ tiempo':>9} {'Δ RSS':>8}"
+    print(header)
+    for tool, r in results.items():
+        line = (f"{tool:<11} {r['seconds_median']:>9.3f} {r['peak_rss_mb']:>13.1f} "
+                f"{r['output_bytes'] / 1024:>12.1f} {r.get('stat', '-'):>8} {r.get('open', '-'):>7}")
+        if previous and tool in previous:
+            before = previous[tool]
+            line += (f" {(r['seconds_median'] / before['seconds_median'] - 1) * 100:>+8.1f}%"
+                     f" {(r['peak_rss_mb'] / before['peak_rss_mb'] - 1) * 100:>+7.1f}%")
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los scripts de make/ sobre un árbol sintético.")
+    parser.add_argument("--files", type=int, default=2000, help="Número de archivos")
+    parser.add_argument("--depth", type=int, default=4, help="Niveles de directorios")
+    parser.add_argument("--fanout", type=int, default=4, help="Subdirectorios por directorio")
+    parser.add_argument("--median-kb", type=float, default=4, help="Mediana del tamaño de los archivos (KB)")
+    parser.add_argument("--size-sigma", type=float, default=1.2,
+                        help="Dispersión de la distribución log-normal de tamaños")
+    parser.add_argument("--binary-ratio", type=float, default=0.05, help="Proporción de archivos binarios")
+    parser.add_argument("--rules", type=int, default=20, help="Reglas en el archivo de excepciones")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla del árbol sintético")
+    parser.add_argument("--tools", default=','.join(TOOLS),
+                        help=f"Herramientas a medir, separadas por comas ({', '.join(TOOLS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Ejecuciones por herramienta")
+    parser.add_argument("--count-calls", action="store_true",
+                        help="Contar scandir/stat/open y lecturas/escrituras (en una ejecución aparte)")
+    parser.add_argument("--profile", choices=('cprofile', 'tracemalloc'),
+                        help="Guardar un perfil por herramienta (en una ejecución aparte)")
+    parser.add_argument("--profile-dir", default='.', help="Directorio de los perfiles")
+    parser.add_argument("--output", default='bench-tools.json', help="Archivo JSON de resultados")
+    parser.add_argument("--compare", metavar="JSON", help="Resultados anteriores con los que comparar")
+    parser.add_argument("--child", metavar="CONFIG", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.child)
+        return
+
+    tools = [t.strip() for t in args.tools.split(',') if t.strip()]
+    unknown = [t for t in tools if t not in TOOLS]
+    if unknown:
+        parser.error(f"Herramientas desconocidas: {', '.join(unknown)}")
+    if args.profile:
+        os.makedirs(args.profile_dir, exist_ok=True)
+        args.profile_dir = os.path.abspath(args.profile_dir)
+
+    workdir = tempfile.mkdtemp(prefix='bench-tools-')
+    try:
+        # El nombre del árbol es el de las partes generadas (src_xxxxx.md...)
+        source = os.path.join(workdir, 'src')
+        tree = make_synthetic_tree(source, args.files, args.depth, args.fanout, args.median_kb,
+                                   args.size_sigma, args.binary_ratio, args.seed)
+        exceptions = os.path.join(workdir, 'exceptions')
+        make_exceptions(exceptions, args.rules)
+        print(f"Árbol sintético: {tree['files']} archivos ({tree['binary']} binarios), "
+              f"{tree['dirs']} directorios, {tree['bytes'] / (1024 * 1024):.1f} MB\n")
+
+        results = {}
+        raw_runs = {}
+        for tool in tools:
+            # Las ejecuciones cronometradas van sin contadores ni perfilador,
+            # que las ralentizarían; esas métricas salen de una ejecución aparte
+            runs = [run_tool(tool, source, workdir, exceptions, False, None, None, i)
+                    for i in range(args.repeat)]
+            if args.count_calls or args.profile:
+                extra = run_tool(tool, source, workdir, exceptions, args.count_calls,
+                                 args.profile, args.profile_dir, args.repeat)
+                for key in ('calls', 'syscr', 'syscw', 'traced_peak_mb', 'profile'):
+                    if key in extra:
+                        runs[-1][key] = extra[key]
+            raw_runs[tool] = runs
+            results[tool] = summarize(runs)
+    finally:
+        shutil.rmtree(workdir)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'params': {k: v for k, v in vars(args).items() if k not in ('child', 'output', 'compare')},
+            'tree': tree,
+        },
+        'results': results,
+        'runs': raw_runs,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)['results']
+    print_table(results, previous)
+    print(f"\nResultados guardados en '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Módulos compartidos por los scripts de `make/` (make-markdown, make-tree,
+make-plaintext y make-zip), que también se pueden usar como biblioteca
+(ver `maketools.api`) o como una única CLI (`python -m maketools`).
+
+Los nombres de la API se importan al usarlos por primera vez, así que
+`import maketools` no carga ningún módulo pesado.
+"""
+
+# Nombre público -> módulo que lo define
+_EXPORTS = {
+    'bundle_markdown': 'maketools.api',
+    'bundle_plaintext': 'maketools.api',
+    'render_tree': 'maketools.api',
+    'create_zip': 'maketools.api',
+    'Session': 'maketools.api',
+    'load_rules': 'maketools.matcher',
+    'ExclusionMatcher': 'maketools.matcher',
+    'DirectorySink': 'maketools.sinks',
+    'MemorySink': 'maketools.sinks',
+    'BundleSink': 'maketools.bundle',
+    'Bundle': 'maketools.bundle',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'maketools' has no attribute '{name}'")
+    from importlib import import_module
+
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,42 @@
+"""
+CLI única de las herramientas de `make/`:
+
+    python -m maketools <comando> [opciones]
+
+Solo se importa el módulo del comando elegido.
+"""
+import sys
+
+# Comando -> módulo con su función `main(argv, prog)`
+COMMANDS = {
+    'markdown': 'maketools.markdown',
+    'plaintext': 'maketools.plaintext',
+    'tree': 'maketools.tree',
+    'zip': 'maketools.archive',
+    'extract': 'maketools.bundle',
+}
+
+USAGE = (
+    "uso: python -m maketools {" + ",".join(COMMANDS) + "} [opciones]\n"
+    "     python -m maketools <comando> --help muestra las opciones de cada comando"
+)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(USAGE)
+        return 0
+    command = argv[0]
+    if command not in COMMANDS:
+        print(f"Error: comando desconocido '{command}'\n{USAGE}", file=sys.stderr)
+        return 2
+
+    from importlib import import_module
+
+    import_module(COMMANDS[command]).main(argv[1:], prog=f"python -m maketools {command}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
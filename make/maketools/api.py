@@ -0,0 +1,131 @@
+"""
+API programática de las herramientas de `make/`, para usarlas desde otro
+programa sin lanzar un proceso por repositorio.
+
+Las funciones sueltas (`bundle_markdown`, `bundle_plaintext`, `render_tree`,
+`create_zip`) hacen una ejecución cada una. Para procesar muchos
+repositorios en un mismo proceso, una `Session` compila las reglas de
+exclusión una sola vez y reutiliza el mismo pool de hilos (y de procesos,
+para los .zip) en todas las llamadas:
+
+    with Session(rules='exceptions', jobs=8) as session:
+        for repo in repos:
+            session.bundle_markdown(repo, sink=MemorySink())
+
+`rules` acepta la ruta de un archivo de excepciones, una lista de reglas o
+un `ExclusionMatcher`; `sink` un directorio o un `MemorySink`.
+"""
+import os
+from typing import TYPE_CHECKING, List, Optional
+
+from maketools.matcher import ExclusionMatcher, RulesArg, load_rules
+from maketools.sinks import SinkArg, as_sink
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+def bundle_markdown(path: str, rules: RulesArg = None, sink: SinkArg = None, **options) -> List[str]:
+    """Genera las partes Markdown de `path` y devuelve sus nombres (ver `markdown.process_directory`)."""
+    from maketools.markdown import process_directory
+
+    return process_directory(path, rules=rules, sink=sink, **options)
+
+
+def bundle_plaintext(path: str, rules: RulesArg = None, sink: SinkArg = None, **options) -> List[str]:
+    """Genera las partes de texto plano de `path` y devuelve sus nombres (ver `plaintext.process_directory`)."""
+    from maketools.plaintext import process_directory
+
+    return process_directory(path, rules=rules, sink=sink, **options)
+
+
+def render_tree(path: str, rules: RulesArg = None, sink: SinkArg = None, **options) -> Optional[str]:
+    """Genera el archivo con el árbol de `path` y devuelve su nombre (ver `tree.create_tree_markdown`)."""
+    from maketools.tree import create_tree_markdown
+
+    return create_tree_markdown(path, rules=rules, sink=sink, **options)
+
+
+def create_zip(path: str, rules: RulesArg = None, output: Optional[str] = None, **options) -> str:
+    """
+    Comprime `path` en `output` (por defecto `<path>.zip`) y devuelve la
+    ruta del .zip (ver `archive.crear_zip`; las opciones van en español:
+    `procesos`, `nivel`, `silencioso`, `actualizar`, `destino`, `pool`).
+    """
+    from maketools.archive import crear_zip
+
+    path = os.path.normpath(path)
+    output = output or f"{path}.zip"
+    crear_zip(path, output, load_rules(rules), **options)
+    return output
+
+
+class Session:
+    """
+    Reglas y pools compartidos entre muchas llamadas en un proceso de larga
+    duración. Las reglas se compilan al crear la sesión; los pools se crean
+    en la primera llamada que los necesita y se cierran con `close` (o al
+    salir del bloque `with`).
+
+    La sesión no es segura entre hilos: cada hilo que la use debe tener la
+    suya, aunque todas pueden compartir el mismo `ExclusionMatcher`.
+    """
+
+    def __init__(self, rules: RulesArg = None, jobs: Optional[int] = None,
+                 sink: SinkArg = None):
+        self.matcher: ExclusionMatcher = load_rules(rules)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.sink = sink
+        self._threads: Optional['Executor'] = None
+        self._processes: Optional['Executor'] = None
+
+    @property
+    def threads(self) -> 'Executor':
+        """Pool de hilos para leer y formatear archivos."""
+        if self._threads is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._threads = ThreadPoolExecutor(max_workers=self.jobs)
+        return self._threads
+
+    @property
+    def processes(self) -> 'Executor':
+        """Pool de procesos para comprimir los miembros de los .zip."""
+        if self._processes is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._processes = ProcessPoolExecutor(max_workers=self.jobs)
+        return self._processes
+
+    def _sink(self, sink: SinkArg):
+        return as_sink(sink if sink is not None else self.sink)
+
+    def bundle_markdown(self, path: str, sink: SinkArg = None, **options) -> List[str]:
+        if self.jobs > 1:
+            options.setdefault('jobs', self.jobs)
+            options.setdefault('executor', self.threads)
+        return bundle_markdown(path, self.matcher, self._sink(sink), **options)
+
+    def bundle_plaintext(self, path: str, sink: SinkArg = None, **options) -> List[str]:
+        return bundle_plaintext(path, self.matcher, self._sink(sink), **options)
+
+    def render_tree(self, path: str, sink: SinkArg = None, **options) -> Optional[str]:
+        return render_tree(path, self.matcher, self._sink(sink), **options)
+
+    def create_zip(self, path: str, output: Optional[str] = None, **options) -> str:
+        if self.jobs > 1:
+            options.setdefault('procesos', self.jobs)
+            options.setdefault('pool', self.processes)
+        return create_zip(path, self.matcher, output, **options)
+
+    def close(self):
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._threads = self._processes = None
+
+    def __enter__(self) -> 'Session':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import argparse
+from contextlib import nullcontext, redirect_stdout
+from functools import partial
+
+from maketools.matcher import ExclusionMatcher
+from maketools.parallel import ordered_map
+from maketools.scanner import iter_files, scan_tree
+from maketools.zipstream import (ZIP_DEFLATED, ZIP_STORED, ZipStreamWriter, compress_file,
+                                 compression_method_for, read_archive_index)
+
+# Los archivos más grandes se comprimen en streaming en el proceso principal
+# en lugar de devolverse enteros desde el pool
+UMBRAL_STREAMING = 32 * 1024 * 1024
+
+def leer_excepciones(ruta_archivo='exceptions'):
+    """
+    Lee el archivo de excepciones y devuelve un ExclusionMatcher con las reglas
+    (nombres exactos, patrones como *.log y reglas estilo .gitignore).
+    Si el archivo no existe, el matcher no excluye nada.
+    """
+    if not os.path.exists(ruta_archivo):
+        print(f"Advertencia: No se encontró el archivo de excepciones en '{ruta_archivo}'. No se excluirá nada.")
+        return ExclusionMatcher()
+
+    excepciones = ExclusionMatcher.from_file(ruta_archivo)
+    print(f"Excepciones cargadas desde '{ruta_archivo}'.")
+    return excepciones
+
+def _comprimir_entrada(ruta_carpeta, nivel, entrada):
+    """
+    Tarea del pool de procesos: comprime un archivo en memoria. Los archivos
+    grandes devuelven None y se comprimen en streaming en el proceso principal.
+    Si el archivo no se puede leer (enlace roto, permisos, borrado durante el
+    recorrido) devuelve el `OSError` para que se salte sin cortar el .zip.
+    """
+    if entrada.size > UMBRAL_STREAMING:
+        return None
+    metodo = ZIP_STORED if nivel == 0 else None
+    try:
+        return compress_file(os.path.join(ruta_carpeta, entrada.rel_path), nivel, metodo)
+    except OSError as e:
+        return e
+
+def _error_de_lectura(ruta):
+    """El `OSError` que da abrir `ruta`, o None si se puede leer."""
+    try:
+        with open(ruta, 'rb'):
+            return None
+    except OSError as e:
+        return e
+
+def _es_reutilizable(entrada, miembro, nivel):
+    """
+    Un miembro anterior se reutiliza si el tamaño y el mtime (en segundos)
+    coinciden y se comprimió como se pide ahora: con el mismo método y, si
+    va con deflate, con el mismo `nivel`. Los miembros sin nivel conocido
+    (de .zip de otras herramientas o versiones) se vuelven a comprimir.
+    """
+    if (miembro is None
+            or miembro.mtime is None
+            or miembro.file_size != entrada.size
+            or miembro.mtime != entrada.mtime_ns // 1_000_000_000):
+        return False
+    metodo = ZIP_STORED if nivel == 0 else compression_method_for(miembro.name)
+    if miembro.method != metodo:
+        return False
+    return metodo != ZIP_DEFLATED or miembro.level == nivel
+
+def crear_zip(ruta_carpeta, nombre_zip, excepciones, procesos=1, nivel=6, silencioso=False,
+              actualizar=False, destino=None, pool=None):
+    """
+    Crea un archivo .zip a partir de una carpeta, excluyendo los archivos y
+    directorios especificados.
+
+    Con `procesos > 1` los archivos se comprimen en un pool de procesos y el
+    .zip se ensambla, en orden, con los datos ya comprimidos. Los tipos ya
+    comprimidos (jpg, png, zip, gz, woff2, mp4...) se guardan sin recomprimir.
+    `nivel` va de 0 (sin compresión) a 9; `silencioso` evita imprimir una
+    línea por archivo.
+
+    Con `actualizar=True` y un `nombre_zip` ya existente, se lee su directorio
+    central y los archivos con el mismo tamaño y mtime, comprimidos con el
+    mismo método y nivel, se copian con sus bytes ya comprimidos; solo se
+    comprimen los nuevos, los modificados y los de otro nivel, y los
+    borrados desaparecen. El nuevo .zip se escribe en un temporal que sustituye al
+    anterior al terminar.
+
+    Si se pasa `destino` (un archivo binario abierto, p. ej. stdout o una
+    tubería), el .zip se escribe ahí en streaming, sin `seek` ni temporal, y
+    `nombre_zip` solo se usa en los mensajes. La memoria está acotada por
+    los bytes en vuelo del pool y ZIP64 se activa solo cuando hace falta.
+
+    `pool` es un `ProcessPoolExecutor` ya creado, para compartirlo entre
+    varias llamadas; si no se pasa, se crea uno para esta llamada.
+
+    Los archivos que no se pueden leer se saltan con una advertencia. Cualquier
+    otro error se propaga: el .zip quedaría incompleto, así que no se da por
+    bueno (y con `destino`, quien lo lee debe saber que ha fallado).
+    """
+    print(f"Creando archivo '{nombre_zip}' desde la carpeta '{ruta_carpeta}'...")
+
+    anteriores = {}
+    if actualizar and os.path.exists(nombre_zip):
+        from zipfile import BadZipFile
+
+        try:
+            anteriores = read_archive_index(nombre_zip)
+        except (BadZipFile, OSError) as e:
+            print(f"Advertencia: No se pudo leer '{nombre_zip}' ({e}). Se creará desde cero.")
+
+    ruta_temporal = f"{nombre_zip}.tmp" if destino is None else None
+    pool_propio = pool is None and procesos > 1
+    if pool_propio:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=procesos)
+    try:
+        # Un único recorrido con os.scandir. Los directorios excluidos no
+        # se recorren.
+        manifest = scan_tree(ruta_carpeta, excepciones)
+        entradas = list(iter_files(manifest))
+
+        # La ruta relativa mantiene la estructura de carpetas dentro del zip.
+        nombres = [entrada.rel_path.replace(os.sep, '/') for entrada in entradas]
+        reutilizables = {
+            nombre for nombre, entrada in zip(nombres, entradas)
+            if _es_reutilizable(entrada, anteriores.get(nombre), nivel)
+        }
+        pendientes = [entrada for nombre, entrada in zip(nombres, entradas) if nombre not in reutilizables]
+
+        comprimidos = ordered_map(
+            partial(_comprimir_entrada, ruta_carpeta, nivel),
+            pendientes,
+            jobs=procesos,
+            weight=lambda entrada: min(entrada.size, UMBRAL_STREAMING),
+            executor=pool,
+        )
+
+        omitidos = []
+        origen = open(nombre_zip, 'rb') if reutilizables else None
+        try:
+            with (open(ruta_temporal, 'wb') if destino is None else nullcontext(destino)) as salida:
+                zipf = ZipStreamWriter(salida)
+                for nombre, entrada in zip(nombres, entradas):
+                    if nombre in reutilizables:
+                        zipf.copy_member(anteriores[nombre], origen)
+                        continue
+
+                    comprimido = next(comprimidos)
+                    ruta_completa = os.path.join(ruta_carpeta, entrada.rel_path)
+                    if comprimido is None:
+                        # Comprobarlo antes de escribir la cabecera local, que no se puede deshacer
+                        comprimido = _error_de_lectura(ruta_completa)
+                    if isinstance(comprimido, OSError):
+                        print(f"Advertencia: Se omite '{nombre}' ({comprimido.strerror or comprimido}).")
+                        omitidos.append(nombre)
+                        continue
+                    if comprimido is None:
+                        zipf.write_file(nombre, ruta_completa, nivel, ZIP_STORED if nivel == 0 else None)
+                    else:
+                        zipf.write_compressed(nombre, comprimido)
+
+                    if not silencioso:
+                        accion = "Actualizando" if nombre in anteriores else "Añadiendo"
+                        print(f"  + {accion}: {nombre}")
+                zipf.close()
+        finally:
+            if origen is not None:
+                origen.close()
+        if ruta_temporal:
+            os.replace(ruta_temporal, nombre_zip)
+
+        escritos = len(entradas) - len(omitidos)
+        print(f"\n¡Éxito! El archivo '{nombre_zip}' ha sido creado correctamente ({escritos} archivos).")
+        if omitidos:
+            print(f"Omitidos por no poder leerse: {len(omitidos)}.")
+        if actualizar:
+            eliminados = len(anteriores.keys() - set(nombres))
+            print(f"Reutilizados: {len(reutilizables)}, comprimidos: {len(pendientes) - len(omitidos)}, "
+                  f"eliminados: {eliminados}.")
+    finally:
+        if pool_propio:
+            pool.shutdown(cancel_futures=True)
+        if ruta_temporal and os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+
+
+def main(argv=None, prog=None):
+    """
+    Función principal de `make-zip.py` y de `python -m maketools zip`.
+    """
+    # 1. Leer los argumentos de la línea de comandos
+    parser = argparse.ArgumentParser(prog=prog, description="Comprime una carpeta en <carpeta>.zip respetando las excepciones.")
+    parser.add_argument("carpeta", help="Carpeta a comprimir")
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Procesos para comprimir en paralelo (por defecto, uno por núcleo)"
+    )
+    parser.add_argument(
+        "-l", "--level",
+        type=int,
+        default=6,
+        choices=range(10),
+        metavar="0-9",
+        help="Nivel de compresión deflate; 0 guarda sin comprimir (por defecto 6)"
+    )
+    parser.add_argument(
+        "-q", "--quiet",
+        action="store_true",
+        help="No imprimir una línea por cada archivo añadido"
+    )
+    parser.add_argument(
+        "-u", "--update",
+        action="store_true",
+        help="Reutilizar los miembros sin cambios (mismo tamaño y fecha) del .zip existente"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Archivo de salida (por defecto <carpeta>.zip); '-' escribe el .zip en stdout"
+    )
+    parser.add_argument(
+        "--rules",
+        default="exceptions",
+        help="Archivo de reglas de exclusión (por defecto, 'exceptions' en el directorio actual)"
+    )
+    args = parser.parse_args(argv)
+
+    # Quitar una posible barra al final del nombre para consistencia
+    nombre_carpeta = args.carpeta.rstrip('/') or args.carpeta
+
+    # 2. Comprobar si la carpeta a comprimir existe
+    if not os.path.isdir(nombre_carpeta):
+        print(f"Error: La carpeta '{nombre_carpeta}' no existe o no es un directorio.")
+        sys.exit(1)
+
+    # 3. Definir el archivo .zip de salida. Con '-' o con una tubería con
+    # nombre (FIFO) se escribe en streaming, sin archivo temporal.
+    nombre_archivo_zip = args.output or f"{nombre_carpeta}.zip"
+    if nombre_archivo_zip == '-':
+        destino = sys.stdout.buffer
+        nombre_archivo_zip = '<stdout>'
+    elif os.path.isdir(nombre_archivo_zip):
+        parser.error(f"la salida '{nombre_archivo_zip}' es un directorio")
+    elif os.path.exists(nombre_archivo_zip) and not os.path.isfile(nombre_archivo_zip):
+        destino = open(nombre_archivo_zip, 'wb')
+    else:
+        destino = None
+
+    if destino is not None and args.update:
+        parser.error("--update necesita un archivo .zip normal como salida")
+
+    # Si el .zip sale por stdout, los mensajes van a stderr
+    with redirect_stdout(sys.stderr if destino is sys.stdout.buffer else sys.stdout):
+        # 4. Cargar la lista de excepciones
+        excepciones = leer_excepciones(args.rules)
+
+        # 5. Llamar a la función para crear el zip. Si falla, el .zip no
+        # vale y el código de salida tiene que decirlo.
+        try:
+            crear_zip(nombre_carpeta, nombre_archivo_zip, excepciones,
+                      procesos=args.jobs, nivel=args.level, silencioso=args.quiet,
+                      actualizar=args.update, destino=destino)
+        except FileNotFoundError as e:
+            print(f"Error: No se encontró '{e.filename}'.")
+            sys.exit(1)
+        except Exception as e:
+            print(f"Ocurrió un error inesperado: {e}")
+            sys.exit(1)
+        finally:
+            if destino is not None and destino is not sys.stdout.buffer:
+                destino.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Formato de bundle indexado: todas las partes generadas en un único archivo,
+con un índice al final que lleva cada ruta a su bloque, para leer un archivo
+concreto sin recorrer el resto.
+
+Estructura:
+
+    MAGIC
+    parte 1, parte 2, ...      (cada una comprimida por separado, o sin comprimir)
+    índice JSON
+    pie: offset del índice, longitud del índice, MAGIC
+
+El índice guarda, por parte, su posición en el bundle (`offset`, `length`)
+y su tamaño sin comprimir (`size`, `lines`); por ruta, la lista de tramos
+`[parte, offset, length, first_line, line_count]` medidos en bytes y líneas
+dentro de la parte sin comprimir (`first_line` empieza en 1). Un archivo
+ocupa un tramo en los bundles de Markdown y puede ocupar varios en los de
+texto plano, que reparten los archivos grandes entre partes.
+
+Sin compresión, `Bundle` lee un tramo directamente del `mmap`; con gzip o
+zstd solo descomprime la parte que lo contiene.
+"""
+import io
+import os
+import struct
+import argparse
+from typing import Dict, List, NamedTuple, Optional
+
+MAGIC = b'MKBUNDLE'
+INDEX_VERSION = 1
+CODECS = ('none', 'gzip', 'zstd')
+
+# Offset y longitud del índice, seguidos de MAGIC
+_FOOTER = struct.Struct('<QQ8s')
+
+
+class BundlePart(NamedTuple):
+    name: str
+    # Posición de la parte (comprimida) dentro del bundle
+    offset: int
+    length: int
+    # Bytes y líneas de la parte sin comprimir
+    size: int
+    lines: int
+
+
+class Span(NamedTuple):
+    part: int
+    offset: int
+    length: int
+    first_line: int
+    line_count: int
+
+
+def _compressor(codec: str, level: Optional[int] = None):
+    """Objeto con `compress`/`flush` para el códec, o None sin compresión."""
+    if codec == 'none':
+        return None
+    if codec == 'gzip':
+        import zlib
+
+        # wbits=31: cada parte es un miembro gzip completo
+        return zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+    if codec == 'zstd':
+        return _zstandard().ZstdCompressor(level=3 if level is None else level).compressobj()
+    raise ValueError(f"Códec desconocido '{codec}' (opciones: {', '.join(CODECS)})")
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == 'gzip':
+        import zlib
+
+        return zlib.decompress(data, 31)
+    if codec == 'zstd':
+        # Las tramas escritas en streaming no guardan el tamaño final
+        return _zstandard().ZstdDecompressor().decompressobj().decompress(data)
+    raise ValueError(f"Códec desconocido '{codec}'")
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("El códec 'zstd' necesita el paquete 'zstandard' (pip install zstandard)") from None
+    return zstandard
+
+
+class _BundlePartWriter(io.TextIOBase):
+    """
+    Parte abierta de un `BundleSink`. El texto se codifica y se comprime en
+    streaming directamente en el bundle; `begin_entry` marca dónde empieza
+    el bloque de cada ruta.
+    """
+
+    def __init__(self, sink: 'BundleSink', name: str):
+        super().__init__()
+        self._sink = sink
+        self._name = name
+        self._offset = sink._file.tell()
+        self._compressor = _compressor(sink.codec, sink.level)
+        self._size = 0
+        self._lines = 0
+        self._entry = None
+
+    def write(self, text: str) -> int:
+        data = text.encode('utf-8')
+        self._sink._file.write(self._compressor.compress(data) if self._compressor else data)
+        self._size += len(data)
+        self._lines += text.count('\n')
+        return len(text)
+
+    def begin_entry(self, rel_path: str):
+        self._end_entry()
+        self._entry = (rel_path, self._size, self._lines)
+
+    def _end_entry(self):
+        if self._entry is None:
+            return
+        rel_path, size, lines = self._entry
+        span = [len(self._sink.parts), size, self._size - size, lines + 1, self._lines - lines]
+        self._sink.files.setdefault(rel_path, []).append(span)
+        self._entry = None
+
+    def close(self):
+        if self.closed:
+            return
+        self._end_entry()
+        if self._compressor:
+            self._sink._file.write(self._compressor.flush())
+        length = self._sink._file.tell() - self._offset
+        self._sink.parts.append(BundlePart(self._name, self._offset, length, self._size, self._lines))
+        self._sink._open_part = None
+        super().close()
+
+
+class BundleSink:
+    """
+    Destino que escribe todas las partes en un único bundle en `path`,
+    comprimidas por separado con `codec` ('none', 'gzip' o 'zstd'). El
+    bundle se escribe en un temporal y se completa al cerrar el destino
+    (`close` o bloque `with`), que añade el índice. La caché de bloques
+    va en el directorio del bundle.
+    """
+
+    def __init__(self, path: str, codec: str = 'none', level: Optional[int] = None):
+        if codec not in CODECS:
+            raise ValueError(f"Códec desconocido '{codec}' (opciones: {', '.join(CODECS)})")
+        if codec == 'zstd':
+            _zstandard()
+        self.bundle_path = path
+        self.codec = codec
+        self.level = level
+        self.directory = os.path.dirname(path) or '.'
+        self.output_names = (os.path.basename(path), os.path.basename(path) + '.tmp')
+        self.parts: List[BundlePart] = []
+        self.files: Dict[str, List[list]] = {}
+        self._open_part: Optional[_BundlePartWriter] = None
+        os.makedirs(self.directory, exist_ok=True)
+        self._tmp_path = f"{path}.tmp"
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(MAGIC)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def open(self, name: str) -> _BundlePartWriter:
+        if self._open_part is not None:
+            raise RuntimeError(f"La parte '{self._open_part._name}' del bundle sigue abierta")
+        self._open_part = _BundlePartWriter(self, name)
+        return self._open_part
+
+    def close(self):
+        if self._file.closed:
+            return
+        import json
+
+        if self._open_part is not None:
+            self._open_part.close()
+        index = json.dumps({
+            'version': INDEX_VERSION,
+            'codec': self.codec,
+            'parts': [part._asdict() for part in self.parts],
+            'files': self.files,
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        index_offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(_FOOTER.pack(index_offset, len(index), MAGIC))
+        self._file.close()
+        os.replace(self._tmp_path, self.bundle_path)
+
+    def __enter__(self) -> 'BundleSink':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Bundle:
+    """
+    Lector de bundles. El archivo se mapea en memoria y solo se interpreta
+    el índice; `read` devuelve el bloque de una ruta y `read_part` una parte
+    entera. Se guarda descomprimida la última parte leída.
+    """
+
+    def __init__(self, path: str):
+        import json
+        import mmap
+
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._map) < len(MAGIC) + _FOOTER.size or self._map[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"'{path}' no es un bundle")
+            index_offset, index_length, magic = _FOOTER.unpack_from(self._map, len(self._map) - _FOOTER.size)
+            if magic != MAGIC:
+                raise ValueError(f"'{path}' no es un bundle completo")
+            index = json.loads(self._map[index_offset:index_offset + index_length])
+            if index.get('version') != INDEX_VERSION:
+                raise ValueError(f"El bundle '{path}' tiene una versión no soportada")
+        except Exception:
+            self._map.close()
+            raise
+        self.codec: str = index['codec']
+        self.parts = [BundlePart(**part) for part in index['parts']]
+        self._files: Dict[str, List[list]] = index['files']
+        self._cached_part: Optional[int] = None
+        self._cached_data = b''
+
+    def names(self) -> List[str]:
+        """Rutas del bundle, en el orden en que se escribieron."""
+        return list(self._files)
+
+    def __contains__(self, rel_path: str) -> bool:
+        return rel_path in self._files
+
+    def spans(self, rel_path: str) -> List[Span]:
+        try:
+            return [Span(*span) for span in self._files[rel_path]]
+        except KeyError:
+            raise KeyError(f"'{rel_path}' no está en el bundle") from None
+
+    def _part_bytes(self, index: int):
+        part = self.parts[index]
+        raw = self._map[part.offset:part.offset + part.length]
+        if self.codec == 'none':
+            return raw
+        if self._cached_part != index:
+            self._cached_data = _decompress(self.codec, raw)
+            self._cached_part = index
+        return self._cached_data
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        chunks = []
+        for span in self.spans(rel_path):
+            if self.codec == 'none':
+                start = self.parts[span.part].offset + span.offset
+                chunks.append(self._map[start:start + span.length])
+            else:
+                chunks.append(self._part_bytes(span.part)[span.offset:span.offset + span.length])
+        return b''.join(chunks)
+
+    def read(self, rel_path: str) -> str:
+        """Bloque (o tramos) de `rel_path`, tal como se escribieron en las partes."""
+        return self.read_bytes(rel_path).decode('utf-8')
+
+    def read_part(self, name: str) -> str:
+        for index, part in enumerate(self.parts):
+            if part.name == name:
+                return bytes(self._part_bytes(index)).decode('utf-8')
+        raise KeyError(f"La parte '{name}' no está en el bundle")
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self) -> 'Bundle':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """Punto de entrada de `python -m maketools extract`."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Extrae bloques de un bundle sin leer el resto del archivo."
+    )
+    parser.add_argument("bundle", help="Ruta del bundle")
+    parser.add_argument("rutas", nargs="*", help="Rutas relativas a extraer (sin rutas, se listan)")
+    parser.add_argument(
+        "--part",
+        action="append",
+        default=[],
+        help="Extraer una parte entera por su nombre (se puede repetir)"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        help="Directorio donde escribir cada bloque en su ruta relativa (por defecto, stdout)"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        bundle = Bundle(args.bundle)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"Error: {e}\n")
+
+    with bundle:
+        if not args.rutas and not args.part:
+            for rel_path in bundle.names():
+                for span in bundle.spans(rel_path):
+                    last_line = span.first_line + span.line_count - 1
+                    print(f"{rel_path}\t{bundle.parts[span.part].name}\t"
+                          f"líneas {span.first_line}-{last_line}\t{span.length} bytes")
+            return
+
+        missing = [rel_path for rel_path in args.rutas if rel_path not in bundle]
+        if missing:
+            parser.exit(1, "Error: no están en el bundle: " + ", ".join(missing) + "\n")
+
+        blocks = [(rel_path, bundle.read(rel_path)) for rel_path in args.rutas]
+        try:
+            blocks += [(name, bundle.read_part(name)) for name in args.part]
+        except KeyError as e:
+            parser.exit(1, f"Error: {e.args[0]}\n")
+
+        for name, text in blocks:
+            if args.output is None:
+                print(text, end='')
+                continue
+            target = os.path.join(args.output, name)
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"Extraído: {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import threading
+from typing import Iterable, NamedTuple, Optional
+
+from maketools.scanner import Entry
+from maketools.sinks import state_file_stem
+
+
+def content_hasher():
+    """Hasher incremental equivalente a `content_digest`, para leer en streaming."""
+    import hashlib
+
+    return hashlib.blake2b(digest_size=16)
+
+
+def content_digest(content: str) -> str:
+    """Hash rápido del contenido de un archivo (BLAKE2b de 128 bits)."""
+    hasher = content_hasher()
+    hasher.update(content.encode('utf-8', errors='surrogatepass'))
+    return hasher.hexdigest()
+
+
+class CachedBlock(NamedTuple):
+    block: str
+    line_count: int
+    digest: str
+    # False si el bloque se ha reutilizado de la caché sin leer el archivo
+    fresh: bool
+
+
+class BlockCache:
+    """
+    Caché en disco (SQLite) de los bloques ya generados por un script.
+
+    Cada fila asocia la ruta relativa de un archivo con su tamaño, su
+    `mtime_ns`, el hash de su contenido, el bloque renderizado y su número de
+    líneas. Si el tamaño y la fecha del manifiesto coinciden, el bloque se
+    reutiliza sin volver a leer el archivo.
+
+    `tool` separa las filas de cada script; `version` debe cambiar cuando lo
+    haga el formato del bloque (o las opciones que lo afectan) para invalidar
+    las filas antiguas.
+    """
+
+    def __init__(self, path: str, tool: str, version: str = '1'):
+        self.path = path
+        self.namespace = f"{tool}:{version}"
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Las lecturas pueden llegar desde los hilos de --jobs
+        import sqlite3
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blocks ("
+            " namespace TEXT NOT NULL,"
+            " rel_path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " block TEXT NOT NULL,"
+            " line_count INTEGER NOT NULL,"
+            " PRIMARY KEY (namespace, rel_path))"
+        )
+        # Filas de versiones anteriores del mismo script
+        self._conn.execute(
+            "DELETE FROM blocks WHERE namespace LIKE ? AND namespace != ?",
+            (f"{tool}:%", self.namespace),
+        )
+
+    def get(self, entry: Entry) -> Optional[CachedBlock]:
+        """Devuelve el bloque guardado si el archivo no ha cambiado."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest, block, line_count FROM blocks"
+                " WHERE namespace = ? AND rel_path = ?",
+                (self.namespace, entry.rel_path),
+            ).fetchone()
+            if row is None or row[0] != entry.size or row[1] != entry.mtime_ns:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return CachedBlock(row[3], row[4], row[2], False)
+
+    def put(self, entry: Entry, cached: CachedBlock):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blocks"
+                " (namespace, rel_path, size, mtime_ns, digest, block, line_count)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.namespace, entry.rel_path, entry.size, entry.mtime_ns,
+                 cached.digest, cached.block, cached.line_count),
+            )
+
+    def prune(self, seen_paths: Iterable[str]) -> int:
+        """Elimina las filas de archivos que ya no existen o ahora se excluyen."""
+        seen = set(seen_paths)
+        with self._lock:
+            stored = [row[0] for row in self._conn.execute(
+                "SELECT rel_path FROM blocks WHERE namespace = ?", (self.namespace,)
+            )]
+            stale = [(self.namespace, p) for p in stored if p not in seen]
+            self._conn.executemany(
+                "DELETE FROM blocks WHERE namespace = ? AND rel_path = ?", stale
+            )
+        return len(stale)
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+def cache_path_for(directory: str) -> str:
+    """Ruta del archivo de caché de `directory`, junto a los archivos generados."""
+    return f".{state_file_stem(directory)}_cache.sqlite"
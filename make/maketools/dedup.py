@@ -0,0 +1,74 @@
+from typing import Dict, Optional, Set
+
+from maketools.cache import content_hasher
+
+
+class DuplicateIndex:
+    """
+    Índice de contenidos ya emitidos, por hash (el `digest` de
+    `CachedBlock`). La primera aparición de un contenido se registra con
+    `add`; las siguientes se sustituyen por una referencia a esa ruta y el
+    ahorro se acumula con `record_saving`.
+
+    Además guarda los tamaños de lo ya emitido: un archivo grande solo se
+    hashea antes de emitirlo si hay otro del mismo tamaño (`has_size`).
+    """
+
+    def __init__(self):
+        self._first: Dict[str, str] = {}
+        self._sizes: Set[int] = set()
+        self.duplicates = 0
+        self.bytes_saved = 0
+        self.lines_saved = 0
+
+    def original(self, digest: str) -> Optional[str]:
+        """Ruta de la primera aparición de `digest`, o None si es nuevo."""
+        return self._first.get(digest) if digest else None
+
+    def add(self, digest: str, rel_path: str, size: int):
+        # Sin hash (binarios, errores) no hay nada que deduplicar
+        if digest and digest not in self._first:
+            self._first[digest] = rel_path
+            self._sizes.add(size)
+
+    def has_size(self, size: int) -> bool:
+        return size in self._sizes
+
+    def record_saving(self, bytes_saved: int, lines_saved: int):
+        self.duplicates += 1
+        self.bytes_saved += max(bytes_saved, 0)
+        self.lines_saved += max(lines_saved, 0)
+
+
+class StreamingDigest:
+    """
+    Hash de un texto que se lee por líneas, igual que `content_digest` sobre
+    el texto completo. Quien lee el archivo marca `complete` al terminar; un
+    hash incompleto (archivo binario o error de lectura) no debe registrarse.
+    """
+    __slots__ = ('_hasher', 'lines', 'complete')
+
+    def __init__(self):
+        self._hasher = content_hasher()
+        self.lines = 0
+        self.complete = False
+
+    def update(self, text: str):
+        self._hasher.update(text.encode('utf-8', errors='surrogatepass'))
+        self.lines += len(text.splitlines())
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
+def file_text_digest(path: str) -> StreamingDigest:
+    """
+    Hashea un archivo de texto en streaming (con saltos de línea
+    universales), sin guardarlo en memoria.
+    """
+    digest = StreamingDigest()
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            digest.update(line)
+    digest.complete = True
+    return digest
@@ -0,0 +1,752 @@
+import os
+import random
+import string
+import argparse
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, TextIO, Tuple
+from datetime import datetime
+
+from maketools.cache import BlockCache, CachedBlock, cache_path_for, content_digest
+from maketools.dedup import DuplicateIndex
+from maketools.matcher import ExclusionMatcher, RulesArg, build_matcher
+from maketools.parallel import DEFAULT_MAX_INFLIGHT_BYTES, ordered_map
+from maketools.scanner import Entry, iter_files, scan_tree
+from maketools.sinks import Sink, SinkArg, as_sink, begin_entry
+from maketools.sniff import DEFAULT_MAX_FILE_BYTES, TEXT, guess_language, read_text
+from maketools.tokens import TokenEstimator, get_estimator, pack_first_fit_decreasing
+from maketools.treeindex import TreeIndex
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+def get_language_from_extension(file_name: str, content: str = '') -> str:
+    """
+    Busca el lenguaje de programación basado en la extensión del archivo.
+    Esta versión maneja correctamente los "dotfiles".
+    Si la extensión no se encuentra, se deduce a partir del contenido.
+    """
+    extension_map = {
+        ".py": "python",
+        ".js": "javascript",
+        ".ts": "typescript",
+        ".java": "java",
+        ".c": "c",
+        ".cpp": "cpp",
+        ".cs": "csharp",
+        ".go": "go",
+        ".rs": "rust",
+        ".rb": "ruby",
+        ".php": "php",
+        ".html": "html",
+        ".css": "css",
+        ".scss": "scss",
+        ".sql": "sql",
+        ".json": "json",
+        ".xml": "xml",
+        ".md": "markdown",
+        ".sh": "shell",
+        ".bat": "batch",
+        ".yaml": "yaml",
+        ".yml": "yaml",
+        ".dockerignore": "dockerignore",
+        ".prettierrc": "json",
+        ".lock": "jsonc",
+        ".gitkeep": "plaintext",
+        ".svg": "svg",
+        ".txt": "plaintext",
+        ".svelte": "svelte",
+        ".editorconfig": "ini",
+        ".envrc": "shell",
+        ".nvmrc": "text",
+        ".python-version": "text",
+        ".mjs": "javascript",
+        ".toml": "toml",
+        ".mermaid": "mermaid",
+        ".empty": "text",
+        ".cjs": "javascript",
+        ".tsx": ".tsx",
+        ".jsx": "javascript",
+        ".cfg": "ini",
+        ".example": ".env",
+        ".env": ".env",
+        ".ini": "ini",
+        ".webmanifest": "json",
+        ".flow": "javascript",
+        ".cargo-lock": "toml",
+        ".hcl": "hcl",
+        ".tf": "hcl",
+        ".mod": "go",
+        ".sum": "go",
+        ".eslintignore": "text",
+        ".eslintrc": "json",
+        ".sequelizerc": "javascript",
+        ".xsd": "xml",
+        ".pug": "pug",
+        ".j2": "jinja2",
+        ".tfvars": "terraform",
+        ".linux": "text",
+        ".macos": "text",
+        ".windows": "text",
+    }
+
+    base, ext = os.path.splitext(file_name)
+    extension_to_check = base if not ext and base.startswith('.') else ext
+
+    if extension_to_check in extension_map:
+        return extension_map[extension_to_check]
+    return guess_language(content)
+
+
+def generate_tree_structure(manifest: List[Entry]) -> str:
+    """
+    Genera una cadena con la estructura de árbol a partir del manifiesto,
+    con `├──`/`└──` según la posición de cada entrada (ver `TreeIndex`).
+    """
+    return "\n".join(TreeIndex.from_entries(manifest).iter_ascii())
+
+def render_root_header(base_name: str, manifest: List[Entry]) -> str:
+    """Cabecera de la primera parte, con el árbol del directorio."""
+    return (
+        f"# Root folder: `{base_name}`\n\n"
+        f"## Root folder Structure\n\n"
+        f"```\n{generate_tree_structure(manifest)}\n```\n\n"
+        f"---\n\n"
+    )
+
+def render_continuation_header(base_name: str, part_number: int) -> str:
+    return (
+        f"# Rool folder: `{base_name}` (Part {part_number})\n\n"
+        f"## File Contents (Continued)\n\n"
+        f"---\n\n"
+    )
+
+def render_file_header(entry: Entry) -> str:
+    return (
+        f"## File: `{entry.rel_path}`\n\n"
+        f"Metadata:\n"
+        f"- Size: {entry.size} bytes\n"
+        f"- Last Modified: {datetime.fromtimestamp(entry.mtime).strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    )
+
+def render_duplicate_block(entry: Entry, original: str) -> str:
+    """Bloque corto para un archivo con el mismo contenido que `original`."""
+    return (
+        f"{render_file_header(entry)}"
+        f"Content: identical to `{original}`.\n\n"
+        f"---\n\n"
+    )
+
+def dedup_block(entry: Entry, rendered: CachedBlock, duplicates: Optional[DuplicateIndex]) -> CachedBlock:
+    """
+    Sustituye el bloque por una referencia si su contenido ya apareció antes
+    (y la referencia es más corta); si no, registra el contenido como primera
+    aparición.
+    """
+    if duplicates is None or not rendered.digest:
+        return rendered
+    original = duplicates.original(rendered.digest)
+    if original is None:
+        duplicates.add(rendered.digest, entry.rel_path, entry.size)
+        return rendered
+
+    reference = render_duplicate_block(entry, original)
+    saved = len(rendered.block.encode('utf-8')) - len(reference.encode('utf-8'))
+    if saved <= 0:
+        return rendered
+    line_count = reference.count('\n')
+    duplicates.record_saving(saved, rendered.line_count - line_count)
+    return CachedBlock(reference, line_count, rendered.digest, rendered.fresh)
+
+def render_file_block(directory: str, entry: Entry, cache: Optional[BlockCache] = None,
+                      max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+                      skip_binary: bool = False) -> CachedBlock:
+    """
+    Lee un archivo del manifiesto y devuelve su bloque Markdown completo
+    (cabecera con metadatos, contenido y separador).
+    Si `cache` contiene el bloque y el archivo no ha cambiado, no se lee.
+    Los archivos binarios o mayores que `max_file_bytes` se detectan con los
+    primeros bytes, sin leerlos enteros, y se resumen (o se omiten con
+    `skip_binary`, devolviendo un bloque vacío).
+    """
+    if cache is not None:
+        cached = cache.get(entry)
+        if cached is not None:
+            return cached
+
+    sniffed, content = read_text(os.path.join(directory, entry.rel_path), entry.size, max_file_bytes)
+
+    file_header = render_file_header(entry)
+
+    if sniffed.kind != TEXT:
+        if skip_binary:
+            file_block = ''
+        else:
+            file_block = (
+                f"{file_header}"
+                f"Content omitted: {sniffed.description}.\n\n"
+                f"---\n\n"
+            )
+        # Sin contenido no hay hash: estos bloques nunca se consideran duplicados
+        rendered = CachedBlock(file_block, file_block.count('\n'), '', True)
+    else:
+        language = get_language_from_extension(entry.name, content)
+
+        if language == "markdown":
+            file_content_block = f"{content}\n\n"
+        else:
+            file_content_block = (
+                f"```{language}\n"
+                f"{content}\n"
+                f"```\n\n"
+            )
+
+        file_block = (
+            f"{file_header}"
+            f"Content:\n\n"
+            f"{file_content_block}"
+            f"---\n\n"
+        )
+        rendered = CachedBlock(file_block, file_block.count('\n'), content_digest(content), True)
+
+    if cache is not None:
+        cache.put(entry, rendered)
+    return rendered
+
+def open_block_cache(sink: Sink, directory: str, matcher: ExclusionMatcher,
+                     max_file_bytes: Optional[int], skip_binary: bool) -> Optional[BlockCache]:
+    """Caché de bloques junto a las partes (no hay caché sin directorio)."""
+    if sink.directory is None:
+        return None
+    cache_file = sink.path(cache_path_for(directory))
+    matcher.add_name(os.path.basename(cache_file))
+    # Los bloques resumidos dependen del límite de tamaño y de skip_binary
+    return BlockCache(cache_file, 'markdown', f"3:{max_file_bytes or 0}:{int(skip_binary)}")
+
+def part_measure(max_lines: int, max_tokens: Optional[int],
+                 estimator: Optional[TokenEstimator]) -> Tuple[int, Callable[[str], int]]:
+    """Límite de cada parte y función que mide un texto (en líneas o en tokens)."""
+    if max_tokens:
+        return max_tokens, estimator.count
+    return max_lines, lambda text: text.count('\n')
+
+def process_directory(directory: str, max_lines: int = 50000, use_gitignore: bool = False,
+                      jobs: int = 1, max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+                      use_cache: bool = True, max_tokens: Optional[int] = None,
+                      estimator: Optional[TokenEstimator] = None, pack: bool = False,
+                      max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES, skip_binary: bool = False,
+                      dedup: bool = False, rules: RulesArg = 'exceptions', sink: SinkArg = None,
+                      executor: Optional['Executor'] = None) -> List[str]:
+    """
+    Procesa un directorio, creando archivos Markdown semánticos con la estructura del proyecto,
+    metadatos y el contenido completo de los archivos.
+    Con `use_gitignore` también se aplican las reglas del .gitignore del directorio.
+    Con `jobs > 1` los archivos se leen y formatean en un pool de hilos, con como mucho
+    `max_inflight_bytes` pendientes; los bloques se escriben en el mismo orden.
+    Con `use_cache` los bloques de archivos sin cambios se reutilizan de la caché
+    `.<nombre>_<hash>_cache.sqlite` del directorio actual.
+    Con `max_tokens` cada parte se limita a ese número de tokens estimados por
+    `estimator` (en lugar de `max_lines`), y con `pack` los archivos se reparten
+    entre las partes de mayor a menor para generar menos partes.
+    Los archivos binarios o mayores que `max_file_bytes` se resumen en una línea,
+    o se omiten con `skip_binary`.
+    Con `dedup`, los archivos con un contenido ya emitido se sustituyen por una
+    referencia a la primera ruta (por hash del contenido).
+
+    `rules` son las reglas de exclusión (ver `load_rules`; por defecto el
+    archivo `exceptions` del directorio actual) y `sink` el destino de las
+    partes (por defecto el directorio actual; con un `BundleSink`, todas van
+    a un único bundle indexado por ruta). Con `executor` se usa ese pool
+    de hilos en lugar de crear uno. Devuelve los nombres de las partes.
+    """
+    base_name = os.path.basename(os.path.normpath(directory))
+    if not os.path.isdir(directory):
+        print(f"Error: {directory} no es un directorio válido")
+        return []
+
+    gitignore = os.path.join(directory, '.gitignore') if use_gitignore else None
+    matcher = build_matcher(rules, gitignore)
+    sink = as_sink(sink)
+    for name in sink.output_names:
+        matcher.add_name(name)
+
+    cache = open_block_cache(sink, directory, matcher, max_file_bytes, skip_binary) if use_cache else None
+
+    # Con max_tokens las partes se miden en tokens estimados en vez de en líneas
+    if max_tokens:
+        estimator = estimator or get_estimator()
+    part_limit, measure = part_measure(max_lines, max_tokens, estimator)
+
+    def block_cost(rendered: CachedBlock) -> int:
+        return estimator.count(rendered.block) if max_tokens else rendered.line_count
+
+    output_file: Optional[TextIO] = None
+    part_counter = 1
+    current_size = 0
+    generated_files = []
+
+    def create_new_part_file():
+        nonlocal output_file, part_counter, current_size
+        if output_file:
+            output_file.close()
+
+        random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=5))
+        file_name = f"{base_name}_{random_suffix}.md"
+        generated_files.append(file_name)
+        # Asegurarse de que el propio script no procese los archivos que genera
+        matcher.add_name(file_name)
+
+
+        output_file = sink.open(file_name)
+        print(f"Generando nuevo archivo: {file_name}")
+        part_counter += 1
+        current_size = 0
+
+    def start_continuation_part():
+        nonlocal current_size
+        create_new_part_file()
+        new_part_header = render_continuation_header(base_name, part_counter - 1)
+        output_file.write(new_part_header)
+        current_size += measure(new_part_header)
+
+    duplicates = DuplicateIndex() if dedup else None
+
+    def render_all(entries):
+        return ordered_map(
+            lambda entry: render_file_block(directory, entry, cache, max_file_bytes, skip_binary),
+            entries,
+            jobs=jobs,
+            weight=lambda entry: entry.size,
+            max_inflight_bytes=max_inflight_bytes,
+            executor=executor,
+        )
+
+    try:
+        create_new_part_file()
+
+        # Un único recorrido del disco alimenta el árbol y el contenido
+        manifest = scan_tree(directory, matcher)
+
+        header = render_root_header(base_name, manifest)
+        output_file.write(header)
+        current_size += measure(header)
+
+        if pack:
+            # Primera pasada: solo se calcula el coste de cada bloque. La segunda
+            # vuelve a renderizar cada parte (desde la caché si está activa).
+            files = list(iter_files(manifest))
+            # Los duplicados se deciden en orden del manifiesto, así que la
+            # primera aparición puede acabar en una parte posterior
+            references = {}
+            costs = []
+            for i, rendered in enumerate(render_all(files)):
+                deduped = dedup_block(files[i], rendered, duplicates)
+                if deduped is not rendered:
+                    references[i] = deduped
+                costs.append(block_cost(deduped))
+            # Las partes siguientes empiezan con la cabecera de continuación
+            # (medida con el mayor número de parte posible)
+            continuation = measure(render_continuation_header(base_name, len(files) + 1))
+            bins = pack_first_fit_decreasing(costs, part_limit, current_size, continuation)
+
+            for part_index, indices in enumerate(bins):
+                if part_index > 0:
+                    start_continuation_part()
+                for i, rendered in zip(indices, render_all(files[i] for i in indices)):
+                    rendered = references.get(i, rendered)
+                    if not rendered.block:
+                        continue
+                    begin_entry(output_file, files[i].rel_path)
+                    output_file.write(rendered.block)
+                    current_size += block_cost(rendered)
+        else:
+            files = list(iter_files(manifest))
+            for entry, rendered in zip(files, render_all(files)):
+                rendered = dedup_block(entry, rendered, duplicates)
+                file_block = rendered.block
+                if not file_block:
+                    continue
+                cost = block_cost(rendered)
+
+                if current_size + cost > part_limit and current_size > 0:
+                    start_continuation_part()
+
+                begin_entry(output_file, entry.rel_path)
+                output_file.write(file_block)
+                current_size += cost
+
+        if cache is not None:
+            cache.prune(entry.rel_path for entry in iter_files(manifest))
+            print(f"Caché: {cache.hits} archivo(s) reutilizado(s), {cache.misses} leído(s).")
+        if duplicates is not None:
+            print(f"Duplicados: {duplicates.duplicates} archivo(s), "
+                  f"{duplicates.bytes_saved:,} bytes y {duplicates.lines_saved:,} líneas ahorrados.")
+
+    except Exception as e:
+        print(f"Ha ocurrido un error inesperado: {e}")
+        return generated_files
+
+    finally:
+        if output_file and not output_file.closed:
+            output_file.close()
+        if cache is not None:
+            cache.close()
+
+    print(f"\nProceso completado. Se generaron {part_counter - 1} archivo(s) Markdown para '{base_name}'.")
+    return generated_files
+
+
+def watch_part_name(base_name: str, part_number: int) -> str:
+    """Nombre fijo de cada parte en modo watch, para que no cambie entre actualizaciones."""
+    return f"{base_name}_part{part_number}.md"
+
+class LiveParts:
+    """
+    Partes de `watch_directory`. Recuerda qué archivos van en cada parte,
+    su coste y el hash del texto escrito, de modo que en cada actualización
+    solo se vuelven a renderizar y escribir las partes afectadas.
+
+    Los archivos no cambian de parte mientras quepan: uno nuevo se añade a
+    la parte del archivo que lo precede y uno borrado solo deja hueco.
+    Cuando una parte se pasa del límite o se queda vacía, se reparten de
+    nuevo esa parte y las siguientes, y aun así solo se reescriben las que
+    cambian.
+    """
+
+    def __init__(self, directory: str, base_name: str, sink: Sink, cache: Optional[BlockCache],
+                 part_limit: int, measure: Callable[[str], int],
+                 max_file_bytes: Optional[int], skip_binary: bool):
+        self.directory = directory
+        self.base_name = base_name
+        self.sink = sink
+        self.cache = cache
+        self.part_limit = part_limit
+        self.measure = measure
+        self.max_file_bytes = max_file_bytes
+        self.skip_binary = skip_binary
+        self.entries: Dict[str, Entry] = {}
+        self.costs: Dict[str, int] = {}
+        self.layout: List[List[str]] = []
+        self.digests: List[str] = []
+        self.header = ''
+
+    def _render(self, rel_path: str) -> CachedBlock:
+        return render_file_block(self.directory, self.entries[rel_path], self.cache,
+                                 self.max_file_bytes, self.skip_binary)
+
+    def _measure_file(self, rel_path: str):
+        self.costs[rel_path] = self.measure(self._render(rel_path).block)
+
+    def _part_header(self, index: int) -> str:
+        return self.header if index == 0 else render_continuation_header(self.base_name, index + 1)
+
+    def _part_cost(self, index: int) -> int:
+        return self.measure(self._part_header(index)) + sum(self.costs[p] for p in self.layout[index])
+
+    def _relayout(self, start: int = 0):
+        """Reparto voraz (igual que `process_directory`) de las partes desde `start`."""
+        files = [p for part in self.layout[start:] for p in part]
+        self.layout = self.layout[:start] + [[]]
+        current_size = self.measure(self._part_header(start))
+        for rel_path in files:
+            cost = self.costs[rel_path]
+            if current_size + cost > self.part_limit and current_size > 0:
+                self.layout.append([])
+                current_size = self.measure(render_continuation_header(self.base_name, len(self.layout)))
+            self.layout[-1].append(rel_path)
+            current_size += cost
+
+    def _write(self, indices) -> List[int]:
+        """Escribe las partes cuyo texto ha cambiado y borra las que sobran."""
+        written = []
+        self.digests = self.digests[:len(self.layout)] + [''] * (len(self.layout) - len(self.digests))
+        for index in sorted(indices):
+            text = self._part_header(index) + ''.join(self._render(p).block for p in self.layout[index])
+            digest = content_digest(text)
+            if digest == self.digests[index]:
+                continue
+            with self.sink.open(watch_part_name(self.base_name, index + 1)) as output_file:
+                output_file.write(text)
+            self.digests[index] = digest
+            written.append(index + 1)
+        number = len(self.layout) + 1
+        while self.sink.remove(watch_part_name(self.base_name, number)):
+            number += 1
+        return written
+
+    def build(self, manifest: List[Entry]) -> List[int]:
+        self.entries = {entry.rel_path: entry for entry in iter_files(manifest)}
+        self.costs = {}
+        for rel_path in self.entries:
+            self._measure_file(rel_path)
+        self.header = render_root_header(self.base_name, manifest)
+        self.layout = [list(self.entries)]
+        self._relayout()
+        return self._write(range(len(self.layout)))
+
+    def update(self, manifest: List[Entry]) -> List[int]:
+        """Aplica un manifiesto nuevo y devuelve los números de las partes reescritas."""
+        entries = {entry.rel_path: entry for entry in iter_files(manifest)}
+        part_of = {p: index for index, part in enumerate(self.layout) for p in part}
+        dirty = set()
+
+        for rel_path in self.entries.keys() - entries.keys():
+            index = part_of.pop(rel_path)
+            self.layout[index].remove(rel_path)
+            del self.costs[rel_path]
+            dirty.add(index)
+
+        previous = self.entries
+        self.entries = entries
+        # Último archivo ya colocado y su posición (solo se busca si hace falta)
+        anchor: Optional[str] = None
+        position: Optional[Tuple[int, int]] = None
+        for rel_path, entry in entries.items():
+            old = previous.get(rel_path)
+            if old is None:
+                # Va detrás del archivo que lo precede en el manifiesto
+                if position is None:
+                    index = part_of[anchor] if anchor is not None else 0
+                    position = (index, self.layout[index].index(anchor) if anchor is not None else -1)
+                index, after = position
+                self.layout[index].insert(after + 1, rel_path)
+                position = (index, after + 1)
+                part_of[rel_path] = index
+                self._measure_file(rel_path)
+                dirty.add(index)
+                continue
+            anchor, position = rel_path, None
+            if (old.size, old.mtime_ns) != (entry.size, entry.mtime_ns):
+                self._measure_file(rel_path)
+                dirty.add(part_of[rel_path])
+
+        header = render_root_header(self.base_name, manifest)
+        if header != self.header:
+            self.header = header
+            dirty.add(0)
+
+        # Solo se reparten de nuevo las partes desde la primera que se pasa
+        # del límite o se queda vacía
+        overflow = [index for index in dirty
+                    if self._part_cost(index) > self.part_limit and len(self.layout[index]) > 1
+                    or (index > 0 and not self.layout[index])]
+        if overflow:
+            start = min(overflow)
+            self._relayout(start)
+            dirty |= set(range(start, len(self.layout)))
+        return self._write(dirty)
+
+    @property
+    def part_names(self) -> List[str]:
+        return [watch_part_name(self.base_name, number) for number in range(1, len(self.layout) + 1)]
+
+def watch_directory(directory: str, max_lines: int = 50000, use_gitignore: bool = False,
+                    use_cache: bool = True, max_tokens: Optional[int] = None,
+                    estimator: Optional[TokenEstimator] = None,
+                    max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES, skip_binary: bool = False,
+                    rules: RulesArg = 'exceptions', sink: SinkArg = None,
+                    debounce: float = 0.5, interval: float = 1.0, use_inotify: bool = True,
+                    max_updates: Optional[int] = None) -> List[str]:
+    """
+    Genera las partes Markdown de un directorio y las mantiene al día
+    mientras cambia (ver `watch.iter_changes`). Las partes tienen nombres
+    fijos (`<nombre>_part<N>.md`) y en cada actualización solo se reescriben
+    las que contienen archivos cambiados, más la primera si cambia el árbol.
+
+    Termina tras `max_updates` actualizaciones (por defecto, nunca; desde la
+    línea de comandos, con Ctrl+C). Devuelve los nombres de las partes.
+    """
+    from maketools.watch import iter_changes
+
+    base_name = os.path.basename(os.path.normpath(directory))
+    if not os.path.isdir(directory):
+        print(f"Error: {directory} no es un directorio válido")
+        return []
+
+    gitignore = os.path.join(directory, '.gitignore') if use_gitignore else None
+    matcher = build_matcher(rules, gitignore)
+    sink = as_sink(sink)
+    for name in sink.output_names:
+        matcher.add_name(name)
+    # Asegurarse de que no se procesan las partes que se van generando
+    matcher.add_rule(f"{base_name}_part*.md")
+
+    cache = open_block_cache(sink, directory, matcher, max_file_bytes, skip_binary) if use_cache else None
+    if max_tokens:
+        estimator = estimator or get_estimator()
+    part_limit, measure = part_measure(max_lines, max_tokens, estimator)
+    parts = LiveParts(directory, base_name, sink, cache, part_limit, measure, max_file_bytes, skip_binary)
+    changes_stream = None
+
+    try:
+        manifest = scan_tree(directory, matcher)
+        parts.build(manifest)
+        print(f"Generadas {len(parts.layout)} parte(s) para '{base_name}'. Vigilando cambios...")
+
+        updates = 0
+        changes_stream = iter_changes(directory, matcher, manifest, debounce, interval, use_inotify)
+        for manifest, changes in changes_stream:
+            written = parts.update(manifest)
+            if cache is not None:
+                cache.prune(parts.entries)
+            updates += 1
+            changed = len(changes.added) + len(changes.removed) + len(changes.modified)
+            rewritten = ', '.join(str(number) for number in written) or 'ninguna'
+            print(f"{datetime.now():%H:%M:%S} {changed} cambio(s); partes reescritas: {rewritten}.")
+            if max_updates is not None and updates >= max_updates:
+                break
+    except KeyboardInterrupt:
+        print("\nVigilancia detenida.")
+    finally:
+        if changes_stream is not None:
+            changes_stream.close()
+        if cache is not None:
+            cache.close()
+    return parts.part_names
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """Punto de entrada de `make-markdown.py` y de `python -m maketools markdown`."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Genera archivos Markdown con la estructura y el contenido de un directorio."
+    )
+    parser.add_argument("directorio", help="Ruta del directorio a procesar")
+    parser.add_argument(
+        "--gitignore",
+        action="store_true",
+        help="Aplicar también las reglas del .gitignore del directorio"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Número de hilos para leer y formatear archivos (por defecto 1)"
+    )
+    parser.add_argument(
+        "--max-inflight-mb",
+        type=int,
+        default=DEFAULT_MAX_INFLIGHT_BYTES // (1024 * 1024),
+        help="Límite de MB leídos y pendientes de escribir con --jobs"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="No leer ni actualizar la caché de bloques"
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=None,
+        help="Dividir las partes por tokens estimados en lugar de por líneas"
+    )
+    parser.add_argument(
+        "--tokenizer",
+        default="chars",
+        help="Estimador de tokens: 'chars', 'bytes' o la ruta de un vocabulario BPE (.tiktoken)"
+    )
+    parser.add_argument(
+        "--pack",
+        action="store_true",
+        help="Con --max-tokens, repartir los archivos de mayor a menor para generar menos partes"
+    )
+    parser.add_argument(
+        "--max-file-size",
+        type=float,
+        default=DEFAULT_MAX_FILE_BYTES / (1024 * 1024),
+        help="Tamaño máximo en MB de un archivo para incluir su contenido (0 para no limitar)"
+    )
+    parser.add_argument(
+        "--skip-binary",
+        action="store_true",
+        help="Omitir los archivos binarios o demasiado grandes en lugar de resumirlos"
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Sustituir los archivos con un contenido ya incluido por una referencia al primero"
+    )
+    parser.add_argument(
+        "--rules",
+        default="exceptions",
+        help="Archivo de excepciones (por defecto, 'exceptions' del directorio actual)"
+    )
+    parser.add_argument(
+        "--bundle",
+        choices=('none', 'gzip', 'zstd'),
+        default=None,
+        help="Escribir todas las partes en un único <directorio>.md.bundle indexado, "
+             "comprimiendo cada parte con este códec ('none' para no comprimir)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Mantener las partes al día mientras cambia el directorio (Ctrl+C para salir)"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        help="Con --watch, segundos sin cambios antes de actualizar (por defecto 0.5)"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Con --watch, segundos entre comprobaciones sin eventos (por defecto 1)"
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Con --watch, comprobar los cambios por sondeo aunque haya inotify"
+    )
+    args = parser.parse_args(argv)
+    if args.pack and not args.max_tokens:
+        parser.error("--pack requiere --max-tokens")
+    if args.watch:
+        if args.pack or args.dedup or args.bundle:
+            parser.error("--watch no admite --pack, --dedup ni --bundle")
+        watch_directory(
+            args.directorio,
+            use_gitignore=args.gitignore,
+            use_cache=not args.no_cache,
+            max_tokens=args.max_tokens,
+            estimator=get_estimator(args.tokenizer) if args.max_tokens else None,
+            max_file_bytes=int(args.max_file_size * 1024 * 1024),
+            skip_binary=args.skip_binary,
+            rules=args.rules,
+            debounce=args.debounce,
+            interval=args.poll_interval,
+            use_inotify=not args.poll,
+        )
+        return
+
+    bundle = None
+    if args.bundle:
+        from maketools.bundle import BundleSink
+
+        base_name = os.path.basename(os.path.normpath(args.directorio))
+        try:
+            bundle = BundleSink(f"{base_name}.md.bundle", args.bundle)
+        except ValueError as e:
+            parser.error(str(e))
+
+    with bundle or nullcontext():
+        process_directory(
+            args.directorio,
+            use_gitignore=args.gitignore,
+            jobs=args.jobs,
+            max_inflight_bytes=args.max_inflight_mb * 1024 * 1024,
+            use_cache=not args.no_cache,
+            max_tokens=args.max_tokens,
+            estimator=get_estimator(args.tokenizer) if args.max_tokens else None,
+            pack=args.pack,
+            max_file_bytes=int(args.max_file_size * 1024 * 1024),
+            skip_binary=args.skip_binary,
+            dedup=args.dedup,
+            rules=args.rules,
+            sink=bundle,
+        )
+
+
+if __name__ == "__main__":
+    main()
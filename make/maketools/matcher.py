@@ -0,0 +1,306 @@
+import os
+import re
+import fnmatch
+from typing import Dict, Iterable, List, Optional, Pattern, Set, Tuple, Union
+
+_GLOB_CHARS = '*?['
+
+
+def read_exceptions(file: str) -> Tuple[List[str], List[str]]:
+    """
+    Lee una lista de archivos y directorios para excluir.
+    - Ignora líneas que empiezan con '#'.
+    - Ignora comentarios en la misma línea.
+    - Separa las exclusiones en dos listas: nombres exactos y patrones (ej. *.log).
+    """
+    exact_matches = []
+    patterns = []
+    try:
+        with open(file, 'r', encoding='utf-8') as f:
+            for line in f:
+                # Ignorar comentarios y limpiar la línea
+                rule = line.split('#', 1)[0].strip()
+                if not rule:
+                    continue
+
+                # Separar patrones de nombres exactos
+                if '*' in rule or '?' in rule:
+                    patterns.append(rule)
+                else:
+                    exact_matches.append(rule)
+
+    except FileNotFoundError:
+        print(f"Info: El archivo de excepciones '{file}' no fue encontrado. No se excluirá ningún archivo.")
+
+    return exact_matches, patterns
+
+
+def _translate_path(pattern: str) -> str:
+    """Traduce un patrón de ruta estilo .gitignore a una expresión regular."""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('/**', i) and i + 3 == n:
+            out.append('/.*')
+            i += 3
+            continue
+
+        c = pattern[i]
+        if c == '*':
+            # '**' fuera de los casos anteriores equivale a '*'
+            while i + 1 < n and pattern[i + 1] == '*':
+                i += 1
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+def _compile(regexes: List[str]) -> Optional[Pattern]:
+    if not regexes:
+        return None
+    return re.compile('|'.join(f"(?:{r})" for r in regexes))
+
+
+class _RuleSet:
+    """
+    Conjunto de reglas compilado una sola vez:
+    - nombres exactos en un `set`,
+    - globs de sufijo (`*.log`) en una tabla indexada por la última extensión,
+    - el resto de globs de nombre en una única expresión regular,
+    - los patrones de ruta (`build/**`, `/dist`) en otra expresión regular.
+    """
+
+    def __init__(self):
+        self.names: Set[str] = set()
+        self.dir_names: Set[str] = set()
+        self.suffixes: Dict[str, List[str]] = {}
+        self.dir_suffixes: Dict[str, List[str]] = {}
+        self.globs: List[str] = []
+        self.dir_globs: List[str] = []
+        self.paths: List[str] = []
+        self.dir_paths: List[str] = []
+        self._compiled = False
+
+    def add(self, pattern: str, dir_only: bool, anchored: bool):
+        self._compiled = False
+
+        if anchored or '/' in pattern:
+            regex = _translate_path(pattern)
+            (self.dir_paths if dir_only else self.paths).append(regex)
+            if pattern.endswith('/**'):
+                # 'build/**' excluye también el propio directorio para podarlo
+                self.dir_paths.append(_translate_path(pattern[:-3]))
+            return
+
+        if not any(c in pattern for c in _GLOB_CHARS):
+            (self.dir_names if dir_only else self.names).add(pattern)
+            return
+
+        rest = pattern[1:]
+        if pattern.startswith('*') and '.' in rest and not any(c in rest for c in _GLOB_CHARS):
+            table = self.dir_suffixes if dir_only else self.suffixes
+            table.setdefault(rest[rest.rfind('.'):], []).append(rest)
+            return
+
+        (self.dir_globs if dir_only else self.globs).append(fnmatch.translate(pattern))
+
+    def copy(self) -> '_RuleSet':
+        """Copia independiente que reutiliza las expresiones ya compiladas."""
+        other = _RuleSet.__new__(_RuleSet)
+        other.names = set(self.names)
+        other.dir_names = set(self.dir_names)
+        other.suffixes = {k: list(v) for k, v in self.suffixes.items()}
+        other.dir_suffixes = {k: list(v) for k, v in self.dir_suffixes.items()}
+        other.globs = list(self.globs)
+        other.dir_globs = list(self.dir_globs)
+        other.paths = list(self.paths)
+        other.dir_paths = list(self.dir_paths)
+        other._compiled = self._compiled
+        if self._compiled:
+            other._glob_re, other._dir_glob_re = self._glob_re, self._dir_glob_re
+            other._path_re, other._dir_path_re = self._path_re, self._dir_path_re
+        return other
+
+    def compile(self):
+        self._glob_re = _compile(self.globs)
+        self._dir_glob_re = _compile(self.globs + self.dir_globs)
+        self._path_re = _compile(self.paths)
+        self._dir_path_re = _compile(self.paths + self.dir_paths)
+        self._compiled = True
+
+    def __bool__(self) -> bool:
+        return bool(self.names or self.dir_names or self.suffixes or self.dir_suffixes
+                    or self.globs or self.dir_globs or self.paths or self.dir_paths)
+
+    @staticmethod
+    def _suffix_match(name: str, table: Dict[str, List[str]]) -> bool:
+        dot = name.rfind('.')
+        if dot == -1:
+            return False
+        candidates = table.get(name[dot:])
+        return bool(candidates) and any(name.endswith(s) for s in candidates)
+
+    def matches(self, name: str, rel_path: str, is_dir: bool) -> bool:
+        if not self._compiled:
+            self.compile()
+
+        if name in self.names:
+            return True
+        if self.suffixes and self._suffix_match(name, self.suffixes):
+            return True
+
+        if is_dir:
+            if name in self.dir_names:
+                return True
+            if self.dir_suffixes and self._suffix_match(name, self.dir_suffixes):
+                return True
+            glob_re, path_re = self._dir_glob_re, self._dir_path_re
+        else:
+            glob_re, path_re = self._glob_re, self._path_re
+
+        if glob_re is not None and glob_re.match(name):
+            return True
+        if path_re is not None and rel_path and path_re.fullmatch(rel_path):
+            return True
+        return False
+
+
+class ExclusionMatcher:
+    """
+    Decide si un archivo o directorio debe excluirse.
+
+    Acepta la salida de `read_exceptions` y, opcionalmente, reglas estilo
+    .gitignore:
+    - `nombre/` solo aplica a directorios,
+    - `/dist` o `src/gen` se anclan a la raíz escaneada,
+    - `build/**` excluye el contenido y poda el propio directorio,
+    - `!keep.me` vuelve a incluir lo que otra regla excluía. A diferencia de
+      git, las negaciones siempre prevalecen, sin importar el orden.
+
+    Se puede pasar directamente como predicado a `scan_tree`.
+    """
+
+    def __init__(self, exact: Iterable[str] = (), patterns: Iterable[str] = ()):
+        self._exclude = _RuleSet()
+        self._keep = _RuleSet()
+        for rule in exact:
+            self.add_rule(rule)
+        for rule in patterns:
+            self.add_rule(rule)
+
+    @classmethod
+    def from_file(cls, file: str = 'exceptions') -> 'ExclusionMatcher':
+        """Construye el matcher a partir de un archivo de excepciones."""
+        return cls(*read_exceptions(file))
+
+    def copy(self) -> 'ExclusionMatcher':
+        """
+        Copia para una sola ejecución: se le pueden añadir nombres o un
+        .gitignore sin tocar el original, que se comparte entre repositorios.
+        """
+        other = ExclusionMatcher.__new__(ExclusionMatcher)
+        other._exclude = self._exclude.copy()
+        other._keep = self._keep.copy()
+        return other
+
+    def add_rule(self, rule: str):
+        """Añade una regla (nombre exacto, glob o patrón estilo .gitignore)."""
+        rule = rule.strip()
+        if not rule:
+            return
+
+        rule_set = self._exclude
+        if rule.startswith('!'):
+            rule_set = self._keep
+            rule = rule[1:]
+        elif rule.startswith('\\'):
+            rule = rule[1:]
+
+        dir_only = rule.endswith('/')
+        rule = rule.rstrip('/')
+        anchored = rule.startswith('/')
+        rule = rule.lstrip('/')
+        if rule:
+            rule_set.add(rule, dir_only, anchored)
+
+    def add_name(self, name: str):
+        """Excluye un nombre exacto, p. ej. los archivos que genera el script."""
+        self._exclude.names.add(name)
+
+    def add_gitignore(self, file: str) -> bool:
+        """
+        Añade las reglas de un archivo .gitignore. Los patrones anclados se
+        interpretan respecto a la raíz escaneada. Devuelve False si no existe.
+        """
+        try:
+            with open(file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.rstrip('\n').rstrip()
+                    if not line or line.startswith('#'):
+                        continue
+                    self.add_rule(line)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def is_excluded(self, name: str, rel_path: str = '', is_dir: bool = False) -> bool:
+        if os.sep != '/':
+            rel_path = rel_path.replace(os.sep, '/')
+        if not self._exclude.matches(name, rel_path, is_dir):
+            return False
+        return not (self._keep and self._keep.matches(name, rel_path, is_dir))
+
+    __call__ = is_excluded
+
+
+# Formas aceptadas para las reglas de exclusión en la API
+RulesArg = Union[None, str, Iterable[str], ExclusionMatcher]
+
+
+def load_rules(rules: RulesArg = None) -> ExclusionMatcher:
+    """
+    Normaliza el parámetro `rules` de la API: un matcher ya construido se
+    devuelve tal cual, una cadena es la ruta de un archivo de excepciones y
+    cualquier otro iterable es una lista de reglas. None no excluye nada.
+    """
+    if isinstance(rules, ExclusionMatcher):
+        return rules
+    if rules is None:
+        return ExclusionMatcher()
+    if isinstance(rules, str):
+        return ExclusionMatcher.from_file(rules)
+    return ExclusionMatcher(patterns=rules)
+
+
+def build_matcher(rules: RulesArg = 'exceptions',
+                  gitignore: Optional[str] = None) -> ExclusionMatcher:
+    """
+    Crea el matcher de una ejecución a partir de `rules` (ver `load_rules`;
+    por defecto, el archivo `exceptions` del directorio actual) y, si se
+    indica, de un .gitignore. Un matcher compartido se copia, así que los
+    nombres que añada cada script no se acumulan entre ejecuciones.
+    """
+    matcher = load_rules(rules)
+    if matcher is rules:
+        matcher = matcher.copy()
+    if gitignore and not matcher.add_gitignore(gitignore):
+        print(f"Info: No se encontró '{gitignore}'. Se usarán solo las excepciones.")
+    return matcher
@@ -0,0 +1,73 @@
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+DEFAULT_MAX_INFLIGHT_BYTES = 64 * 1024 * 1024
+
+
+def ordered_map(func: Callable[[T], R], items: Iterable[T], jobs: int = 1,
+                weight: Optional[Callable[[T], int]] = None,
+                max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+                executor: Optional['Executor'] = None) -> Iterator[R]:
+    """
+    Aplica `func` a cada elemento con un pool de hilos y devuelve los
+    resultados en el mismo orden de entrada.
+
+    - `weight` estima los bytes que ocupará cada resultado (p. ej. el tamaño
+      del archivo). No se encolan más tareas mientras la suma de pesos
+      pendientes supere `max_inflight_bytes`, aunque siempre hay al menos una
+      en curso para que un archivo enorme no bloquee el proceso.
+    - Las excepciones de `func` se relanzan al llegar a su posición, por lo
+      que el consumidor las ve en el mismo punto que en la versión secuencial.
+    - Con `jobs <= 1` y sin `executor` no se crea ningún hilo.
+    """
+    if jobs <= 1 and executor is None:
+        for item in items:
+            yield func(item)
+        return
+
+    own_executor = executor is None
+    if own_executor:
+        from concurrent.futures import ThreadPoolExecutor
+
+        pool = ThreadPoolExecutor(max_workers=jobs)
+    else:
+        pool = executor
+    pending = deque()
+    inflight = 0
+    iterator = iter(items)
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and (not pending or inflight < max_inflight_bytes):
+                if len(pending) >= max(jobs, 1) * 4:
+                    break
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                cost = weight(item) if weight else 0
+                pending.append((pool.submit(func, item), cost))
+                inflight += cost
+
+            if not pending:
+                return
+
+            future, cost = pending.popleft()
+            try:
+                result = future.result()
+            finally:
+                inflight -= cost
+            yield result
+    finally:
+        for future, _ in pending:
+            future.cancel()
+        if own_executor:
+            pool.shutdown(wait=True)
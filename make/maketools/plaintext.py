@@ -0,0 +1,389 @@
+import io
+import os
+import argparse
+from contextlib import nullcontext
+from itertools import islice
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from maketools.cache import BlockCache, CachedBlock, cache_path_for, content_digest
+from maketools.dedup import DuplicateIndex, StreamingDigest, file_text_digest
+from maketools.matcher import RulesArg, build_matcher
+from maketools.scanner import Entry, iter_files, scan_tree
+from maketools.sinks import Sink, SinkArg, as_sink, begin_entry
+from maketools.sniff import DEFAULT_MAX_FILE_BYTES, SNIFF_BYTES, TEXT, SniffResult, read_text, sniff_head
+from maketools.tokens import TokenEstimator, get_estimator
+
+# Larger files are streamed line by line and never kept in the cache
+CACHE_MAX_BYTES = 1024 * 1024
+
+def create_new_file(base_name: str, counter: int, sink: Optional[Sink] = None) -> tuple:
+    import hashlib
+
+    hash_object = hashlib.sha1(f"{base_name}_{counter}".encode('utf-8'))
+    hash_5_digits = hash_object.hexdigest()[:5]
+    file_name = f'{base_name}_{hash_5_digits}_{counter}.txt'
+    return as_sink(sink).open(file_name), file_name, counter + 1
+
+def chunk_header_prefix(relative_path: str) -> str:
+    """
+    Serialize a file's chunk header once. PartWriter appends each chunk's
+    index and closing quotes, matching json.dumps of the full dict.
+    """
+    import json
+
+    info = json.dumps({"relativePath": relative_path}, ensure_ascii=False)
+    return f'"""{info[:-1]}, "index": '
+
+class PartWriter:
+    """
+    Writes chunks straight into the current part file instead of buffering
+    them. A part is opened on its first chunk and closed as soon as it
+    reaches `max_lines`, so memory use does not depend on the input size.
+
+    With `max_tokens`, parts are measured in tokens estimated line by line
+    by `estimator` instead of in lines.
+    """
+
+    def __init__(self, base_name: str, max_lines: int, max_tokens: Optional[int] = None,
+                 estimator: Optional[TokenEstimator] = None, sink: SinkArg = None):
+        self.base_name = base_name
+        self.sink = as_sink(sink)
+        self.file_names: List[str] = []
+        self.max_lines = max_lines
+        self.max_tokens = max_tokens
+        self.estimator = (estimator or get_estimator()) if max_tokens else None
+        self.file_counter = 1
+        # Lines (or tokens) already in the current part
+        self.current_size = 0
+        self.current_file: Optional[TextIO] = None
+        # File being written and index of its next chunk
+        self.rel_path: Optional[str] = None
+        self.chunk_index = 0
+        # Line that did not fit in the previous chunk (token mode only)
+        self._pending: Optional[str] = None
+
+    def _header(self, header_prefix: str) -> str:
+        return f'{header_prefix}{self.chunk_index}}}"""\n\n'
+
+    def _write_header(self, header_prefix: str):
+        if self.current_file is None:
+            self.current_file, file_name, self.file_counter = create_new_file(
+                self.base_name, self.file_counter, self.sink)
+            self.file_names.append(file_name)
+        if self.rel_path is not None:
+            begin_entry(self.current_file, self.rel_path)
+        self.current_file.write(self._header(header_prefix))
+
+    def _close_part(self):
+        self.current_file.close()
+        self.current_file = None
+        self.current_size = 0
+
+    def _take_token_chunk(self, header_prefix: str, lines: Iterator[str]) -> Tuple[List[str], int]:
+        """
+        Take lines until the next one would overflow the part's token budget.
+        A line that does not fit even as the first of the chunk is left
+        pending (with an empty chunk) unless the part is still empty: only
+        an empty part takes a line larger than the budget.
+        """
+        chunk: List[str] = []
+        cost = self.estimator.count(self._header(header_prefix))
+        while True:
+            if self._pending is not None:
+                line, self._pending = self._pending, None
+            else:
+                line = next(lines, None)
+                if line is None:
+                    break
+            line_cost = self.estimator.count(line + '\n')
+            if (chunk or self.current_size > 0) and self.current_size + cost + line_cost > self.max_tokens:
+                self._pending = line
+                break
+            chunk.append(line)
+            cost += line_cost
+        return chunk, cost
+
+    def write_lines(self, header_prefix: str, lines: Iterator[str]):
+        """Split a file's lines into chunks that fill the remaining room of each part."""
+        self.chunk_index = 0
+        self._pending = None
+        while True:
+            if self.max_tokens:
+                chunk, cost = self._take_token_chunk(header_prefix, lines)
+            else:
+                available_lines = max(1, self.max_lines - self.current_size)
+                chunk = list(islice(lines, available_lines))
+                cost = len(chunk) + 2
+            if not chunk:
+                if self._pending is None:
+                    return
+                # Not even one line fits in what is left of this part
+                self._close_part()
+                continue
+
+            self._write_header(header_prefix)
+            self.current_file.write('\n'.join(chunk))
+            self.current_file.write('\n')
+            self.chunk_index += 1
+            self.current_size += cost
+
+            limit = self.max_tokens or self.max_lines
+            if self.current_size >= limit or self._pending is not None:
+                self._close_part()
+
+    def write_message(self, header_prefix: str, message: str):
+        """Write a one-line chunk, e.g. a read error or a duplicate reference."""
+        if self.max_tokens:
+            cost = self.estimator.count(self._header(header_prefix) + message)
+        else:
+            cost = 1
+        self._write_header(header_prefix)
+        self.current_file.write(message)
+        self.current_size += cost
+
+    def close(self):
+        if self.current_file:
+            self.current_file.close()
+            self.current_file = None
+
+    @property
+    def parts_written(self) -> int:
+        return self.file_counter - 1
+
+def skipped_message(sniffed: SniffResult) -> str:
+    return f"Skipped {sniffed.kind} file: {sniffed.description}\n"
+
+def read_file(directory: str, entry: Entry, cache: Optional[BlockCache] = None,
+              max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES) -> CachedBlock:
+    """
+    Read a file's text, reusing the cached copy when size and mtime are unchanged.
+    Binary or oversized files are detected from their first bytes and replaced
+    by a one-line summary.
+    """
+    if cache is not None:
+        cached = cache.get(entry)
+        if cached is not None:
+            return cached
+
+    sniffed, content = read_text(os.path.join(directory, entry.rel_path), entry.size,
+                                 max_file_bytes, errors='strict')
+    if content is None:
+        read = CachedBlock(skipped_message(sniffed), 1, '', True)
+    else:
+        read = CachedBlock(content, len(content.splitlines()), content_digest(content), True)
+    if cache is not None:
+        cache.put(entry, read)
+    return read
+
+def is_streamed(entry: Entry, max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES) -> bool:
+    """Files above CACHE_MAX_BYTES (but within the size limit) are streamed from disk."""
+    return entry.size > CACHE_MAX_BYTES and not (max_file_bytes and entry.size > max_file_bytes)
+
+def iter_file_lines(directory: str, entry: Entry, cache: Optional[BlockCache] = None,
+                    max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+                    digest: Optional[StreamingDigest] = None) -> Iterator[str]:
+    """
+    Yield a file's lines as `str.splitlines()` would. Files up to
+    CACHE_MAX_BYTES are read whole (through the cache if enabled); larger
+    ones are sniffed and then streamed from disk, feeding `digest` with the
+    text as it goes.
+    """
+    if not is_streamed(entry, max_file_bytes):
+        yield from read_file(directory, entry, cache, max_file_bytes).block.splitlines()
+        return
+
+    with open(os.path.join(directory, entry.rel_path), 'rb') as raw:
+        sniffed = sniff_head(raw.read(SNIFF_BYTES), entry.size, max_file_bytes)
+        if sniffed.kind != TEXT:
+            yield from skipped_message(sniffed).splitlines()
+            return
+
+        raw.seek(0)
+        with io.TextIOWrapper(raw, encoding='utf-8') as f:
+            for line in f:
+                if digest is not None:
+                    digest.update(line)
+                # Also splits on the separators splitlines() knows besides '\n'
+                yield from line.splitlines()
+        if digest is not None:
+            digest.complete = True
+
+def write_entry(writer: PartWriter, header_prefix: str, directory: str, entry: Entry,
+                cache: Optional[BlockCache] = None,
+                max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+                duplicates: Optional[DuplicateIndex] = None):
+    """
+    Write one file's chunks. With `duplicates`, a file whose content was
+    already written becomes a one-line reference to the first path. Large
+    streamed files are hashed as they are written; a later one is only
+    hashed up front when an earlier file has the same size.
+    """
+    if duplicates is None:
+        writer.write_lines(header_prefix, iter_file_lines(directory, entry, cache, max_file_bytes))
+        return
+
+    if is_streamed(entry, max_file_bytes):
+        if duplicates.has_size(entry.size):
+            known = file_text_digest(os.path.join(directory, entry.rel_path))
+            original = duplicates.original(known.hexdigest())
+            if original is not None:
+                write_duplicate(writer, header_prefix, entry, original, known.lines, duplicates)
+                return
+        digest = StreamingDigest()
+        writer.write_lines(header_prefix, iter_file_lines(directory, entry, cache, max_file_bytes, digest))
+        if digest.complete:
+            duplicates.add(digest.hexdigest(), entry.rel_path, entry.size)
+        return
+
+    read = read_file(directory, entry, cache, max_file_bytes)
+    original = duplicates.original(read.digest)
+    if original is not None:
+        write_duplicate(writer, header_prefix, entry, original, read.line_count, duplicates)
+        return
+    duplicates.add(read.digest, entry.rel_path, entry.size)
+    writer.write_lines(header_prefix, iter(read.block.splitlines()))
+
+def write_duplicate(writer: PartWriter, header_prefix: str, entry: Entry, original: str,
+                    line_count: int, duplicates: DuplicateIndex):
+    import json
+
+    message = f"Same content as {json.dumps(original, ensure_ascii=False)}\n"
+    writer.write_message(header_prefix, message)
+    duplicates.record_saving(entry.size - len(message.encode('utf-8')), line_count - 1)
+
+def process_directory(directory: str, max_lines: int = 2000, use_gitignore: bool = False,
+                      use_cache: bool = True, max_tokens: Optional[int] = None,
+                      estimator: Optional[TokenEstimator] = None,
+                      max_file_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+                      dedup: bool = False, rules: RulesArg = 'exceptions',
+                      sink: SinkArg = None) -> List[str]:
+    """
+    Split a directory's files into plain text parts written to `sink` (the
+    current directory by default, or a single indexed `BundleSink`), excluding what `rules` matches (by default
+    the `exceptions` file in the current directory). Returns the part names.
+    """
+    base_name = os.path.basename(os.path.normpath(directory))
+    if not os.path.isdir(directory):
+        print(f"Error: {directory} is not a valid directory")
+        return []
+
+    gitignore = os.path.join(directory, '.gitignore') if use_gitignore else None
+    matcher = build_matcher(rules, gitignore)
+    sink = as_sink(sink)
+    for name in sink.output_names:
+        matcher.add_name(name)
+    cache: Optional[BlockCache] = None
+    if use_cache and sink.directory is not None:
+        cache_file = sink.path(cache_path_for(directory))
+        matcher.add_name(os.path.basename(cache_file))
+        # Summaries of skipped files depend on the size limit
+        cache = BlockCache(cache_file, 'plaintext', f"2:{max_file_bytes or 0}")
+
+    writer = PartWriter(base_name, max_lines, max_tokens, estimator, sink)
+    duplicates = DuplicateIndex() if dedup else None
+
+    try:
+        manifest = scan_tree(directory, matcher)
+
+        for entry in iter_files(manifest):
+            header_prefix = chunk_header_prefix(entry.rel_path)
+            writer.rel_path = entry.rel_path
+
+            try:
+                write_entry(writer, header_prefix, directory, entry, cache, max_file_bytes, duplicates)
+            except Exception as e:
+                # Chunks already written for this file are kept
+                writer.write_message(header_prefix, f"Error reading file {entry.name}: {e}\n")
+
+        if cache is not None:
+            cache.prune(entry.rel_path for entry in iter_files(manifest))
+            print(f"Cache: {cache.hits} file(s) reused, {cache.misses} read.")
+        if duplicates is not None:
+            print(f"Dedup: {duplicates.duplicates} duplicate file(s), "
+                  f"{duplicates.bytes_saved:,} bytes and {duplicates.lines_saved:,} lines saved.")
+
+    finally:
+        writer.close()
+        if cache is not None:
+            cache.close()
+
+    print(f"Processing completed. {writer.parts_written} {base_name}.txt files have been generated")
+    return writer.file_names
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """Entry point of `make-plaintext.py` and `python -m maketools plaintext`."""
+    parser = argparse.ArgumentParser(prog=prog, description="Split a directory's files into plain text parts.")
+    parser.add_argument("directory", help="Path of the directory to process")
+    parser.add_argument(
+        "--gitignore",
+        action="store_true",
+        help="Also apply the rules from the directory's .gitignore"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor update the file cache"
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=None,
+        help="Split parts by estimated tokens instead of lines"
+    )
+    parser.add_argument(
+        "--tokenizer",
+        default="chars",
+        help="Token estimator: 'chars', 'bytes' or the path of a BPE vocabulary (.tiktoken)"
+    )
+    parser.add_argument(
+        "--max-file-size",
+        type=float,
+        default=DEFAULT_MAX_FILE_BYTES / (1024 * 1024),
+        help="Largest file, in MB, whose content is included (0 for no limit)"
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Replace files whose content was already written with a reference to the first one"
+    )
+    parser.add_argument(
+        "--rules",
+        default="exceptions",
+        help="Exclusion rules file (default: 'exceptions' in the current directory)"
+    )
+    parser.add_argument(
+        "--bundle",
+        choices=('none', 'gzip', 'zstd'),
+        default=None,
+        help="Write every part into a single indexed <directory>.txt.bundle, "
+             "compressed per part with this codec ('none' for uncompressed)"
+    )
+    args = parser.parse_args(argv)
+
+    bundle = None
+    if args.bundle:
+        from maketools.bundle import BundleSink
+
+        base_name = os.path.basename(os.path.normpath(args.directory))
+        try:
+            bundle = BundleSink(f"{base_name}.txt.bundle", args.bundle)
+        except ValueError as e:
+            parser.error(str(e))
+
+    with bundle or nullcontext():
+        process_directory(
+            args.directory,
+            use_gitignore=args.gitignore,
+            use_cache=not args.no_cache,
+            max_tokens=args.max_tokens,
+            estimator=get_estimator(args.tokenizer) if args.max_tokens else None,
+            max_file_bytes=int(args.max_file_size * 1024 * 1024),
+            dedup=args.dedup,
+            rules=args.rules,
+            sink=bundle,
+        )
+
+
+if __name__ == "__main__":
+    main()
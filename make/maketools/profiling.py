@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+import builtins
+import subprocess
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+class CallCounters:
+    """Llamadas al sistema de archivos contadas por `count_calls`."""
+
+    def __init__(self):
+        self.scandir = 0
+        self.stat = 0
+        self.open = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'scandir': self.scandir, 'stat': self.stat, 'open': self.open}
+
+
+class _CountingEntry:
+    """Envuelve un `os.DirEntry` para contar las llamadas a `stat()`."""
+    __slots__ = ('_entry', '_counters')
+
+    def __init__(self, entry, counters: CallCounters):
+        self._entry = entry
+        self._counters = counters
+
+    def stat(self, *args, **kwargs):
+        self._counters.stat += 1
+        return self._entry.stat(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def __fspath__(self):
+        return self._entry.path
+
+
+class _CountingScandir:
+    def __init__(self, iterator, counters: CallCounters):
+        self._it = iterator
+        self._counters = counters
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return _CountingEntry(next(self._it), self._counters)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._it.close()
+
+    def close(self):
+        self._it.close()
+
+
+@contextmanager
+def count_calls() -> Iterator[CallCounters]:
+    """
+    Cuenta, mientras dura el bloque, las llamadas a `os.scandir`, `os.stat`
+    (también `DirEntry.stat`) y `open`. Los envoltorios añaden coste, así que
+    los tiempos medidos dentro del bloque no son representativos.
+    """
+    counters = CallCounters()
+    original_scandir, original_stat, original_open = os.scandir, os.stat, builtins.open
+
+    def counting_scandir(path='.'):
+        counters.scandir += 1
+        return _CountingScandir(original_scandir(path), counters)
+
+    def counting_stat(*args, **kwargs):
+        counters.stat += 1
+        return original_stat(*args, **kwargs)
+
+    def counting_open(*args, **kwargs):
+        counters.open += 1
+        return original_open(*args, **kwargs)
+
+    os.scandir, os.stat, builtins.open = counting_scandir, counting_stat, counting_open
+    try:
+        yield counters
+    finally:
+        os.scandir, os.stat, builtins.open = original_scandir, original_stat, original_open
+
+
+def read_proc_io() -> Dict[str, int]:
+    """
+    Contadores de E/S del proceso actual en Linux (`/proc/self/io`):
+    `syscr`/`syscw` son las llamadas read/write. Vacío en otros sistemas.
+    """
+    try:
+        with open('/proc/self/io', 'r') as f:
+            pairs = (line.split(':', 1) for line in f)
+            return {key: int(value) for key, value in pairs}
+    except OSError:
+        return {}
+
+
+def directory_bytes(path: str) -> int:
+    """Bytes de todos los archivos bajo `path`."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def run_child(command: List[str], cwd: str, env: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    """
+    Ejecuta un proceso hijo y devuelve su tiempo, su pico de RSS (medido con
+    `os.wait4`, sin contar sus propios hijos) y los bytes que deja en `cwd`.
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode != 0:
+        raise RuntimeError(f"El comando {command} terminó con código {proc.returncode}")
+
+    # ru_maxrss está en KiB en Linux y en bytes en macOS
+    rss_bytes = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return {
+        'seconds': elapsed,
+        'peak_rss_mb': rss_bytes / (1024 * 1024),
+        'output_bytes': directory_bytes(cwd),
+    }
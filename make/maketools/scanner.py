@@ -0,0 +1,118 @@
+import os
+from operator import attrgetter
+from typing import Callable, Iterator, List, Optional
+
+# Firma del predicado de exclusión: (nombre, ruta_relativa, es_directorio) -> bool
+ExclusionPredicate = Callable[[str, str, bool], bool]
+
+
+class Entry:
+    """
+    Entrada compacta del manifiesto generado por `scan_tree`.
+    - `rel_path` es relativa al directorio escaneado ('' para la raíz).
+    - `size` y `mtime_ns` solo se rellenan para archivos no excluidos cuando
+      el escaneo se hace con `with_stat=True`.
+    """
+    __slots__ = ('rel_path', 'name', 'depth', 'is_dir', 'size', 'mtime_ns', 'excluded')
+
+    def __init__(self, rel_path: str, name: str, depth: int, is_dir: bool,
+                 size: int = 0, mtime_ns: int = 0, excluded: bool = False):
+        self.rel_path = rel_path
+        self.name = name
+        self.depth = depth
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.excluded = excluded
+
+    @property
+    def mtime(self) -> float:
+        """Fecha de modificación en segundos, como `os.stat().st_mtime`."""
+        return self.mtime_ns / 1e9
+
+    def __repr__(self) -> str:
+        kind = 'dir' if self.is_dir else 'file'
+        flag = ' excluded' if self.excluded else ''
+        return f"<Entry {kind} {self.rel_path!r}{flag}>"
+
+
+_entry_name = attrgetter('name')
+
+
+def scan_tree(directory: str, is_excluded: Optional[ExclusionPredicate] = None,
+              with_stat: bool = True) -> List[Entry]:
+    """Devuelve como lista el manifiesto completo que produce `iter_scan`."""
+    return list(iter_scan(directory, is_excluded, with_stat))
+
+
+def iter_scan(directory: str, is_excluded: Optional[ExclusionPredicate] = None,
+              with_stat: bool = True) -> Iterator[Entry]:
+    """
+    Recorre `directory` una sola vez con `os.scandir` y devuelve el manifiesto
+    en preorden: cada directorio seguido de sus archivos (ordenados) y luego
+    de sus subdirectorios (ordenados), igual que `os.walk(topdown=True)`.
+
+    - Los directorios excluidos aparecen en el manifiesto marcados como
+      `excluded`, pero no se recorren.
+    - Los archivos excluidos no se consultan con `stat`.
+    - Igual que `os.walk`, los enlaces simbólicos a directorios no se siguen
+      y los directorios que no se pueden leer se ignoran.
+
+    Es un generador: las entradas se producen a medida que se recorre el
+    árbol, así que solo se guardan los directorios pendientes de visitar.
+    """
+    # Pila de (ruta_absoluta, ruta_relativa, nombre, profundidad, excluido)
+    stack = [(directory, '', os.path.basename(directory), 0, False)]
+
+    while stack:
+        path, rel, name, depth, excluded = stack.pop()
+        yield Entry(rel, name, depth, True, excluded=excluded)
+        if excluded:
+            continue
+
+        try:
+            with os.scandir(path) as it:
+                children = sorted(it, key=_entry_name)
+        except OSError:
+            continue
+
+        # Es el bucle caliente: concatenar es más barato que os.path.join
+        prefix = rel + os.sep if rel else ''
+        child_depth = depth + 1
+        subdirs = []
+        for child in children:
+            child_name = child.name
+            child_rel = prefix + child_name
+            try:
+                is_dir = child.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                if child.is_symlink():
+                    continue
+                child_excluded = bool(is_excluded and is_excluded(child_name, child_rel, True))
+                subdirs.append((child.path, child_rel, child_name, child_depth, child_excluded))
+                continue
+
+            entry = Entry(child_rel, child_name, child_depth, False)
+            if is_excluded is not None and is_excluded(child_name, child_rel, False):
+                entry.excluded = True
+            elif with_stat:
+                try:
+                    st = child.stat()
+                    entry.size = st.st_size
+                    entry.mtime_ns = st.st_mtime_ns
+                except OSError:
+                    # El error real aparecerá al intentar leer el archivo
+                    pass
+            yield entry
+
+        stack.extend(reversed(subdirs))
+
+
+def iter_files(manifest: List[Entry]):
+    """Itera sobre los archivos no excluidos del manifiesto, en orden."""
+    for entry in manifest:
+        if not entry.is_dir and not entry.excluded:
+            yield entry
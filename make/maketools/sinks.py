@@ -0,0 +1,103 @@
+import io
+import os
+from typing import Dict, Optional, TextIO, Union
+
+
+class DirectorySink:
+    """
+    Destino de los archivos generados: un directorio del disco (por defecto
+    el directorio actual, como hacían los scripts). La caché de bloques y el
+    índice del árbol se guardan junto a las partes.
+    """
+    # Archivos propios del destino que el recorrido debe excluir
+    output_names = ()
+
+    def __init__(self, directory: str = '.'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def open(self, name: str) -> TextIO:
+        return open(self.path(name), 'w', encoding='utf-8')
+
+    def remove(self, name: str) -> bool:
+        """Borra un archivo generado; False si no existía."""
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+
+class _MemoryPart(io.StringIO):
+    def __init__(self, sink: 'MemorySink', name: str):
+        super().__init__()
+        self._sink = sink
+        self._name = name
+
+    def close(self):
+        if not self.closed:
+            self._sink.parts[self._name] = self.getvalue()
+        super().close()
+
+
+class MemorySink:
+    """
+    Guarda las partes en memoria (`parts`, por nombre y en orden de
+    creación), p. ej. para pasarlas a otro proceso sin tocar el disco.
+    No tiene directorio, así que no hay caché de bloques ni índice del árbol.
+    """
+    directory = None
+    output_names = ()
+
+    def __init__(self):
+        self.parts: Dict[str, str] = {}
+
+    def path(self, name: str) -> Optional[str]:
+        return None
+
+    def open(self, name: str) -> TextIO:
+        return _MemoryPart(self, name)
+
+    def remove(self, name: str) -> bool:
+        return self.parts.pop(name, None) is not None
+
+
+# También vale un `bundle.BundleSink`, que escribe todas las partes en un único archivo
+Sink = Union[DirectorySink, MemorySink]
+SinkArg = Union[None, str, Sink]
+
+
+def as_sink(sink: SinkArg) -> Sink:
+    """None es el directorio actual; una cadena, un directorio; si no, el propio objeto."""
+    if sink is None:
+        return DirectorySink('.')
+    if isinstance(sink, str):
+        return DirectorySink(sink)
+    return sink
+
+
+def state_file_stem(directory: str) -> str:
+    """
+    `<nombre>_<hash>` para los archivos de estado de `directory` (caché de
+    bloques, índice del árbol) que se guardan junto a los generados. El hash
+    de la ruta absoluta evita que dos repositorios con el mismo nombre
+    compartan esos archivos.
+    """
+    import hashlib
+
+    real = os.path.realpath(directory)
+    digest = hashlib.blake2b(real.encode('utf-8', errors='surrogatepass'), digest_size=4).hexdigest()
+    return f"{os.path.basename(real)}_{digest}"
+
+
+def begin_entry(part: TextIO, rel_path: str):
+    """
+    Marca en `part` el comienzo del bloque de `rel_path`. Solo las partes de
+    un bundle lo usan, para su índice; en el resto no hace nada.
+    """
+    begin = getattr(part, 'begin_entry', None)
+    if begin is not None:
+        begin(rel_path)
@@ -0,0 +1,148 @@
+import re
+from typing import NamedTuple, Optional, Tuple
+
+# Bytes que se leen para decidir si un archivo es texto
+SNIFF_BYTES = 8192
+DEFAULT_MAX_FILE_BYTES = 5 * 1024 * 1024
+
+TEXT = 'text'
+BINARY = 'binary'
+OVERSIZED = 'oversized'
+
+_MAGIC_NUMBERS = (
+    (b'\x89PNG\r\n\x1a\n', "imagen PNG"),
+    (b'\xff\xd8\xff', "imagen JPEG"),
+    (b'GIF87a', "imagen GIF"),
+    (b'GIF89a', "imagen GIF"),
+    (b'RIFF', "contenedor RIFF (WebP/WAV/AVI)"),
+    (b'%PDF-', "documento PDF"),
+    (b'PK\x03\x04', "archivo ZIP (zip/jar/docx/...)"),
+    (b'PK\x05\x06', "archivo ZIP vacío"),
+    (b'\x1f\x8b', "archivo gzip"),
+    (b'BZh', "archivo bzip2"),
+    (b'\xfd7zXZ\x00', "archivo xz"),
+    (b'(\xb5/\xfd', "archivo zstd"),
+    (b"7z\xbc\xaf'\x1c", "archivo 7z"),
+    (b'Rar!\x1a\x07', "archivo RAR"),
+    (b'SQLite format 3\x00', "base de datos SQLite"),
+    (b'\x7fELF', "ejecutable ELF"),
+    (b'MZ', "ejecutable Windows (PE)"),
+    (b'\xca\xfe\xba\xbe', "clase Java / binario Mach-O universal"),
+    (b'\xcf\xfa\xed\xfe', "binario Mach-O"),
+    (b'\xfe\xed\xfa\xcf', "binario Mach-O"),
+    (b'\x00asm', "módulo WebAssembly"),
+    (b'wOFF', "fuente WOFF"),
+    (b'wOF2', "fuente WOFF2"),
+    (b'OTTO', "fuente OpenType"),
+    (b'\x00\x01\x00\x00\x00', "fuente TrueType"),
+    (b'ID3', "audio MP3"),
+    (b'OggS', "contenedor Ogg"),
+    (b'fLaC', "audio FLAC"),
+    (b'\x1aE\xdf\xa3', "vídeo Matroska/WebM"),
+    (b'\xff\xfe', "texto UTF-16"),
+    (b'\xfe\xff', "texto UTF-16"),
+)
+
+# Bytes de control que no aparecen en texto normal (se permiten \t \n \f \r y ESC)
+_CONTROL_BYTES = bytes(set(range(32)) - {9, 10, 12, 13, 27})
+
+
+class SniffResult(NamedTuple):
+    kind: str
+    description: str
+
+
+def sniff_head(head: bytes, size: int, max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES) -> SniffResult:
+    """
+    Clasifica un archivo a partir de su tamaño y de sus primeros bytes:
+    - `oversized` si supera `max_bytes` (None o 0 desactivan el límite),
+    - `binary` si empieza por un número mágico conocido, contiene un byte
+      NUL o más de un 30 % de bytes de control,
+    - `text` en otro caso.
+    """
+    if max_bytes and size > max_bytes:
+        return SniffResult(OVERSIZED, f"archivo de {size} bytes, supera el límite de {max_bytes} bytes")
+
+    for magic, description in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            # 'MZ' y 'RIFF' son prefijos cortos: exigir además algún byte no textual
+            if magic in (b'MZ', b'RIFF') and b'\x00' not in head:
+                continue
+            return SniffResult(BINARY, description)
+
+    if b'\x00' in head:
+        return SniffResult(BINARY, "contiene bytes nulos")
+
+    if head:
+        control = len(head) - len(head.translate(None, _CONTROL_BYTES))
+        if control / len(head) > 0.3:
+            return SniffResult(BINARY, "demasiados caracteres de control")
+
+    return SniffResult(TEXT, '')
+
+
+def read_text(path: str, size: int, max_bytes: Optional[int] = DEFAULT_MAX_FILE_BYTES,
+              errors: str = 'ignore') -> Tuple[SniffResult, Optional[str]]:
+    """
+    Abre el archivo una sola vez: lee la cabecera, la clasifica y solo si es
+    texto lee el resto. Devuelve el contenido decodificado como UTF-8 y con
+    saltos de línea universales (igual que `open(..., 'r')`), o None si el
+    archivo es binario o demasiado grande.
+    """
+    if max_bytes and size > max_bytes:
+        return sniff_head(b'', size, max_bytes), None
+
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+        result = sniff_head(head, size, max_bytes)
+        if result.kind != TEXT:
+            return result, None
+        data = head + f.read()
+
+    content = data.decode('utf-8', errors=errors)
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return result, content
+
+
+_SHEBANGS = (
+    (re.compile(r'python'), 'python'),
+    (re.compile(r'\b(?:ba|z|k|da)?sh\b'), 'shell'),
+    (re.compile(r'\bnode\b|\bdeno\b|\bbun\b'), 'javascript'),
+    (re.compile(r'\bruby\b'), 'ruby'),
+    (re.compile(r'\bperl\b'), 'perl'),
+    (re.compile(r'\bphp\b'), 'php'),
+)
+
+
+def guess_language(content: str) -> str:
+    """
+    Adivina el lenguaje por el contenido cuando la extensión no es conocida:
+    shebang, cabeceras XML/HTML/PHP, JSON, YAML o INI. Si no hay pistas, 'text'.
+    """
+    start = content.lstrip()[:200]
+
+    if start.startswith('#!'):
+        first_line = start.split('\n', 1)[0]
+        for pattern, language in _SHEBANGS:
+            if pattern.search(first_line):
+                return language
+        return 'shell'
+
+    lowered = start.lower()
+    if lowered.startswith('<?xml'):
+        return 'xml'
+    if lowered.startswith('<!doctype html') or lowered.startswith('<html'):
+        return 'html'
+    if lowered.startswith('<?php'):
+        return 'php'
+    if start[:1] in ('{', '['):
+        stripped = content.rstrip()
+        if stripped.endswith('}') or stripped.endswith(']'):
+            return 'json'
+    if start.startswith('---\n'):
+        return 'yaml'
+    if re.match(r'^\[[\w.\- "]+\]\s*$', start.split('\n', 1)[0]):
+        return 'ini'
+
+    return 'text'
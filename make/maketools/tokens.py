@@ -0,0 +1,151 @@
+import re
+import base64
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+
+class TokenEstimator(ABC):
+    """
+    Estimador de tokens. Se cuenta bloque a bloque (o línea a línea), nunca
+    la parte completa, así que el coste de cada llamada es proporcional al
+    texto nuevo. Las heurísticas redondean al entero más cercano para que la
+    suma de muchos trozos pequeños no se desvíe. Las subclases implementan
+    `count`; sin él no se pueden instanciar.
+    """
+    name = 'base'
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Tokens estimados de `text`."""
+
+
+class CharEstimator(TokenEstimator):
+    """Heurística rápida: un token cada `chars_per_token` caracteres."""
+    name = 'chars'
+
+    def __init__(self, chars_per_token: float = 4.0):
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return round(len(text) / self.chars_per_token)
+
+
+class ByteEstimator(TokenEstimator):
+    """
+    Heurística por bytes UTF-8: penaliza el texto no ASCII, que los
+    tokenizadores BPE suelen partir en más tokens.
+    """
+    name = 'bytes'
+
+    def __init__(self, bytes_per_token: float = 4.0):
+        self.bytes_per_token = bytes_per_token
+
+    def count(self, text: str) -> int:
+        if text.isascii():
+            return round(len(text) / self.bytes_per_token)
+        return round(len(text.encode('utf-8', errors='surrogatepass')) / self.bytes_per_token)
+
+
+# Pre-tokenización aproximada a la de los tokenizadores GPT (sin \p{L})
+_PRETOKENIZE = re.compile(
+    r"""'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+""",
+    re.IGNORECASE,
+)
+
+
+class BPEEstimator(TokenEstimator):
+    """
+    Cuenta tokens con un vocabulario BPE local en formato `.tiktoken`
+    (una línea por token: `<token en base64> <rango>`). Las palabras ya
+    vistas se memorizan, por lo que el código repetitivo sale barato.
+    """
+    name = 'bpe'
+
+    def __init__(self, vocab_file: str, memo_size: int = 100_000):
+        self.ranks: Dict[bytes, int] = {}
+        with open(vocab_file, 'rb') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2:
+                    self.ranks[base64.b64decode(parts[0])] = int(parts[1])
+        if not self.ranks:
+            raise ValueError(f"El vocabulario '{vocab_file}' está vacío o no tiene formato .tiktoken")
+        self._memo: Dict[str, int] = {}
+        self._memo_size = memo_size
+
+    def _count_piece(self, piece: bytes) -> int:
+        if piece in self.ranks:
+            return 1
+        parts: List[bytes] = [piece[i:i + 1] for i in range(len(piece))]
+        ranks = self.ranks
+        while len(parts) > 1:
+            best_rank, best_i = None, -1
+            for i in range(len(parts) - 1):
+                rank = ranks.get(parts[i] + parts[i + 1])
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank, best_i = rank, i
+            if best_rank is None:
+                break
+            parts[best_i:best_i + 2] = [parts[best_i] + parts[best_i + 1]]
+        return len(parts)
+
+    def count(self, text: str) -> int:
+        total = 0
+        memo = self._memo
+        for match in _PRETOKENIZE.finditer(text):
+            word = match.group()
+            n = memo.get(word)
+            if n is None:
+                n = self._count_piece(word.encode('utf-8', errors='surrogatepass'))
+                if len(memo) < self._memo_size:
+                    memo[word] = n
+            total += n
+        return total
+
+
+def get_estimator(spec: str = 'chars') -> TokenEstimator:
+    """
+    Devuelve un estimador a partir de su nombre: 'chars', 'bytes' o la ruta
+    de un vocabulario BPE (.tiktoken).
+    """
+    if spec == 'chars':
+        return CharEstimator()
+    if spec == 'bytes':
+        return ByteEstimator()
+    return BPEEstimator(spec)
+
+
+def pack_first_fit_decreasing(costs: Sequence[int], capacity: int,
+                              first_bin_used: int = 0, bin_used: int = 0) -> List[List[int]]:
+    """
+    Reparte los índices de `costs` en contenedores de capacidad `capacity`
+    (first-fit decreasing: del más grande al más pequeño, cada uno en el
+    primer contenedor donde quepa). Un elemento mayor que la capacidad ocupa
+    un contenedor propio. `first_bin_used` reserva espacio en el primero,
+    p. ej. para la cabecera con el árbol, que siempre se devuelve aunque
+    quede vacío, y `bin_used` en cada uno de los siguientes (la cabecera de
+    continuación).
+    """
+    order = sorted(range(len(costs)), key=lambda i: costs[i], reverse=True)
+    bins: List[List[int]] = [[]]
+    used: List[int] = [first_bin_used]
+
+    for i in order:
+        cost = costs[i]
+        target: Optional[int] = None
+        for b in range(len(bins)):
+            # Un contenedor vacío acepta cualquier elemento, salvo el primero
+            # si ya lleva la cabecera
+            empty = not bins[b] and (b > 0 or first_bin_used == 0)
+            if used[b] + cost <= capacity or empty:
+                target = b
+                break
+        if target is None:
+            bins.append([])
+            used.append(bin_used)
+            target = len(bins) - 1
+        bins[target].append(i)
+        used[target] += cost
+
+    # El primer contenedor se devuelve aunque quede vacío (solo cabecera)
+    return [sorted(b) for b in bins]
@@ -0,0 +1,193 @@
+import os
+import argparse
+from typing import Iterator, List, Optional
+
+from maketools.matcher import RulesArg, build_matcher
+from maketools.sinks import SinkArg, as_sink
+from maketools.treeindex import FORMATS, TreeIndex, index_path_for
+
+# Extensión del archivo generado para cada formato
+OUTPUT_EXTENSIONS = {'ascii': 'md', 'markdown': 'md', 'json': 'json', 'html': 'html'}
+
+def generate_tree_structure(index: TreeIndex, output_format: str = 'ascii',
+                            max_depth: Optional[int] = None,
+                            max_entries: Optional[int] = None,
+                            rollups: bool = False) -> Iterator[str]:
+    """
+    Genera, línea a línea, la estructura de árbol del índice en el formato
+    pedido ('ascii', 'markdown', 'json' o 'html').
+
+    - `max_depth` oculta lo que esté por debajo de esa profundidad.
+    - `max_entries` muestra como mucho ese número de entradas por directorio
+      y resume el resto en una línea "… N archivos más".
+    - `rollups` añade a cada directorio el número de archivos y el tamaño
+      de su subárbol.
+    """
+    render = {
+        'ascii': index.iter_ascii,
+        'markdown': index.iter_markdown,
+        'json': index.iter_json,
+        'html': index.iter_html,
+    }[output_format]
+    return render(max_depth, max_entries, rollups)
+
+def create_tree_markdown(directory: str, use_gitignore: bool = False,
+                         max_depth: Optional[int] = None, max_entries: Optional[int] = None,
+                         show_rollups: bool = False, output_format: str = 'ascii',
+                         from_index: bool = False, show_diff: bool = False,
+                         save_index: bool = True, rules: RulesArg = 'exceptions',
+                         sink: SinkArg = None) -> Optional[str]:
+    """
+    Crea un archivo Markdown con la estructura de árbol del proyecto y
+    devuelve su nombre (None si hay un error). Con `use_gitignore` también
+    se aplican las reglas del .gitignore del directorio; `rules` son las
+    reglas de exclusión (por defecto, el archivo `exceptions`) y `sink` el
+    destino de los archivos generados (por defecto, el directorio actual).
+
+    El directorio se recorre una vez para construir un `TreeIndex` (nodos
+    compactos, no líneas), que se guarda en `.<nombre>_<hash>_tree_index.json` y
+    se dibuja en streaming en el formato pedido. Con `from_index` se dibuja
+    el índice guardado sin recorrer el disco; con `show_diff` se muestran
+    los cambios respecto al índice guardado. Un destino sin directorio
+    (`MemorySink`) no guarda índice.
+    """
+    # Normalizar la ruta del directorio
+    directory = os.path.normpath(directory)
+    base_name = os.path.basename(directory)
+    
+    if not os.path.isdir(directory):
+        print(f"Error: {directory} no es un directorio válido")
+        return None
+
+    gitignore = os.path.join(directory, '.gitignore') if use_gitignore else None
+    matcher = build_matcher(rules, gitignore)
+    sink = as_sink(sink)
+    
+    output_filename = f"{base_name}_tree.{OUTPUT_EXTENSIONS[output_format]}"
+    index_name = index_path_for(directory)
+    index_path = sink.path(index_name)
+    
+    # Asegurarse de que el propio script no procese los archivos que genera
+    for extension in set(OUTPUT_EXTENSIONS.values()):
+        matcher.add_name(f"{base_name}_tree.{extension}")
+    matcher.add_name(index_name)
+    # También es buena idea excluir el propio script
+    matcher.add_name('make-tree.py')
+
+
+    try:
+        previous = None
+        if (from_index or show_diff) and index_path and os.path.exists(index_path):
+            previous = TreeIndex.load(index_path)
+
+        if from_index:
+            if previous is None:
+                print(f"Error: No existe el índice '{index_name}'")
+                return None
+            index = previous
+        else:
+            index = TreeIndex.build(directory, matcher)
+            if show_diff:
+                if previous is None:
+                    print(f"No hay índice anterior en '{index_name}'; no se muestran cambios.")
+                else:
+                    changes = 0
+                    for change, path in previous.diff(index):
+                        print(f"{change} {path}")
+                        changes += 1
+                    print(f"{changes} cambios respecto al índice anterior.")
+            if save_index and index_path:
+                index.save(index_path)
+
+        with sink.open(output_filename) as output_file:
+            print(f"Generando archivo de árbol: {output_filename}")
+
+            lines = generate_tree_structure(index, output_format, max_depth, max_entries, show_rollups)
+            markdown = output_format in ('ascii', 'markdown')
+            if markdown:
+                output_file.write(
+                    f"# Proyecto: `{base_name}`\n\n"
+                    f"## Estructura del Proyecto\n\n"
+                )
+            if output_format == 'ascii':
+                output_file.write("```\n")
+            for line in lines:
+                output_file.write(line)
+                output_file.write('\n')
+            if output_format == 'ascii':
+                output_file.write("```\n")
+            if markdown:
+                output_file.write("\n")
+
+        print(f"\nProceso completado. Se ha generado el archivo '{output_filename}' con la estructura del directorio.")
+        return output_filename
+
+    except Exception as e:
+        print(f"Ha ocurrido un error inesperado: {e}")
+        return None
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """Punto de entrada de `make-tree.py` y de `python -m maketools tree`."""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Genera un archivo Markdown con la estructura de árbol de un directorio."
+    )
+    parser.add_argument("directorio", help="Ruta del directorio a procesar")
+    parser.add_argument(
+        "--gitignore",
+        action="store_true",
+        help="Aplicar también las reglas del .gitignore del directorio"
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="Profundidad máxima a mostrar (1 = solo el contenido de la raíz)"
+    )
+    parser.add_argument(
+        "--max-entries",
+        type=int,
+        default=None,
+        help="Entradas máximas por directorio; el resto se resume en una línea"
+    )
+    parser.add_argument(
+        "--rollups",
+        action="store_true",
+        help="Mostrar en cada directorio el número de archivos y el tamaño de su subárbol"
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="ascii",
+        help="Formato de salida (por defecto, árbol ASCII dentro de un Markdown)"
+    )
+    parser.add_argument(
+        "--from-index",
+        action="store_true",
+        help="Dibujar el índice guardado sin volver a recorrer el directorio"
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Mostrar los cambios respecto al índice guardado"
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="No guardar el índice del árbol"
+    )
+    parser.add_argument(
+        "--rules",
+        default="exceptions",
+        help="Archivo de reglas de exclusión (por defecto, 'exceptions' en el directorio actual)"
+    )
+    args = parser.parse_args(argv)
+    create_tree_markdown(args.directorio, use_gitignore=args.gitignore,
+                         max_depth=args.max_depth, max_entries=args.max_entries,
+                         show_rollups=args.rollups, output_format=args.format,
+                         from_index=args.from_index, show_diff=args.diff,
+                         save_index=not args.no_index, rules=args.rules)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+import os
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from maketools.scanner import Entry, ExclusionPredicate, iter_scan
+from maketools.sinks import state_file_stem
+
+INDEX_VERSION = 1
+
+
+def format_size(size: int) -> str:
+    """Tamaño legible: 512 B, 3.4 KB, 12.0 MB..."""
+    value = float(size)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024 or unit == 'GB':
+            break
+        value /= 1024
+    if unit == 'B':
+        return f"{size} B"
+    return f"{value:.1f} {unit}"
+
+
+def _plural(count: int, word: str) -> str:
+    return f"{count:,} {word}{'s' if count != 1 else ''}"
+
+
+class TreeNode:
+    """
+    Nodo compacto del índice. Los archivos no tienen lista de hijos
+    (`children` es None). En los directorios, `size`, `mtime_ns` y
+    `file_count` son los totales del subárbol tras `TreeIndex.rollup`.
+    """
+    __slots__ = ('name', 'is_dir', 'size', 'mtime_ns', 'file_count', 'children')
+
+    def __init__(self, name: str, is_dir: bool, size: int = 0, mtime_ns: int = 0):
+        self.name = name
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.file_count = 0 if is_dir else 1
+        self.children: Optional[List['TreeNode']] = [] if is_dir else None
+
+    def __repr__(self) -> str:
+        return f"<TreeNode {self.name!r}{'/' if self.is_dir else ''}>"
+
+
+class TreeIndex:
+    """
+    Estructura de un directorio construida una sola vez y reutilizable:
+    se guarda en JSON (`save`/`load`), se dibuja en varios formatos sin
+    volver a recorrer el disco y se puede comparar con un índice anterior
+    (`diff`). Los hijos de cada directorio conservan el orden del escaneo:
+    primero los archivos y luego los subdirectorios, ambos ordenados.
+    """
+
+    def __init__(self, root: TreeNode):
+        self.root = root
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Entry]) -> 'TreeIndex':
+        """Construye el índice a partir de un manifiesto en preorden."""
+        root: Optional[TreeNode] = None
+        # Directorio abierto en cada profundidad
+        stack: List[TreeNode] = []
+
+        for entry in entries:
+            if entry.excluded:
+                continue
+            node = TreeNode(entry.name, entry.is_dir, entry.size, entry.mtime_ns)
+            if entry.depth == 0:
+                root = node
+                stack = [node]
+                continue
+            del stack[entry.depth:]
+            stack[-1].children.append(node)
+            if entry.is_dir:
+                stack.append(node)
+
+        if root is None:
+            raise ValueError("El manifiesto no contiene el directorio raíz")
+        index = cls(root)
+        index.rollup()
+        return index
+
+    @classmethod
+    def build(cls, directory: str, is_excluded: Optional[ExclusionPredicate] = None) -> 'TreeIndex':
+        """Recorre `directory` una vez (con `stat`) y construye el índice."""
+        index = cls.from_entries(iter_scan(directory, is_excluded))
+        index.root.name = os.path.basename(os.path.abspath(directory))
+        return index
+
+    def rollup(self):
+        """
+        Acumula en cada directorio el tamaño, el número de archivos y el
+        mtime más reciente de su subárbol. Es O(n): se recorren los
+        directorios en preorden y se suman en orden inverso, de modo que
+        cada hijo está completo antes que su padre.
+        """
+        dirs = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            dirs.append(node)
+            stack.extend(child for child in node.children if child.is_dir)
+
+        for node in reversed(dirs):
+            size = files = mtime_ns = 0
+            for child in node.children:
+                size += child.size
+                files += child.file_count
+                if child.mtime_ns > mtime_ns:
+                    mtime_ns = child.mtime_ns
+            node.size, node.file_count, node.mtime_ns = size, files, mtime_ns
+
+    # --- Serialización ---------------------------------------------------
+
+    @staticmethod
+    def _encode(node: TreeNode):
+        # Archivo: [nombre, tamaño, mtime_ns]; directorio: [nombre, [hijos]]
+        if not node.is_dir:
+            return [node.name, node.size, node.mtime_ns]
+        return [node.name, [TreeIndex._encode(child) for child in node.children]]
+
+    @staticmethod
+    def _decode(data) -> TreeNode:
+        root = TreeNode(data[0], True)
+        stack = [(root, data[1])]
+        while stack:
+            parent, children = stack.pop()
+            for item in children:
+                if len(item) == 3:
+                    parent.children.append(TreeNode(item[0], False, item[1], item[2]))
+                else:
+                    node = TreeNode(item[0], True)
+                    parent.children.append(node)
+                    stack.append((node, item[1]))
+        return root
+
+    def save(self, path: str):
+        """Guarda el índice en JSON compacto (se escribe a un temporal y se renombra)."""
+        import json
+
+        data = {'version': INDEX_VERSION, 'root': self._encode(self.root)}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'TreeIndex':
+        import json
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"El índice '{path}' tiene una versión no soportada")
+        index = cls(cls._decode(data['root']))
+        index.rollup()
+        return index
+
+    # --- Recorrido y formatos --------------------------------------------
+
+    def walk(self, max_depth: Optional[int] = None,
+             max_entries: Optional[int] = None) -> Iterator[Tuple[str, int, object, bool]]:
+        """
+        Recorre el índice en preorden y produce eventos `(tipo, profundidad,
+        nodo, es_último)`:
+        - 'open' / 'close' rodean el contenido de un directorio que se expande,
+        - 'leaf' para archivos y directorios que no se expanden (`max_depth`),
+        - 'more' cuando `max_entries` oculta entradas; en ese caso el nodo es
+          el texto "N archivos y M directorios" y siempre es el último.
+        """
+        def visible(node: TreeNode):
+            children = node.children
+            if max_entries is None or len(children) <= max_entries:
+                return children, None
+            hidden = children[max_entries:]
+            dirs = sum(1 for child in hidden if child.is_dir)
+            parts = []
+            if len(hidden) - dirs:
+                parts.append(_plural(len(hidden) - dirs, 'archivo'))
+            if dirs:
+                parts.append(_plural(dirs, 'directorio'))
+            return children[:max_entries], ' y '.join(parts)
+
+        yield 'open', 0, self.root, True
+        shown, more = visible(self.root)
+        # Pila de [nodo, hijos_visibles, posición, resumen_ocultos, es_último]
+        stack = [[self.root, shown, 0, more, True]]
+
+        while stack:
+            frame = stack[-1]
+            parent, shown, pos, more, parent_last = frame
+            depth = len(stack)
+            if pos == len(shown):
+                if more:
+                    yield 'more', depth, more, True
+                stack.pop()
+                yield 'close', depth - 1, parent, parent_last
+                continue
+
+            frame[2] += 1
+            node = shown[pos]
+            last = pos == len(shown) - 1 and not more
+            if node.is_dir and (max_depth is None or depth < max_depth):
+                yield 'open', depth, node, last
+                children, hidden = visible(node)
+                stack.append([node, children, 0, hidden, last])
+            else:
+                yield 'leaf', depth, node, last
+
+    @staticmethod
+    def label(node: TreeNode, rollups: bool = False) -> str:
+        if not node.is_dir:
+            return node.name
+        if rollups:
+            return f"{node.name}/ ({_plural(node.file_count, 'archivo')}, {format_size(node.size)})"
+        return f"{node.name}/"
+
+    def iter_ascii(self, max_depth: Optional[int] = None, max_entries: Optional[int] = None,
+                   rollups: bool = False) -> Iterator[str]:
+        """Árbol con `├──`, `└──` y `│` según la posición de cada hermano."""
+        # Para cada directorio abierto bajo la raíz, si era el último hermano
+        lasts: List[bool] = []
+        for kind, depth, node, last in self.walk(max_depth, max_entries):
+            if kind == 'close':
+                if depth > 0:
+                    lasts.pop()
+                continue
+            if depth == 0:
+                yield self.label(node, rollups)
+                continue
+            prefix = ''.join('    ' if l else '│   ' for l in lasts)
+            branch = '└── ' if last else '├── '
+            text = f"… {node} más" if kind == 'more' else self.label(node, rollups)
+            yield f"{prefix}{branch}{text}"
+            if kind == 'open':
+                lasts.append(last)
+
+    def iter_markdown(self, max_depth: Optional[int] = None, max_entries: Optional[int] = None,
+                      rollups: bool = False) -> Iterator[str]:
+        """Lista anidada de Markdown."""
+        for kind, depth, node, _ in self.walk(max_depth, max_entries):
+            if kind == 'close':
+                continue
+            indent = '  ' * depth
+            if kind == 'more':
+                yield f"{indent}- *… {node} más*"
+            else:
+                yield f"{indent}- `{self.label(node, rollups)}`"
+
+    def iter_html(self, max_depth: Optional[int] = None, max_entries: Optional[int] = None,
+                  rollups: bool = False) -> Iterator[str]:
+        """Documento HTML con directorios plegables (`<details>`)."""
+        from html import escape
+
+        yield '<!DOCTYPE html>'
+        yield f'<html><head><meta charset="utf-8"><title>{escape(self.root.name)}</title></head><body>'
+        yield '<ul>'
+        for kind, depth, node, _ in self.walk(max_depth, max_entries):
+            indent = '  ' * (depth + 1)
+            if kind == 'open':
+                yield f'{indent}<li><details open><summary>{escape(self.label(node, rollups))}</summary><ul>'
+            elif kind == 'close':
+                yield f'{indent}</ul></details></li>'
+            elif kind == 'more':
+                yield f'{indent}<li><em>… {escape(node)} más</em></li>'
+            else:
+                yield f'{indent}<li>{escape(self.label(node, rollups))}</li>'
+        yield '</ul>'
+        yield '</body></html>'
+
+    def iter_json(self, max_depth: Optional[int] = None, max_entries: Optional[int] = None,
+                  rollups: bool = False) -> Iterator[str]:
+        """
+        JSON con un objeto por nodo (`name`, `type`, `size`, `mtime_ns` y, en
+        los directorios, `files` y `children`), una línea por nodo. Los
+        tamaños se incluyen siempre; `rollups` no cambia el formato.
+        """
+        import json
+
+        def fields(node: TreeNode) -> str:
+            text = (f'"name": {json.dumps(node.name, ensure_ascii=False)}, '
+                    f'"type": "{"dir" if node.is_dir else "file"}", '
+                    f'"size": {node.size}, "mtime_ns": {node.mtime_ns}')
+            if node.is_dir:
+                text += f', "files": {node.file_count}'
+            return text
+
+        for kind, depth, node, last in self.walk(max_depth, max_entries):
+            indent = '  ' * depth
+            # La coma va tras el último renglón de cada nodo que no es el último hermano
+            comma = '' if last else ','
+            if kind == 'open':
+                yield f'{indent}{{{fields(node)}, "children": ['
+            elif kind == 'close':
+                yield f'{indent}]}}{comma}'
+            elif kind == 'more':
+                yield f'{indent}{{"more": {json.dumps(node, ensure_ascii=False)}}}'
+            else:
+                yield f'{indent}{{{fields(node)}}}{comma}'
+
+    # --- Comparación -----------------------------------------------------
+
+    def diff(self, other: 'TreeIndex') -> Iterator[Tuple[str, str]]:
+        """
+        Compara este índice (anterior) con `other` (actual) sin tocar el
+        disco. Produce `('+', ruta)`, `('-', ruta)` o `('~', ruta)` para lo
+        añadido, eliminado o modificado (tamaño o mtime distintos). Los
+        directorios añadidos o eliminados se informan una sola vez, con `/`.
+        Los directorios comunes siempre se comparan por dentro: un renombrado
+        no cambia ni el tamaño ni el mtime acumulados.
+        """
+        stack = [('', self.root, other.root)]
+        while stack:
+            prefix, old, new = stack.pop()
+            old_children = {(c.name, c.is_dir): c for c in old.children}
+            new_children = {(c.name, c.is_dir): c for c in new.children}
+            subdirs = []
+
+            for key in sorted(old_children.keys() | new_children.keys()):
+                name, is_dir = key
+                path = prefix + name + ('/' if is_dir else '')
+                before, after = old_children.get(key), new_children.get(key)
+                if before is None:
+                    yield '+', path
+                elif after is None:
+                    yield '-', path
+                elif is_dir:
+                    subdirs.append((path, before, after))
+                elif before.size != after.size or before.mtime_ns != after.mtime_ns:
+                    yield '~', path
+
+            stack.extend(reversed(subdirs))
+
+
+FORMATS = ('ascii', 'markdown', 'json', 'html')
+
+
+def index_path_for(directory: str) -> str:
+    """Ruta del índice en caché de `directory`, junto a los archivos generados."""
+    return f".{state_file_stem(directory)}_tree_index.json"
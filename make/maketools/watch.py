@@ -0,0 +1,186 @@
+"""
+Detección de cambios en un directorio para el modo `--watch`.
+
+Los cambios se deciden siempre comparando dos índices de `stat` (ruta ->
+tipo, tamaño y mtime) obtenidos con `scan_tree`, así que respetan las
+mismas exclusiones que la salida. inotify (Linux, con `ctypes`) solo sirve
+para saber cuándo volver a recorrer el árbol; sin inotify se recorre cada
+`interval` segundos.
+"""
+import os
+import time
+import errno
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from maketools.scanner import Entry, ExclusionPredicate, scan_tree
+
+# (es_directorio, tamaño, mtime_ns); los directorios solo cuentan si existen
+StatIndex = Dict[str, Tuple[bool, int, int]]
+
+# Eventos de inotify que pueden cambiar el índice
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_ONLYDIR = 0x01000000
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+               | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR)
+
+
+class Changes(NamedTuple):
+    """Rutas relativas (archivos y directorios) que cambian entre dos índices."""
+    added: Set[str]
+    removed: Set[str]
+    modified: Set[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+def stat_index(manifest: List[Entry]) -> StatIndex:
+    return {
+        entry.rel_path: (True, 0, 0) if entry.is_dir else (False, entry.size, entry.mtime_ns)
+        for entry in manifest
+        if not entry.excluded and entry.rel_path
+    }
+
+
+def diff_index(old: StatIndex, new: StatIndex) -> Changes:
+    added = new.keys() - old.keys()
+    removed = old.keys() - new.keys()
+    modified = {path for path in new.keys() & old.keys() if new[path] != old[path]}
+    return Changes(set(added), set(removed), modified)
+
+
+class Inotify:
+    """
+    Envoltorio mínimo de inotify con `ctypes`: un watch por directorio del
+    árbol, que se sincroniza tras cada recorrido. `wait` solo dice si ha
+    llegado algún evento; su contenido no se usa.
+    """
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._get_errno = ctypes.get_errno
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise self._error('inotify_init1')
+        self._watches: Dict[str, int] = {}
+
+    def _error(self, call: str) -> OSError:
+        code = self._get_errno()
+        return OSError(code, f"{call}: {os.strerror(code)}")
+
+    def sync(self, directories: List[str]):
+        """Vigila `directories` (rutas absolutas) y deja de vigilar los que ya no están."""
+        wanted = set(directories)
+        for path in self._watches.keys() - wanted:
+            # Si el directorio se borró, el kernel ya quitó el watch
+            self._libc.inotify_rm_watch(self.fd, self._watches.pop(path))
+        for path in wanted - self._watches.keys():
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+            if wd < 0:
+                error = self._error('inotify_add_watch')
+                # Un directorio que desaparece durante el recorrido no es un error
+                if error.errno == errno.ENOENT:
+                    continue
+                raise error
+            self._watches[path] = wd
+
+    def wait(self, timeout: float) -> bool:
+        """Espera hasta `timeout` segundos; True si llegó algún evento (se descartan)."""
+        import select
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        while True:
+            try:
+                if not os.read(self.fd, 64 * 1024):
+                    break
+            except BlockingIOError:
+                break
+        return True
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_inotify() -> Optional[Inotify]:
+    """Inotify si el sistema lo ofrece; None para usar el sondeo."""
+    if not hasattr(os, 'O_CLOEXEC'):
+        return None
+    try:
+        return Inotify()
+    except (OSError, AttributeError):
+        return None
+
+
+def iter_changes(directory: str, is_excluded: Optional[ExclusionPredicate] = None,
+                 manifest: Optional[List[Entry]] = None, debounce: float = 0.5,
+                 interval: float = 1.0, use_inotify: bool = True) -> Iterator[Tuple[List[Entry], Changes]]:
+    """
+    Produce `(manifiesto, cambios)` cada vez que el árbol cambia respecto al
+    último manifiesto (o a `manifest`, si se pasa el de la última salida).
+
+    Una ráfaga de cambios (un `git checkout`, un guardado que escribe varios
+    archivos) se agrupa en una sola actualización: con inotify se espera a
+    que pasen `debounce` segundos sin eventos; con sondeo, a que dos
+    recorridos separados por `debounce` segundos den el mismo índice.
+    """
+    if manifest is None:
+        manifest = scan_tree(directory, is_excluded)
+    previous = stat_index(manifest)
+    notifier = open_inotify() if use_inotify else None
+    if use_inotify and notifier is None:
+        print("Info: inotify no está disponible; se comprobarán los cambios por sondeo.")
+
+    try:
+        while True:
+            if notifier is not None:
+                try:
+                    notifier.sync([os.path.join(directory, entry.rel_path)
+                                   for entry in manifest if entry.is_dir and not entry.excluded])
+                except OSError as e:
+                    # p. ej. se ha alcanzado max_user_watches
+                    print(f"Info: inotify no puede vigilar el árbol ({e}); se usará el sondeo.")
+                    notifier.close()
+                    notifier = None
+                    continue
+                if not notifier.wait(interval):
+                    continue
+                while notifier.wait(debounce):
+                    pass
+                manifest = scan_tree(directory, is_excluded)
+                current = stat_index(manifest)
+            else:
+                time.sleep(interval)
+                manifest = scan_tree(directory, is_excluded)
+                current = stat_index(manifest)
+                if current == previous:
+                    continue
+                while True:
+                    time.sleep(debounce)
+                    settled = scan_tree(directory, is_excluded)
+                    settled_index = stat_index(settled)
+                    if settled_index == current:
+                        break
+                    manifest, current = settled, settled_index
+
+            changes = diff_index(previous, current)
+            previous = current
+            if changes:
+                yield manifest, changes
+    finally:
+        if notifier is not None:
+            notifier.close()
@@ -0,0 +1,382 @@
+import os
+import stat
+import time
+import zlib
+import struct
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# Tipos ya comprimidos: recomprimirlos cuesta CPU y no reduce el tamaño
+STORED_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.heic',
+    '.zip', '.jar', '.war', '.whl', '.apk', '.docx', '.xlsx', '.pptx', '.odt',
+    '.gz', '.tgz', '.bz2', '.xz', '.zst', '.lz4', '.7z', '.rar',
+    '.woff', '.woff2', '.mp3', '.mp4', '.m4a', '.mov', '.mkv', '.webm', '.ogg',
+})
+
+CHUNK_SIZE = 1024 * 1024
+
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP16_LIMIT = 0xFFFF
+
+_LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+_CENTRAL_HEADER = struct.Struct('<4sBBHHHHHIIIHHHHHII')
+_END_RECORD = struct.Struct('<4sHHHHIIH')
+_END_RECORD64 = struct.Struct('<4sQHHIIQQQQ')
+_END_LOCATOR64 = struct.Struct('<4sIQI')
+
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+
+# Campo extra propio, solo en el directorio central: nivel de deflate con el
+# que se comprimió el miembro, para que --update sepa si puede reutilizarlo
+_LEVEL_EXTRA_TAG = 0x4c76
+
+
+def compression_method_for(name: str) -> int:
+    """Los tipos de STORED_EXTENSIONS se guardan sin comprimir."""
+    return ZIP_STORED if os.path.splitext(name)[1].lower() in STORED_EXTENSIONS else ZIP_DEFLATED
+
+
+def _dos_datetime(mtime: float):
+    t = time.localtime(mtime)
+    if t.tm_year < 1980:
+        return (1 << 5) | 1, 0
+    date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    return date, dos_time
+
+
+def _timestamp_extra(mtime: float) -> bytes:
+    # Extended Timestamp (0x5455): guarda el mtime en segundos exactos
+    return struct.pack('<HHBI', 0x5455, 5, 1, int(mtime) & 0xFFFFFFFF)
+
+
+def _parse_timestamp_extra(extra: bytes) -> Optional[int]:
+    """Devuelve el mtime del campo 0x5455 de un bloque `extra`, si lo hay."""
+    i = 0
+    while i + 4 <= len(extra):
+        tag, length = struct.unpack_from('<HH', extra, i)
+        if tag == 0x5455 and length >= 5 and extra[i + 4] & 1:
+            return struct.unpack_from('<I', extra, i + 5)[0]
+        i += 4 + length
+    return None
+
+
+def _level_extra(level: int) -> bytes:
+    return struct.pack('<HHB', _LEVEL_EXTRA_TAG, 1, level)
+
+
+def _parse_level_extra(extra: bytes) -> Optional[int]:
+    """Nivel de deflate guardado por `_level_extra` (None si el .zip no lo tiene)."""
+    i = 0
+    while i + 4 <= len(extra):
+        tag, length = struct.unpack_from('<HH', extra, i)
+        if tag == _LEVEL_EXTRA_TAG and length == 1 and i + 5 <= len(extra):
+            return extra[i + 4]
+        i += 4 + length
+    return None
+
+
+class ZipMember:
+    """Datos de un miembro ya escrito, necesarios para el directorio central."""
+    __slots__ = ('name', 'method', 'level', 'crc', 'compress_size', 'file_size', 'mtime',
+                 'external_attr', 'header_offset', 'flags', 'zip64')
+
+    def __init__(self, name: str, method: int, mtime: float, mode: int, level: Optional[int] = None):
+        self.name = name
+        self.method = method
+        # Nivel de deflate (None si no se conoce o el miembro no va comprimido)
+        self.level = level if method == ZIP_DEFLATED else None
+        self.crc = 0
+        self.compress_size = 0
+        self.file_size = 0
+        self.mtime = mtime
+        self.external_attr = (mode & 0xFFFF) << 16
+        self.header_offset = 0
+        self.flags = 0 if name.isascii() else _FLAG_UTF8
+        self.zip64 = False
+
+
+class CompressedFile(NamedTuple):
+    """Resultado de comprimir un archivo en un proceso del pool."""
+    method: int
+    crc: int
+    compress_size: int
+    file_size: int
+    mtime: float
+    mode: int
+    data: bytes
+    level: Optional[int] = None
+
+
+class ArchivedMember(NamedTuple):
+    """Entrada del directorio central de un .zip ya existente."""
+    name: str
+    method: int
+    crc: int
+    compress_size: int
+    file_size: int
+    # Segundos exactos del campo 0x5455 (None si el archivo no lo guardó)
+    mtime: Optional[int]
+    mode: int
+    header_offset: int
+    # Nivel de deflate del campo extra propio (None en .zip de otras herramientas)
+    level: Optional[int] = None
+
+
+def read_archive_index(path: str) -> Dict[str, ArchivedMember]:
+    """
+    Lee solo el directorio central de un .zip (sin descomprimir nada) y
+    devuelve sus miembros por nombre.
+    """
+    import zipfile
+
+    index: Dict[str, ArchivedMember] = {}
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            index[info.filename] = ArchivedMember(
+                info.filename, info.compress_type, info.CRC, info.compress_size,
+                info.file_size, _parse_timestamp_extra(info.extra),
+                info.external_attr >> 16, info.header_offset, _parse_level_extra(info.extra),
+            )
+    return index
+
+
+def iter_raw_member(fileobj: BinaryIO, member: ArchivedMember) -> Iterator[bytes]:
+    """
+    Devuelve los bytes comprimidos de un miembro tal cual están en el
+    archivo, sin descomprimirlos. `fileobj` debe poder hacer `seek`.
+    """
+    fileobj.seek(member.header_offset)
+    header = fileobj.read(_LOCAL_HEADER.size)
+    fields = _LOCAL_HEADER.unpack(header)
+    if fields[0] != b'PK\x03\x04':
+        raise ValueError(f"Cabecera local inválida para '{member.name}'")
+    fileobj.seek(fields[9] + fields[10], os.SEEK_CUR)
+
+    remaining = member.compress_size
+    while remaining:
+        chunk = fileobj.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            raise ValueError(f"'{member.name}' está truncado en el archivo original")
+        remaining -= len(chunk)
+        yield chunk
+
+
+def iter_file_chunks(path: str) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def compress_file(path: str, level: int = 6, method: Optional[int] = None) -> CompressedFile:
+    """
+    Lee y comprime un archivo completo en memoria. Es una función de módulo
+    para poder ejecutarla en un ProcessPoolExecutor.
+    """
+    method = compression_method_for(path) if method is None else method
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15) if method == ZIP_DEFLATED else None
+    crc = 0
+    size = 0
+    parts: List[bytes] = []
+
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            crc = zlib.crc32(chunk, crc)
+            parts.append(compressor.compress(chunk) if compressor else chunk)
+    if compressor:
+        parts.append(compressor.flush())
+
+    data = b''.join(parts)
+    return CompressedFile(method, crc, len(data), size, st.st_mtime, st.st_mode, data, level)
+
+
+class ZipStreamWriter:
+    """
+    Escritor ZIP que nunca hace `seek`: lleva la cuenta de los bytes
+    escritos, así que sirve igual para un archivo que para una tubería o
+    stdout. Soporta ZIP64 (miembros o archivos de más de 4 GB y más de
+    65535 entradas) y descriptores de datos para comprimir en streaming.
+    """
+
+    def __init__(self, fileobj: BinaryIO):
+        self.fileobj = fileobj
+        self.offset = 0
+        self.members: List[ZipMember] = []
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    def _write(self, data: bytes):
+        self.fileobj.write(data)
+        self.offset += len(data)
+
+    def _write_local_header(self, member: ZipMember, known_sizes: bool):
+        name = member.name.encode('utf-8')
+        extra = b''
+        crc = member.crc if known_sizes else 0
+        compress_size = member.compress_size if known_sizes else 0
+        file_size = member.file_size if known_sizes else 0
+
+        if member.zip64:
+            extra += struct.pack('<HHQQ', 1, 16, file_size, compress_size)
+            compress_size = file_size = _ZIP64_LIMIT
+        extra += _timestamp_extra(member.mtime)
+
+        version = 45 if member.zip64 else 20
+        date, dos_time = _dos_datetime(member.mtime)
+        member.header_offset = self.offset
+        self._write(_LOCAL_HEADER.pack(
+            b'PK\x03\x04', version, member.flags, member.method, dos_time, date,
+            crc, compress_size, file_size, len(name), len(extra),
+        ))
+        self._write(name)
+        self._write(extra)
+
+    def write_compressed(self, name: str, compressed: CompressedFile) -> ZipMember:
+        """Añade un miembro ya comprimido (p. ej. por un proceso del pool)."""
+        member = ZipMember(name, compressed.method, compressed.mtime, compressed.mode, compressed.level)
+        member.crc = compressed.crc
+        member.compress_size = compressed.compress_size
+        member.file_size = compressed.file_size
+        return self.write_raw(member, (compressed.data,))
+
+    def copy_member(self, member: ArchivedMember, source: BinaryIO) -> ZipMember:
+        """Copia un miembro de otro .zip sin descomprimirlo ni recomprimirlo."""
+        new = ZipMember(member.name, member.method, member.mtime, member.mode, member.level)
+        new.crc = member.crc
+        new.compress_size = member.compress_size
+        new.file_size = member.file_size
+        return self.write_raw(new, iter_raw_member(source, member))
+
+    def write_raw(self, member: ZipMember, chunks: Iterable[bytes]) -> ZipMember:
+        """
+        Añade un miembro cuyos datos ya están comprimidos y cuyo CRC y tamaños
+        se conocen; `chunks` se copia tal cual.
+        """
+        member.zip64 = member.file_size >= _ZIP64_LIMIT or member.compress_size >= _ZIP64_LIMIT
+        self._write_local_header(member, known_sizes=True)
+        for chunk in chunks:
+            self._write(chunk)
+        self.members.append(member)
+        return member
+
+    def write_stream(self, name: str, chunks: Iterable[bytes], mtime: float, mode: int,
+                     method: Optional[int] = None, level: int = 6,
+                     size_hint: int = 0) -> ZipMember:
+        """
+        Comprime `chunks` mientras se escriben, con un descriptor de datos al
+        final, de modo que la memoria usada no depende del tamaño del archivo.
+        `size_hint` decide de antemano si hace falta ZIP64.
+        """
+        method = compression_method_for(name) if method is None else method
+        member = ZipMember(name, method, mtime, mode, level)
+        member.flags |= _FLAG_DATA_DESCRIPTOR
+        # Margen para datos incompresibles, que deflate puede inflar un poco
+        member.zip64 = size_hint + size_hint // 1000 + 1024 >= _ZIP64_LIMIT
+        self._write_local_header(member, known_sizes=False)
+
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15) if method == ZIP_DEFLATED else None
+        crc = 0
+        size = 0
+        compress_size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            crc = zlib.crc32(chunk, crc)
+            data = compressor.compress(chunk) if compressor else chunk
+            if data:
+                compress_size += len(data)
+                self._write(data)
+        if compressor:
+            data = compressor.flush()
+            compress_size += len(data)
+            self._write(data)
+
+        member.crc, member.file_size, member.compress_size = crc, size, compress_size
+        if member.zip64:
+            self._write(struct.pack('<4sIQQ', b'PK\x07\x08', crc, compress_size, size))
+        else:
+            if size >= _ZIP64_LIMIT or compress_size >= _ZIP64_LIMIT:
+                raise ValueError(f"'{name}' creció por encima de 4 GB sin ZIP64; indique size_hint")
+            self._write(struct.pack('<4sIII', b'PK\x07\x08', crc, compress_size, size))
+
+        self.members.append(member)
+        return member
+
+    def write_file(self, name: str, path: str, level: int = 6, method: Optional[int] = None) -> ZipMember:
+        """Añade un archivo del disco comprimiéndolo en streaming."""
+        st = os.stat(path)
+        if not stat.S_ISREG(st.st_mode):
+            raise ValueError(f"'{path}' no es un archivo regular")
+        return self.write_stream(name, iter_file_chunks(path), st.st_mtime, st.st_mode,
+                                 method=method, level=level, size_hint=st.st_size)
+
+    def close(self):
+        """Escribe el directorio central y, si hace falta, los registros ZIP64."""
+        if self._closed:
+            return
+        self._closed = True
+
+        cd_start = self.offset
+        for member in self.members:
+            name = member.name.encode('utf-8')
+            zip64_fields = []
+            file_size, compress_size, offset = member.file_size, member.compress_size, member.header_offset
+            if file_size >= _ZIP64_LIMIT:
+                zip64_fields.append(file_size)
+                file_size = _ZIP64_LIMIT
+            if compress_size >= _ZIP64_LIMIT:
+                zip64_fields.append(compress_size)
+                compress_size = _ZIP64_LIMIT
+            if offset >= _ZIP64_LIMIT:
+                zip64_fields.append(offset)
+                offset = _ZIP64_LIMIT
+
+            extra = b''
+            if zip64_fields:
+                extra += struct.pack(f'<HH{len(zip64_fields)}Q', 1, 8 * len(zip64_fields), *zip64_fields)
+            extra += _timestamp_extra(member.mtime)
+            if member.level is not None:
+                extra += _level_extra(member.level)
+
+            version = 45 if (zip64_fields or member.zip64) else 20
+            date, dos_time = _dos_datetime(member.mtime)
+            self._write(_CENTRAL_HEADER.pack(
+                b'PK\x01\x02', version, 3, version, member.flags, member.method, dos_time, date,
+                member.crc, compress_size, file_size, len(name), len(extra), 0, 0, 0,
+                member.external_attr, offset,
+            ))
+            self._write(name)
+            self._write(extra)
+
+        cd_size = self.offset - cd_start
+        count = len(self.members)
+        if count > _ZIP16_LIMIT or cd_size >= _ZIP64_LIMIT or cd_start >= _ZIP64_LIMIT:
+            end64_offset = self.offset
+            self._write(_END_RECORD64.pack(
+                b'PK\x06\x06', _END_RECORD64.size - 12, 45, 45, 0, 0, count, count, cd_size, cd_start,
+            ))
+            self._write(_END_LOCATOR64.pack(b'PK\x06\x07', 0, end64_offset, 1))
+            self._write(_END_RECORD.pack(
+                b'PK\x05\x06', 0, 0, min(count, _ZIP16_LIMIT), min(count, _ZIP16_LIMIT),
+                min(cd_size, _ZIP64_LIMIT), min(cd_start, _ZIP64_LIMIT), 0,
+            ))
+        else:
+            self._write(_END_RECORD.pack(b'PK\x05\x06', 0, 0, count, count, cd_size, cd_start, 0))
+        self.fileobj.flush()
@@ -1,53 +1,346 @@
 #!/usr/bin/env python3
 
 import argparse
+import asyncio
 import logging
+import os
+import selectors
+import signal
 import subprocess
+import sys
+import time
+from collections import deque
 from pathlib import Path
-from typing import List, Optional
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+READ_SIZE = 64 * 1024
+
+class OutputTail:
+    """Ring buffer with the last `max_bytes` of a command's output, for error reports."""
+
+    def __init__(self, max_bytes: int = 64 * 1024):
+        self.max_bytes = max_bytes
+        self._chunks = deque()
+        self._size = 0
+
+    def append(self, data: bytes):
+        self._chunks.append(data)
+        self._size += len(data)
+        while self._size - len(self._chunks[0]) >= self.max_bytes:
+            self._size -= len(self._chunks.popleft())
+
+    def text(self, lines: int = 20) -> str:
+        data = b"".join(self._chunks)[-self.max_bytes:]
+        return "\n".join(data.decode(errors="replace").splitlines()[-lines:])
 
 class TaskRunner:
-    def __init__(self):
+    """
+    Runs commands one at a time, streaming their stdout and stderr to the
+    console (and to `log_file`, if given) as they arrive instead of buffering
+    them. Only the last `tail_bytes` are kept, to report a failure.
+
+    `timeout` is an inactivity timeout: a command is killed after that many
+    seconds without any output, however long it has been running. It can
+    be overridden per command; None or 0 disables it.
+    """
+
+    def __init__(self, timeout: Optional[float] = 30.0, log_file: Optional[str] = None,
+                 tail_bytes: int = 64 * 1024):
+        self.timeout = timeout
+        self.log_file = log_file
+        self.tail_bytes = tail_bytes
         self._setup_logging()
-        
+
     def _setup_logging(self):
         logging.basicConfig(
             format="%(asctime)s - %(levelname)s: %(message)s",
             level=logging.INFO
         )
 
-    def execute(self, command: List[str]) -> bool:
+    def execute(self, command: List[str], timeout: Optional[float] = None) -> bool:
+        timeout = (self.timeout if timeout is None else timeout) or None
+        tail = OutputTail(self.tail_bytes)
         try:
-            result = subprocess.run(
-                command,
-                check=True,
-                timeout=30,
-                capture_output=True,
-                text=True
-            )
-            logging.info(result.stdout)
-            return True
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Command failed: {e.stderr}")
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            logging.error(f"Command failed: {e}")
+            return False
+
+        log = open(self.log_file, "ab") if self.log_file else None
+        try:
+            if log:
+                log.write(f"$ {' '.join(command)}\n".encode())
+            if not self._pump(process, tail, log, timeout):
+                process.kill()
+                process.wait()
+                logging.error(f"Command timed out: no output for {timeout:g}s\n{tail.text()}")
+                return False
+        finally:
+            if log:
+                log.close()
+
+        if process.returncode != 0:
+            logging.error(f"Command failed (exit {process.returncode}): {' '.join(command)}\n{tail.text()}")
             return False
+        return True
+
+    @staticmethod
+    def _pump(process: subprocess.Popen, tail: OutputTail, log, timeout: Optional[float]) -> bool:
+        """Copies both pipes to the console until they close and the process exits; False on timeout."""
+        targets = {process.stdout: sys.stdout.buffer, process.stderr: sys.stderr.buffer}
+        with selectors.DefaultSelector() as selector:
+            for pipe in targets:
+                selector.register(pipe, selectors.EVENT_READ)
+            while selector.get_map():
+                events = selector.select(timeout)
+                if not events:
+                    return False
+                for key, _ in events:
+                    data = os.read(key.fd, READ_SIZE)
+                    if not data:
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+                        continue
+                    target = targets[key.fileobj]
+                    target.write(data)
+                    target.flush()
+                    if log:
+                        log.write(data)
+                    tail.append(data)
+        try:
+            process.wait(timeout)
         except subprocess.TimeoutExpired:
-            logging.error("Command timed out")
             return False
+        return True
 
-def make_commit(args):
-    commit_command = ["git", "add", "."]
+class Step(NamedTuple):
+    command: List[str]
+    # Inactivity timeout for this step; None uses the runner's default, 0 disables it
+    timeout: Optional[float] = None
+
+class StepResult(NamedTuple):
+    command: List[str]
+    # None when the step was killed on timeout
+    returncode: Optional[int]
+    duration: float
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+class RepoResult:
+    def __init__(self, repo: str):
+        self.repo = repo
+        self.steps: List[StepResult] = []
+        self.duration = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(step.ok for step in self.steps)
+
+    @property
+    def status(self) -> str:
+        for step in self.steps:
+            if step.returncode is None:
+                return f"timeout: {' '.join(step.command[:2])}"
+            if not step.ok:
+                return f"failed: {' '.join(step.command[:2])} (exit {step.returncode})"
+        return "ok"
+
+class BatchRunner:
+    """
+    Runs the same sequence of commands in many repositories at once, with
+    at most `concurrency` repositories in flight. Each step is an asyncio
+    subprocess whose output is streamed line by line with a per-repo prefix
+    (and copied to `log_file`, if given). As in `TaskRunner`, the timeout
+    is for inactivity: a step that prints nothing for its timeout (the
+    step's own, or `step_timeout` by default) is killed and stops its repo.
+    """
+
+    def __init__(self, concurrency: int = 4, step_timeout: Optional[float] = 30.0,
+                 log_file: Optional[str] = None):
+        self.concurrency = max(1, concurrency)
+        self.step_timeout = step_timeout or None
+        self.log_file = log_file
+        self._log = None
+        self._width = 0
+        # Never wait for credentials on a terminal nobody is watching
+        self._env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+
+    def _emit(self, label: str, line: str):
+        text = f"[{label:<{self._width}}] {line}\n"
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        if self._log:
+            self._log.write(text)
+
+    async def _stream(self, process: asyncio.subprocess.Process, label: str,
+                      timeout: Optional[float]) -> int:
+        # Read in chunks, not lines, so a huge line cannot overrun the reader
+        pending = b""
+        while True:
+            chunk = await asyncio.wait_for(process.stdout.read(READ_SIZE), timeout)
+            if not chunk:
+                break
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                self._emit(label, line.decode(errors="replace"))
+        if pending:
+            self._emit(label, pending.decode(errors="replace"))
+        return await asyncio.wait_for(process.wait(), timeout)
+
+    async def run_step(self, repo: str, label: str, step: Step) -> StepResult:
+        command = step.command
+        timeout = (self.step_timeout if step.timeout is None else step.timeout) or None
+        start = time.monotonic()
+        self._emit(label, f"$ {' '.join(command)}")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=repo,
+                env=self._env,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                # Own process group, so a timeout also kills hooks and helpers
+                start_new_session=True
+            )
+        except OSError as e:
+            self._emit(label, f"Command failed: {e}")
+            return StepResult(command, 127, time.monotonic() - start)
+
+        try:
+            returncode = await self._stream(process, label, timeout)
+        except asyncio.TimeoutError:
+            self._kill(process)
+            await process.wait()
+            self._emit(label, f"Command timed out: no output for {timeout:g}s")
+            returncode = None
+        except asyncio.CancelledError:
+            # Ctrl+C: the group does not get the terminal's SIGINT
+            self._kill(process)
+            raise
+        return StepResult(command, returncode, time.monotonic() - start)
+
+    @staticmethod
+    def _kill(process: asyncio.subprocess.Process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    async def run_repo(self, repo: str, label: str, steps: List[Step],
+                       semaphore: asyncio.Semaphore) -> RepoResult:
+        result = RepoResult(repo)
+        async with semaphore:
+            start = time.monotonic()
+            for step in steps:
+                step_result = await self.run_step(repo, label, step)
+                result.steps.append(step_result)
+                if not step_result.ok:
+                    break
+            result.duration = time.monotonic() - start
+        return result
+
+    async def run_async(self, repos: List[str], steps: List[Union[Step, List[str]]]) -> List[RepoResult]:
+        # Plain command lists use the default timeout
+        steps = [step if isinstance(step, Step) else Step(step) for step in steps]
+        labels = repo_labels(repos)
+        self._width = max(map(len, labels), default=0)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(
+            self.run_repo(repo, label, steps, semaphore) for repo, label in zip(repos, labels)
+        ))
+
+    def run(self, repos: List[str], steps: List[Union[Step, List[str]]]) -> List[RepoResult]:
+        self._log = open(self.log_file, "a", encoding="utf-8") if self.log_file else None
+        try:
+            return asyncio.run(self.run_async(repos, steps))
+        finally:
+            if self._log:
+                self._log.close()
+                self._log = None
+
+def repo_labels(repos: List[str]) -> List[str]:
+    """Directory names as output prefixes, or the full paths when names repeat."""
+    names = [Path(repo).resolve().name or repo for repo in repos]
+    if len(set(names)) == len(names):
+        return names
+    return list(repos)
+
+def print_summary(results: List[RepoResult]):
+    rows = [(result.repo, result.status, f"{result.duration:.1f}s") for result in results]
+    headers = ("Repository", "Status", "Duration")
+    widths = [max(len(row[i]) for row in rows + [headers]) for i in range(3)]
+    line = "  ".join("-" * width for width in widths)
+    print()
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)))
+    print(line)
+    for row in rows:
+        print(f"{row[0]:<{widths[0]}}  {row[1]:<{widths[1]}}  {row[2]:>{widths[2]}}")
+    failed = sum(not result.ok for result in results)
+    total = sum(result.duration for result in results)
+    print(line)
+    print(f"{len(results) - failed} ok, {failed} failed, {total:.1f}s of work")
+
+def read_repo_list(path: str) -> List[str]:
+    """One repository path per line; blank lines and '#' comments are ignored."""
+    with open(path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+COMMIT_STEP_NAMES = ("add", "diff", "commit", "push")
+
+def parse_step_timeout(value: str) -> Tuple[str, float]:
+    """`STEP=SECONDS` for --timeout, e.g. `push=120`."""
+    step, _, seconds = value.partition("=")
+    if step not in COMMIT_STEP_NAMES:
+        raise argparse.ArgumentTypeError(
+            f"unknown step in '{value}' (expected one of: {', '.join(COMMIT_STEP_NAMES)})")
+    try:
+        return step, float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected STEP=SECONDS, got '{value}'")
+
+def commit_steps(args) -> List[Step]:
+    """
+    The add / commit / push sequence, or with `args.dry_run` only the diff
+    of what is staged; each step runs only if the previous one succeeded.
+    A step's timeout comes from `args.timeouts`, keyed by git subcommand,
+    or else from `args.step_timeout`.
+    """
     if args.dry_run:
-        commit_command = ["git", "diff", "--cached"]
-    
-    runner = TaskRunner()
-    if not runner.execute(commit_command):
+        steps = [["git", "diff", "--cached"]]
+    else:
+        commit_message = f"'{args.message}'" if args.message else "Auto-commit"
+        steps = [
+            ["git", "add", "."],
+            ["git", "commit", "-m", commit_message],
+            ["git", "push", "origin", args.branch],
+        ]
+    timeouts = dict(args.timeouts or [])
+    return [Step(command, timeouts.get(command[1])) for command in steps]
+
+def make_commit(args):
+    repos = list(args.repos or [])
+    if args.repos_file:
+        repos += read_repo_list(args.repos_file)
+    if repos:
+        make_commit_batch(args, repos)
         return
-    
-    commit_message = f"'{args.message}'" if args.message else "Auto-commit"
-    commit_args = ["git", "commit", "-m", commit_message]
-    
-    if runner.execute(commit_args) and not args.dry_run:
-        runner.execute(["git", "push", "origin", args.branch])
+
+    runner = TaskRunner(timeout=args.step_timeout, log_file=args.log_file)
+    for step in commit_steps(args):
+        if not runner.execute(step.command, step.timeout):
+            return
+
+def make_commit_batch(args, repos: List[str]):
+    runner = BatchRunner(concurrency=args.concurrency, step_timeout=args.step_timeout,
+                         log_file=args.log_file)
+    results = runner.run(repos, commit_steps(args))
+    print_summary(results)
+    if not all(result.ok for result in results):
+        sys.exit(1)
 
 def setup_parsers():
     parser = argparse.ArgumentParser(
@@ -76,6 +369,42 @@ def setup_parsers():
         action="store_true",
         help="Show diff instead of committing"
     )
+    commit_parser.add_argument(
+        "--repos",
+        nargs="+",
+        metavar="PATH",
+        help="Run the workflow in each of these repository checkouts concurrently"
+    )
+    commit_parser.add_argument(
+        "--repos-file",
+        metavar="FILE",
+        help="File with one repository path per line (added to --repos)"
+    )
+    commit_parser.add_argument(
+        "-j", "--concurrency",
+        type=int,
+        default=4,
+        help="Repositories processed at the same time in batch mode (default: 4)"
+    )
+    commit_parser.add_argument(
+        "--step-timeout",
+        type=float,
+        default=30.0,
+        help="Seconds a git step may go without output before it is killed (default: 30, 0 disables it)"
+    )
+    commit_parser.add_argument(
+        "--timeout",
+        dest="timeouts",
+        action="append",
+        type=parse_step_timeout,
+        metavar="STEP=SECONDS",
+        help="Timeout for one step (add, diff, commit or push), overriding --step-timeout; repeatable"
+    )
+    commit_parser.add_argument(
+        "--log-file",
+        metavar="FILE",
+        help="Also append the commands' output to this file"
+    )
     commit_parser.set_defaults(func=make_commit)
 
     return parser
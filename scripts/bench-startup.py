@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Mide el tiempo de arranque de un módulo con `python -X importtime`.
+
+    python scripts/bench-startup.py                 # import gemini
+    python scripts/bench-startup.py gemini google.generativeai -n 10
+
+Para cada módulo se lanza `-n` veces un intérprete nuevo que solo lo
+importa, y se informa de la mediana del tiempo acumulado de su import y de
+los imports más lentos de la última ejecución. Los módulos se buscan
+primero en el directorio de este script.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+DIRECTORIO = Path(__file__).resolve().parent
+
+class Import(NamedTuple):
+    modulo: str
+    propio_us: int
+    acumulado_us: int
+    nivel: int
+
+def parsear_importtime(salida: str) -> List[Import]:
+    """Líneas `import time: propio | acumulado | módulo` de `-X importtime`."""
+    imports = []
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        campos = linea[len("import time:"):].split("|")
+        if len(campos) != 3 or not campos[0].strip().isdigit():
+            # Cabecera: "self [us] | cumulative | imported package"
+            continue
+        nombre = campos[2].rstrip()
+        sangria = len(nombre) - len(nombre.lstrip())
+        imports.append(Import(nombre.strip(), int(campos[0]), int(campos[1]), sangria // 2))
+    return imports
+
+def medir(modulo: str) -> Tuple[int, List[Import]]:
+    """Importa `modulo` en un intérprete nuevo; devuelve su tiempo acumulado (µs) y todos los imports."""
+    entorno = dict(os.environ)
+    entorno["PYTHONPATH"] = os.pathsep.join(filter(None, [str(DIRECTORIO), entorno.get("PYTHONPATH")]))
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True,
+        text=True,
+        env=entorno,
+    )
+    if resultado.returncode != 0:
+        error = resultado.stderr.strip().splitlines()
+        raise RuntimeError(f"No se pudo importar '{modulo}': {error[-1] if error else resultado.returncode}")
+    imports = parsear_importtime(resultado.stderr)
+    # El import pedido es la última línea de nivel 0 con su nombre
+    total = next((i.acumulado_us for i in reversed(imports) if i.modulo == modulo and i.nivel == 0), 0)
+    return total, imports
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el tiempo de importar módulos con -X importtime.")
+    parser.add_argument("modulos", nargs="*", default=["gemini"], help="Módulos a importar (por defecto, gemini)")
+    parser.add_argument("-n", "--repeticiones", type=int, default=5, help="Intérpretes por módulo (por defecto 5)")
+    parser.add_argument("--top", type=int, default=10, help="Imports más lentos a mostrar (por defecto 10)")
+    args = parser.parse_args()
+
+    resumen: Dict[str, float] = {}
+    for modulo in args.modulos:
+        try:
+            mediciones = [medir(modulo) for _ in range(max(1, args.repeticiones))]
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            continue
+        mediana = statistics.median(total for total, _ in mediciones)
+        resumen[modulo] = mediana
+
+        print(f"\n{modulo}: {mediana / 1000:.1f} ms (mediana de {len(mediciones)})")
+        _, imports = mediciones[-1]
+        for i in sorted(imports, key=lambda i: i.propio_us, reverse=True)[:args.top]:
+            print(f"  {i.propio_us / 1000:8.1f} ms propio  {i.acumulado_us / 1000:8.1f} ms acumulado  {i.modulo}")
+
+    if len(resumen) > 1:
+        print("\nResumen:")
+        for modulo, mediana in resumen.items():
+            print(f"  {mediana / 1000:8.1f} ms  {modulo}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Resume un repositorio con Gemini en dos fases (map-reduce):
+
+1. Genera las partes de `make-markdown` (en un bundle temporal) y resume
+   cada parte, o cada bloque de archivo con `--por-archivo`, en paralelo y
+   con un límite de peticiones por minuto.
+2. Fusiona los resúmenes por grupos de `--grupo`, nivel a nivel, hasta
+   quedarse con un único resumen del repositorio.
+
+Todas las respuestas van a la caché de `GeminiAPI`, cuya clave es un hash
+del prompt y, por tanto, del contenido del bloque. Al repetir la ejecución
+tras un cambio pequeño solo se vuelven a pedir los bloques que cambian y las
+fusiones que dependen de ellos. La fecha de modificación de las cabeceras se
+quita antes de resumir, para que tocar un archivo no invalide su resumen.
+
+    python scripts/resumir.py ~/src/proyecto -o resumen.md
+    python scripts/resumir.py ~/src/proyecto --por-archivo --por-minuto 15
+    python scripts/resumir.py ~/src/proyecto --stub      # sin red, para pruebas
+"""
+import os
+import re
+import sys
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# maketools está en make/, junto a este directorio
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "make"))
+
+from gemini import RUTA_CACHE_POR_DEFECTO, GeminiAPI, TransporteStub
+
+PROMPT_BLOQUE = (
+    "Resume en español, en un máximo de {palabras} palabras, qué hace el siguiente "
+    "fragmento de un repositorio de código. Menciona los archivos, módulos y "
+    "funciones importantes.\n\n{texto}"
+)
+PROMPT_FUSION = (
+    "Los siguientes textos resumen partes del mismo repositorio de código. "
+    "Combínalos en un único resumen en español de como mucho {palabras} palabras, "
+    "sin repetir información.\n\n{texto}"
+)
+
+# Línea de metadatos que cambia con solo tocar el archivo
+_FECHA = re.compile(r"^- Last Modified: .*\n", re.MULTILINE)
+
+Bloque = Tuple[str, str]
+
+def extraer_bloques(directorio: str, por_archivo: bool = False, rules: Optional[str] = "exceptions",
+                    **opciones) -> List[Bloque]:
+    """
+    Ejecuta `make-markdown` sobre `directorio` y devuelve `(nombre, texto)`
+    de cada parte o, con `por_archivo`, de cada bloque de archivo (por ruta
+    relativa). `opciones` se pasan a `bundle_markdown` (p. ej. `max_tokens`).
+    """
+    from maketools.api import bundle_markdown
+    from maketools.bundle import Bundle, BundleSink
+
+    with tempfile.TemporaryDirectory(prefix="resumir-") as temporal:
+        ruta = os.path.join(temporal, "partes.md.bundle")
+        with BundleSink(ruta) as sink:
+            bundle_markdown(directorio, rules=rules, sink=sink, use_cache=False, **opciones)
+        with Bundle(ruta) as bundle:
+            if por_archivo:
+                return [(nombre, bundle.read(nombre)) for nombre in bundle.names()]
+            return [(parte.name, bundle.read_part(parte.name)) for parte in bundle.parts]
+
+def normalizar_bloque(texto: str) -> str:
+    return _FECHA.sub("", texto)
+
+def resumir_bloques(api: GeminiAPI, bloques: List[Bloque], palabras: int = 200,
+                    max_concurrencia: int = 4, max_por_minuto: Optional[float] = None) -> List[str]:
+    """Fase map: un resumen por bloque, en el mismo orden."""
+    prompts = [PROMPT_BLOQUE.format(palabras=palabras, texto=normalizar_bloque(texto))
+               for _, texto in bloques]
+    return api.generar_lote(prompts, max_concurrencia=max_concurrencia, max_por_minuto=max_por_minuto)
+
+def fusionar(api: GeminiAPI, resumenes: List[str], grupo: int = 8, palabras: int = 400,
+             max_concurrencia: int = 4, max_por_minuto: Optional[float] = None) -> str:
+    """
+    Fase reduce: fusiona los resúmenes de `grupo` en `grupo` hasta que queda
+    uno. Los grupos son siempre los mismos para la misma lista, así que un
+    resumen que cambia solo invalida las fusiones de su rama.
+    """
+    if not resumenes:
+        return ""
+    grupo = max(2, grupo)
+    nivel = resumenes
+    while len(nivel) > 1:
+        prompts = [
+            PROMPT_FUSION.format(palabras=palabras, texto="\n\n---\n\n".join(nivel[i:i + grupo]))
+            for i in range(0, len(nivel), grupo)
+        ]
+        nivel = api.generar_lote(prompts, max_concurrencia=max_concurrencia, max_por_minuto=max_por_minuto)
+    return nivel[0]
+
+def resumen_stub(modelo: str, prompt: str, params) -> str:
+    """Respuesta determinista del modelo de pruebas: la primera línea con contenido del bloque."""
+    texto = prompt.split("\n\n", 1)[-1]
+    lineas = [linea.strip("#` ") for linea in texto.splitlines() if linea.strip("#`- ")]
+    return f"{lineas[0] if lineas else '(vacío)'} [{len(texto)} caracteres]"
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume un repositorio con Gemini a partir de las partes de make-markdown.")
+    parser.add_argument("directorio", help="Directorio a resumir")
+    parser.add_argument("-o", "--output", help="Archivo Markdown de salida (por defecto, stdout)")
+    parser.add_argument("--por-archivo", action="store_true",
+                        help="Resumir cada bloque de archivo en lugar de cada parte")
+    parser.add_argument("--rules", default="exceptions",
+                        help="Archivo de reglas de exclusión (por defecto, 'exceptions' en el directorio actual)")
+    parser.add_argument("--max-tokens", type=int, help="Tokens estimados por parte (por defecto, 50000 líneas)")
+    parser.add_argument("--grupo", type=int, default=8, help="Resúmenes por fusión (por defecto 8)")
+    parser.add_argument("-j", "--concurrencia", type=int, default=4, help="Peticiones simultáneas (por defecto 4)")
+    parser.add_argument("--por-minuto", type=float, help="Máximo de peticiones por minuto")
+    parser.add_argument("--modelo", default="gemini-1.5-flash", help="Modelo de Gemini")
+    parser.add_argument("--cache", help=f"Caché de respuestas (SQLite; por defecto {RUTA_CACHE_POR_DEFECTO}, "
+                                        "o solo en memoria con --stub)")
+    parser.add_argument("--stub", action="store_true", help="Usar un modelo local de pruebas, sin red")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directorio):
+        parser.error(f"'{args.directorio}' no es un directorio")
+
+    if args.stub:
+        # Otro nombre de modelo, para no mezclar sus respuestas con las reales
+        # si se comparte una caché con --cache
+        api = GeminiAPI(modelo="stub", cache=args.cache or ":memory:", transporte=TransporteStub(resumen_stub))
+    else:
+        api = GeminiAPI(modelo=args.modelo, cache=args.cache or RUTA_CACHE_POR_DEFECTO)
+
+    # Los mensajes del bundler van a stderr; stdout queda para el resumen
+    with redirect_stdout(sys.stderr):
+        opciones = {"max_tokens": args.max_tokens} if args.max_tokens else {}
+        bloques = extraer_bloques(args.directorio, args.por_archivo, args.rules, **opciones)
+    if not bloques:
+        parser.exit(1, "Error: no hay nada que resumir\n")
+
+    lote = {"max_concurrencia": args.concurrencia, "max_por_minuto": args.por_minuto}
+    try:
+        resumenes = resumir_bloques(api, bloques, **lote)
+        final = fusionar(api, resumenes, args.grupo, **lote)
+    except RuntimeError as e:
+        # Lo ya generado queda en la caché para la próxima ejecución
+        parser.exit(1, f"Error: {e}\n")
+    finally:
+        print(f"Bloques: {len(bloques)}; respuestas de la caché: {api.cache.aciertos}, "
+              f"pedidas al modelo: {api.cache.fallos}.", file=sys.stderr)
+
+    nombre = os.path.basename(os.path.normpath(args.directorio))
+    salida = [f"# Resumen de `{nombre}`\n\n{final}\n\n## Resúmenes por {'archivo' if args.por_archivo else 'parte'}\n"]
+    salida += [f"\n### `{nombre_bloque}`\n\n{resumen}\n" for (nombre_bloque, _), resumen in zip(bloques, resumenes)]
+    if args.output:
+        Path(args.output).write_text("".join(salida), encoding="utf-8")
+        print(f"Resumen guardado en '{args.output}'.", file=sys.stderr)
+    else:
+        print("".join(salida), end="")
+
+if __name__ == "__main__":
+    main()
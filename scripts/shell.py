@@ -1,15 +1,208 @@
 #!/usr/bin/env python3
 import argparse
+import io
 import logging
+import os
 import readline
+import shlex
 import signal
 import subprocess
+import threading
+import time
+from contextlib import redirect_stdout
 from pathlib import Path
-from typing import List
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+# Entries kept when the history file is compacted
+HISTORY_SIZE = 1000
+
+# Longest first, so that '>>' is not read as two '>'
+OPERATORS = ("2>&1", "2>>", ">>", "2>", "|", "&", "<", ">")
+
+def tokenize(line: str) -> List[Tuple[bool, str]]:
+    """
+    Split a command line into `(is_operator, text)` tokens. Operators are
+    only recognised outside quotes and escapes; the words between them are
+    split (and unquoted) by shlex.
+    """
+    tokens: List[Tuple[bool, str]] = []
+    start = i = 0
+    quote = None
+    while i < len(line):
+        c = line[i]
+        if quote == "'":
+            if c == "'":
+                quote = None
+        elif c == "\\":
+            i += 1
+        elif quote == '"':
+            if c == '"':
+                quote = None
+        elif c in "'\"":
+            quote = c
+        else:
+            # '2>', '2>>' and '2>&1' only count at the start of a word: in
+            # 'x2>&1' the '2' belongs to the word 'x2' and what follows is
+            # '>&', which is not supported
+            at_word_start = i == 0 or line[i - 1].isspace()
+            operator = next((op for op in OPERATORS if line.startswith(op, i)
+                             and (not op.startswith("2") or at_word_start)), None)
+            if operator in (">", ">>", "2>", "2>>") and line.startswith("&", i + len(operator)):
+                raise ValueError(f"'{operator}&' is not supported (only '2>&1' is)")
+            if operator is not None:
+                tokens += [(False, word) for word in shlex.split(line[start:i])]
+                tokens.append((True, operator))
+                i += len(operator)
+                start = i
+                continue
+        i += 1
+    # shlex reports unterminated quotes
+    tokens += [(False, word) for word in shlex.split(line[start:])]
+    return tokens
+
+class Stage:
+    """One command of a pipeline, with its redirections."""
 
-class ShellCore:
     def __init__(self):
+        self.argv: List[str] = []
+        self.stdin: Optional[str] = None
+        self.stdout: Optional[str] = None
+        self.append = False
+        self.stderr: Optional[str] = None
+        self.stderr_append = False
+        self.stderr_to_stdout = False
+
+class Pipeline(NamedTuple):
+    stages: List[Stage]
+    background: bool
+
+def parse_pipeline(line: str) -> Pipeline:
+    """
+    Parse `cmd [< in] [> out | >> out] [2> err | 2>> err | 2>&1] | cmd ... [&]`.
+    `2>&1` sends the stage's stderr wherever its stdout goes, wherever it is
+    written; of `2>`/`2>>` and `2>&1`, the last one given wins.
+    Raises ValueError on syntax errors.
+    """
+    tokens = tokenize(line)
+    stages = [Stage()]
+    background = False
+    i = 0
+    while i < len(tokens):
+        is_operator, text = tokens[i]
+        stage = stages[-1]
+        if not is_operator:
+            stage.argv.append(text)
+        elif text == "|":
+            if not stage.argv:
+                raise ValueError("syntax error near '|'")
+            stages.append(Stage())
+        elif text == "&":
+            if i != len(tokens) - 1:
+                raise ValueError("'&' is only supported at the end of a command")
+            background = True
+        elif text == "2>&1":
+            stage.stderr_to_stdout = True
+            stage.stderr = None
+        else:
+            i += 1
+            if i == len(tokens) or tokens[i][0]:
+                raise ValueError(f"syntax error: '{text}' needs a file name")
+            if text == "<":
+                stage.stdin = tokens[i][1]
+            elif text in ("2>", "2>>"):
+                stage.stderr = tokens[i][1]
+                stage.stderr_append = text == "2>>"
+                stage.stderr_to_stdout = False
+            else:
+                stage.stdout = tokens[i][1]
+                stage.append = text == ">>"
+        i += 1
+    last = stages[-1]
+    if not last.argv and (len(stages) > 1 or background or last.stdin or last.stdout
+                          or last.stderr or last.stderr_to_stdout):
+        raise ValueError("syntax error: missing command")
+    return Pipeline(stages, background)
+
+def describe_status(returncode: Optional[int]) -> str:
+    if returncode is not None and returncode < 0:
+        try:
+            return signal.Signals(-returncode).name
+        except ValueError:
+            pass
+    return str(returncode)
+
+class Job:
+    def __init__(self, job_id: int, line: str, processes: List[subprocess.Popen]):
+        self.id = job_id
+        self.line = line
+        self.processes = processes
+
+    @property
+    def returncode(self) -> Optional[int]:
+        """Exit status of the last stage."""
+        return self.processes[-1].returncode
+
+    def __str__(self) -> str:
+        return f"[{self.id}] {self.processes[-1].pid} {self.line}"
+
+class JobTable:
+    """
+    Background jobs started with `cmd &`. Each process runs in its own
+    session, so Ctrl-C at the prompt does not reach it and it has no
+    timeout; jobs are reaped (and reported) before the next prompt, or
+    waited for with `fg` and `wait`.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[int, Job] = {}
+
+    def add(self, processes: List[subprocess.Popen], line: str) -> Job:
+        job = Job(max(self.jobs, default=0) + 1, line, processes)
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, spec: Optional[str] = None) -> Job:
+        """Job by number (`2` or `%2`); without one, the most recent."""
+        if not self.jobs:
+            raise KeyError("no current job")
+        if spec is None:
+            return self.jobs[max(self.jobs)]
+        try:
+            return self.jobs[int(spec.lstrip("%"))]
+        except (ValueError, KeyError):
+            raise KeyError(f"{spec}: no such job") from None
+
+    def reap(self) -> List[Job]:
+        """Remove and return the jobs that have finished."""
+        done = [job for job in self.jobs.values()
+                if all(process.poll() is not None for process in job.processes)]
+        for job in done:
+            del self.jobs[job.id]
+        return done
+
+    def wait(self, job: Job) -> Optional[int]:
+        """Wait for `job` in the foreground; Ctrl-C is forwarded to its processes."""
+        def forward(signum, frame):
+            for process in job.processes:
+                try:
+                    os.killpg(process.pid, signum)
+                except ProcessLookupError:
+                    pass
+
+        previous = signal.signal(signal.SIGINT, forward)
+        try:
+            for process in job.processes:
+                process.wait()
+        finally:
+            signal.signal(signal.SIGINT, previous)
+        self.jobs.pop(job.id, None)
+        return job.returncode
+
+class ShellCore:
+    def __init__(self, timeout: Optional[float] = 30):
         self.history_file = Path.home() / ".py_shell_history"
+        self.timeout = timeout
+        self.jobs = JobTable()
         self._setup_logging()
         self._load_history()
 
@@ -22,62 +215,251 @@ class ShellCore:
     def _load_history(self):
         if self.history_file.exists():
             readline.read_history_file(self.history_file)
+        # Entries in the file (those loaded plus those appended since)
+        self._history_entries = readline.get_current_history_length()
+        self._history_saved = self._history_entries
+
+    def save_history(self):
+        """
+        Append the entries added since the last save instead of rewriting the
+        whole file. Once the file holds twice HISTORY_SIZE entries it is
+        rewritten with the last HISTORY_SIZE.
+        """
+        new = readline.get_current_history_length() - self._history_saved
+        if new <= 0:
+            return
+        self._history_saved += new
+        self._history_entries += new
+        if self._history_entries > 2 * HISTORY_SIZE or not hasattr(readline, "append_history_file"):
+            self.compact_history()
+            return
+        self.history_file.touch(exist_ok=True)
+        readline.append_history_file(new, str(self.history_file))
 
-    def execute_command(self, command: List[str]) -> str:
+    def compact_history(self):
+        readline.set_history_length(HISTORY_SIZE)
+        readline.write_history_file(str(self.history_file))
+        readline.set_history_length(-1)
+        self._history_entries = min(readline.get_current_history_length(), HISTORY_SIZE)
+
+    def _spawn(self, stages: List[Stage], input_data: Optional[bytes],
+               background: bool) -> List[Union[subprocess.Popen, int]]:
+        """
+        Start every stage, connecting each stdout to the next stdin with an OS
+        pipe; the data goes from one child to the next without passing through
+        the shell. A stage that cannot start is replaced by its exit status
+        (1 for a redirection that fails, 127 for a command that cannot run)
+        and the next stage reads an empty input.
+        """
+        processes: List[Union[subprocess.Popen, int]] = []
+        previous = None
+        for index, stage in enumerate(stages):
+            opened = []
+            process: Union[subprocess.Popen, int] = 1
+            try:
+                if stage.stdin is not None:
+                    stdin = open(stage.stdin, "rb")
+                    opened.append(stdin)
+                elif index == 0:
+                    stdin = subprocess.PIPE if input_data is not None else (
+                        subprocess.DEVNULL if background else None)
+                else:
+                    stdin = previous
+                if stage.stdout is not None:
+                    stdout = open(stage.stdout, "ab" if stage.append else "wb")
+                    opened.append(stdout)
+                else:
+                    stdout = subprocess.PIPE if index < len(stages) - 1 else None
+                if stage.stderr is not None:
+                    stderr = open(stage.stderr, "ab" if stage.stderr_append else "wb")
+                    opened.append(stderr)
+                else:
+                    stderr = subprocess.STDOUT if stage.stderr_to_stdout else None
+                # From here on, a failure means the command itself cannot run
+                process = 127
+                process = subprocess.Popen(
+                    stage.argv,
+                    stdin=stdin,
+                    stdout=stdout,
+                    stderr=stderr,
+                    start_new_session=background,
+                )
+            except OSError as e:
+                name = e.filename if e.filename is not None else stage.argv[0]
+                logging.error(f"{name}: {e.strerror}")
+            finally:
+                # The children keep their own copies of these descriptors
+                for f in opened:
+                    f.close()
+                if isinstance(previous, io.IOBase):
+                    previous.close()
+            processes.append(process)
+            started = isinstance(process, subprocess.Popen)
+            previous = process.stdout if started and process.stdout else subprocess.DEVNULL
+
+        first = processes[0]
+        if input_data is not None and isinstance(first, subprocess.Popen) and first.stdin is not None:
+            threading.Thread(target=self._feed, args=(first.stdin, input_data), daemon=True).start()
+        return processes
+
+    @staticmethod
+    def _feed(pipe, data: bytes):
+        try:
+            pipe.write(data)
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                pipe.close()
+            except BrokenPipeError:
+                pass
+
+    def execute_pipeline(self, pipeline: Pipeline, line: str = "",
+                         input_data: Optional[bytes] = None) -> List[Optional[int]]:
+        """
+        Run a pipeline and return the exit status of each stage. `input_data`
+        is written to the first stage's stdin. A background pipeline is
+        registered as a job and returns an empty list.
+        """
+        processes = self._spawn(pipeline.stages, input_data, pipeline.background)
+        started = [process for process in processes if isinstance(process, subprocess.Popen)]
+        if pipeline.background:
+            if started:
+                print(self.jobs.add(started, line))
+            return []
+
+        deadline = time.monotonic() + self.timeout if self.timeout else None
         try:
-            subprocess.run(
-                command,
-                check=True,
-                timeout=30
-            )
-        except subprocess.CalledProcessError as e:
-            logging.error(f"Command failed: {e.stderr}")
-            return ""
+            for process in started:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                process.wait(timeout=remaining)
         except subprocess.TimeoutExpired:
-            logging.error("Command timed out")
-            return ""
+            for process in started:
+                if process.poll() is None:
+                    process.kill()
+                process.wait()
+            logging.error("Command timed out (use 'cmd &' to run it in the background)")
+            return [process.returncode if isinstance(process, subprocess.Popen) else process
+                    for process in processes]
+        statuses = [process.returncode if isinstance(process, subprocess.Popen) else process
+                    for process in processes]
+
+        # A stage stopped by SIGPIPE (`yes | head`) just had its reader finish first
+        if any(status and status != -signal.SIGPIPE for status in statuses):
+            if len(statuses) == 1:
+                logging.error(f"Command failed with exit status {describe_status(statuses[0])}")
+            else:
+                logging.error("Pipeline exit status: " + " | ".join(
+                    f"{stage.argv[0]}={describe_status(status)}"
+                    for stage, status in zip(pipeline.stages, statuses)))
+        return statuses
 
 class PyShell:
     BUILTIN_COMMANDS = {
-        "exit": lambda _: exit(0),
-        "history": lambda self: print("\n".join(
-            [str(i+1) + " " + readline.get_history_item(i+1) 
+        "exit": lambda self, args: exit(0),
+        "history": lambda self, args: print("\n".join(
+            [str(i+1) + " " + readline.get_history_item(i+1)
              for i in range(readline.get_current_history_length())])
-        )
+        ),
+        "jobs": lambda self, args: self._jobs(args),
+        "fg": lambda self, args: self._fg(args),
+        "wait": lambda self, args: self._wait(args),
     }
 
-    def __init__(self):
-        self.core = ShellCore()
+    def __init__(self, timeout: Optional[float] = 30):
+        self.core = ShellCore(timeout)
         signal.signal(signal.SIGINT, self._handle_sigint)
 
     def _handle_sigint(self, signum, frame):
         print("\nInterrupt received. Type 'exit' to quit.")
 
-    def _parse_input(self, input_str: str) -> List[str]:
-        return input_str.strip().split()
+    def _parse_input(self, input_str: str) -> Pipeline:
+        return parse_pipeline(input_str.strip())
 
-    def _process_builtin(self, command: List[str]) -> bool:
-        if command[0] in self.BUILTIN_COMMANDS:
-            self.BUILTIN_COMMANDS[command[0]](self)
+    def _process_builtin(self, pipeline: Pipeline, line: str = "") -> bool:
+        """
+        Run a builtin. Its output can be redirected with '>'/'>>' or piped
+        into the rest of the pipeline (e.g. `history | grep git`); `line` is
+        the command line, shown by `jobs` if that rest runs in the background.
+        """
+        first = pipeline.stages[0]
+        if first.argv[0] not in self.BUILTIN_COMMANDS:
+            return False
+        builtin = self.BUILTIN_COMMANDS[first.argv[0]]
+        if first.stderr is not None:
+            # Builtins write nothing to stderr, but the file is created as usual
+            open(first.stderr, "a" if first.stderr_append else "w").close()
+        if len(pipeline.stages) == 1 and first.stdout is None:
+            builtin(self, first.argv[1:])
             return True
-        return False
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            builtin(self, first.argv[1:])
+        if first.stdout is not None:
+            with open(first.stdout, "a" if first.append else "w") as f:
+                f.write(output.getvalue())
+        if len(pipeline.stages) > 1:
+            rest = Pipeline(pipeline.stages[1:], pipeline.background)
+            data = b"" if first.stdout is not None else output.getvalue().encode()
+            self.core.execute_pipeline(rest, line, input_data=data)
+        return True
+
+    def _jobs(self, args: List[str]):
+        for job in self.core.jobs.jobs.values():
+            print(f"{job}  Running")
+
+    def _fg(self, args: List[str]):
+        try:
+            job = self.core.jobs.get(args[0] if args else None)
+        except KeyError as e:
+            print(f"fg: {e.args[0]}")
+            return
+        print(job.line)
+        self.core.jobs.wait(job)
+
+    def _wait(self, args: List[str]):
+        try:
+            jobs = [self.core.jobs.get(spec) for spec in args] or list(self.core.jobs.jobs.values())
+        except KeyError as e:
+            print(f"wait: {e.args[0]}")
+            return
+        for job in jobs:
+            returncode = self.core.jobs.wait(job)
+            print(f"[{job.id}] Done ({describe_status(returncode)}) {job.line}")
+
+    def _report_jobs(self):
+        for job in self.core.jobs.reap():
+            print(f"[{job.id}] Done ({describe_status(job.returncode)}) {job.line}")
 
     def repl(self):
         while True:
             try:
+                self._report_jobs()
                 input_str = input("\033[34mpy-shell>\033[0m ")
-                command = self._parse_input(input_str)
-                
-                if not command:
+                try:
+                    pipeline = self._parse_input(input_str)
+                except ValueError as e:
+                    print(f"py-shell: {e}")
                     continue
-                
-                if self._process_builtin(command):
+
+                if not pipeline.stages[0].argv:
+                    continue
+
+                # Builtins are recorded too; with a terminal, input() may already have added the line
+                last = readline.get_history_item(readline.get_current_history_length())
+                if last != input_str:
+                    readline.add_history(input_str)
+                self.core.save_history()
+
+                try:
+                    if self._process_builtin(pipeline, input_str.strip()):
+                        continue
+                except OSError as e:
+                    logging.error(f"{e.filename}: {e.strerror}")
                     continue
 
-                output = self.core.execute_command(command)
-                
-                readline.add_history(input_str)
-                readline.write_history_file(str(self.core.history_file))
+                self.core.execute_pipeline(pipeline, input_str.strip())
 
             except EOFError:
                 print("\nGoodbye!")
@@ -89,14 +471,19 @@ def main():
         epilog="Example: ./pyshell.py"
     )
     parser.add_argument('--verbose', '-v', action='store_true')
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=30,
+        help="Seconds before a foreground command is stopped; 0 disables it (default 30)"
+    )
     args = parser.parse_args()
 
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
-    shell = PyShell()
+    shell = PyShell(args.timeout or None)
     shell.repl()
 
 if __name__ == "__main__":
     main()
-
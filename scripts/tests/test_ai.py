@@ -0,0 +1,63 @@
+"""Tests for `ai.py make-commit` in batch mode, on temporary git repositories."""
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai import commit_steps, make_commit_batch
+
+
+def git(repo, *args) -> str:
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+
+def commit_args(**overrides) -> argparse.Namespace:
+    args = dict(branch="main", message=None, dry_run=False, concurrency=2,
+                step_timeout=30.0, timeouts=None, log_file=None)
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+class DryRunTest(unittest.TestCase):
+    def setUp(self):
+        self.temporal = tempfile.TemporaryDirectory()
+        self.repos = []
+        for name in ("uno", "dos"):
+            repo = os.path.join(self.temporal.name, name)
+            os.makedirs(repo)
+            git(repo, "init", "-q")
+            # With an identity, a commit step would succeed if it ran
+            git(repo, "config", "user.name", "Test")
+            git(repo, "config", "user.email", "test@example.com")
+            Path(repo, "a.txt").write_text("a\n")
+            git(repo, "add", ".")
+            git(repo, "commit", "-q", "-m", "initial")
+            Path(repo, "a.txt").write_text("b\n")
+            git(repo, "add", ".")
+            self.repos.append(repo)
+
+    def tearDown(self):
+        self.temporal.cleanup()
+
+    def test_dry_run_only_shows_the_diff(self):
+        self.assertEqual([step.command for step in commit_steps(commit_args(dry_run=True))],
+                         [["git", "diff", "--cached"]])
+
+    def test_dry_run_batch_leaves_head_unchanged(self):
+        heads = [git(repo, "rev-parse", "HEAD") for repo in self.repos]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            make_commit_batch(commit_args(dry_run=True), self.repos)
+        self.assertEqual([git(repo, "rev-parse", "HEAD") for repo in self.repos], heads)
+        self.assertIn("+b", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Pruebas de la caché, los lotes y el limitador de `gemini.py`, con `TransporteStub` (sin red)."""
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gemini import GeminiAPI, LimitadorTasa, RespuestaCache, TransporteStub
+
+
+class Reloj:
+    """Reloj manual: `dormir` lo adelanta en lugar de esperar."""
+
+    def __init__(self, ahora: float = 1000.0):
+        self.ahora = ahora
+        self.esperas = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> float:
+        with self._lock:
+            return self.ahora
+
+    def dormir(self, segundos: float):
+        with self._lock:
+            self.esperas.append(segundos)
+
+    def avanzar(self, segundos: float):
+        with self._lock:
+            self.ahora += segundos
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.reloj = Reloj()
+        self.cache = RespuestaCache(":memory:", ttl=60, max_entradas=3, reloj=self.reloj)
+        self.stub = TransporteStub()
+        self.api = GeminiAPI(cache=self.cache, transporte=self.stub)
+
+    def tearDown(self):
+        self.cache.cerrar()
+
+    def test_acierto_y_fallo(self):
+        primera = self.api.generar_texto("hola")
+        segunda = self.api.generar_texto("hola")
+        self.assertEqual(primera, segunda)
+        self.assertEqual(self.stub.llamadas, ["hola"])
+        self.assertEqual((self.cache.aciertos, self.cache.fallos), (1, 1))
+
+    def test_los_parametros_forman_parte_de_la_clave(self):
+        self.api.generar_texto("hola", temperature=0.1)
+        self.api.generar_texto("hola", temperature=0.9)
+        self.assertEqual(len(self.stub.llamadas), 2)
+
+    def test_caducidad(self):
+        self.api.generar_texto("hola")
+        self.reloj.avanzar(59)
+        self.api.generar_texto("hola")
+        self.assertEqual(len(self.stub.llamadas), 1)
+        self.reloj.avanzar(2)
+        self.api.generar_texto("hola")
+        self.assertEqual(len(self.stub.llamadas), 2)
+
+    def test_lru_por_encima_de_max_entradas(self):
+        for prompt in ("a", "b", "c"):
+            self.api.generar_texto(prompt)
+            self.reloj.avanzar(1)
+        # "a" pasa a ser la usada más recientemente; "b" es ahora la más antigua
+        self.api.generar_texto("a")
+        self.reloj.avanzar(1)
+        self.api.generar_texto("d")
+        del self.stub.llamadas[:]
+        for prompt in ("a", "c", "d", "b"):
+            self.api.generar_texto(prompt)
+        self.assertEqual(self.stub.llamadas, ["b"])
+
+    def test_sin_cache(self):
+        self.api.generar_texto("hola")
+        self.api.generar_texto("hola", usar_cache=False)
+        self.assertEqual(len(self.stub.llamadas), 2)
+        self.assertEqual(self.cache.aciertos, 0)
+
+    def test_lote_conserva_el_orden_y_agrupa_repetidos(self):
+        stub = TransporteStub(latencia=0.01)
+        api = GeminiAPI(cache=self.cache, transporte=stub)
+        prompts = ["p3", "p1", "p2", "p1", "p0"]
+        respuestas = api.generar_lote(prompts, max_concurrencia=4)
+        self.assertEqual(respuestas, [f"[gemini-1.5-flash] {p}" for p in prompts])
+        self.assertEqual(sorted(stub.llamadas), ["p0", "p1", "p2", "p3"])
+
+    def test_lote_no_envia_los_prompts_en_cache(self):
+        self.api.generar_texto("p1")
+        self.api.generar_lote(["p1", "p2"])
+        self.assertEqual(self.stub.llamadas, ["p1", "p2"])
+
+
+class LimitadorTest(unittest.TestCase):
+    def test_espaciado(self):
+        reloj = Reloj()
+        limitador = LimitadorTasa(60, reloj=reloj, dormir=reloj.dormir)
+        for _ in range(4):
+            limitador.esperar()
+        self.assertEqual(reloj.esperas, [1.0, 2.0, 3.0])
+
+    def test_sin_espera_tras_un_hueco(self):
+        reloj = Reloj()
+        limitador = LimitadorTasa(60, reloj=reloj, dormir=reloj.dormir)
+        limitador.esperar()
+        reloj.avanzar(5)
+        limitador.esperar()
+        self.assertEqual(reloj.esperas, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
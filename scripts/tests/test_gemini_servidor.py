@@ -0,0 +1,129 @@
+"""
+Pruebas del transporte real (`TransporteSDK`, por REST) contra un servidor
+HTTP falso local, al que se llega con el parámetro `endpoint`. Necesitan
+`google.generativeai`; sin él se saltan.
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import unittest
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gemini import GeminiAPI, RespuestaCache
+
+try:
+    with warnings.catch_warnings():
+        # El paquete avisa al importarse de que está obsoleto
+        warnings.simplefilter("ignore")
+        import google.generativeai  # noqa: F401
+    HAY_SDK = True
+except ImportError:
+    HAY_SDK = False
+
+
+def candidato(texto):
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": texto}]},
+                            "finishReason": "STOP", "index": 0}]}
+
+
+class ServidorFalso(BaseHTTPRequestHandler):
+    """
+    Imita la API REST de Gemini: `generateContent` responde el prompt en
+    mayúsculas y `streamGenerateContent` lo devuelve palabra a palabra. Un
+    prompt "error" responde 400.
+    """
+    peticiones = []
+
+    def log_message(self, *args):
+        pass
+
+    def _enviar(self, cuerpo, estado=200):
+        datos = json.dumps(cuerpo).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        self.peticiones.append(("GET", self.path, self.headers.get("x-goog-api-key")))
+        self._enviar({"models": [{"name": "models/falso-1"}, {"name": "models/falso-2"}]})
+
+    def do_POST(self):
+        cuerpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.peticiones.append(("POST", self.path, self.headers.get("x-goog-api-key")))
+        prompt = cuerpo["contents"][0]["parts"][0]["text"]
+        if prompt == "error":
+            self._enviar({"error": {"code": 400, "message": "prompt no válido",
+                                    "status": "INVALID_ARGUMENT"}}, 400)
+        elif ":streamGenerateContent" in self.path:
+            self._enviar([candidato(palabra + " ") for palabra in prompt.split()])
+        else:
+            self._enviar(candidato(prompt.upper()))
+
+
+@unittest.skipUnless(HAY_SDK, "google.generativeai no está instalado")
+class ServidorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorFalso)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.endpoint = f"http://127.0.0.1:{cls.servidor.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+
+    def setUp(self):
+        del ServidorFalso.peticiones[:]
+        self.cache = RespuestaCache(":memory:")
+        self.api = GeminiAPI(api_key="clave-falsa", cache=self.cache, endpoint=self.endpoint)
+
+    def tearDown(self):
+        self.cache.cerrar()
+
+    def test_generar_y_cache(self):
+        self.assertEqual(self.api.generar_texto("hola mundo"), "HOLA MUNDO")
+        self.assertEqual(self.api.generar_texto("hola mundo"), "HOLA MUNDO")
+        self.assertEqual(len(ServidorFalso.peticiones), 1)
+        metodo, ruta, clave = ServidorFalso.peticiones[0]
+        self.assertEqual(metodo, "POST")
+        self.assertTrue(ruta.startswith("/v1beta/models/gemini-1.5-flash:generateContent"))
+        self.assertEqual(clave, "clave-falsa")
+
+    def test_stream_en_orden(self):
+        self.assertEqual(list(self.api.generar_stream("uno dos tres")), ["uno ", "dos ", "tres "])
+
+    def test_asincrono(self):
+        async def recoger():
+            fragmentos = [fragmento async for fragmento in self.api.astream("a b c")]
+            return fragmentos, await self.api.agenerar_lote(["x", "y", "x"])
+
+        fragmentos, lote = asyncio.run(recoger())
+        self.assertEqual(fragmentos, ["a ", "b ", "c "])
+        self.assertEqual(lote, ["X", "Y", "X"])
+
+    def test_error_del_servidor(self):
+        with self.assertRaises(RuntimeError) as error:
+            self.api.generar_texto("error")
+        self.assertIn("prompt no válido", str(error.exception))
+        with self.assertRaises(RuntimeError):
+            asyncio.run(self.api.agenerar_texto("error"))
+
+    def test_listar_modelos(self):
+        with tempfile.TemporaryDirectory() as temporal:
+            ruta = Path(temporal, "modelos.json")
+            self.assertEqual(self.api.listar_modelos(ruta), ["models/falso-1", "models/falso-2"])
+            self.assertEqual(self.api.listar_modelos(ruta), ["models/falso-1", "models/falso-2"])
+        self.assertEqual([metodo for metodo, _, _ in ServidorFalso.peticiones], ["GET"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""Pruebas del streaming y de la API asíncrona de `gemini.py`, con `TransporteStub`."""
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gemini import GeminiAPI, RespuestaCache, TransporteStub
+
+
+class TransporteRoto(TransporteStub):
+    """Envía `correctos` fragmentos y luego falla."""
+
+    def __init__(self, correctos: int = 2):
+        super().__init__()
+        self.correctos = correctos
+
+    def stream(self, modelo, prompt, **params):
+        fragmentos = list(super().stream(modelo, prompt, **params))
+        yield from fragmentos[:self.correctos]
+        raise ConnectionError("conexión cortada")
+
+    async def astream(self, modelo, prompt, **params):
+        enviados = 0
+        async for fragmento in super().astream(modelo, prompt, **params):
+            if enviados == self.correctos:
+                raise ConnectionError("conexión cortada")
+            enviados += 1
+            yield fragmento
+
+    async def agenerar(self, modelo, prompt, **params):
+        raise ConnectionError("conexión cortada")
+
+
+class TransporteBarrera(TransporteStub):
+    """
+    Las peticiones esperan a que llegue a haber `grupo` en vuelo a la vez
+    antes de responder; si el lote no las lanza a la vez, la espera caduca
+    y falla. Después, el resto responde sin esperar.
+    """
+
+    def __init__(self, grupo: int):
+        super().__init__()
+        self.grupo = grupo
+        self.en_vuelo = 0
+        self.max_en_vuelo = 0
+        self._completo = None
+
+    async def agenerar(self, modelo, prompt, **params):
+        if self._completo is None:
+            self._completo = asyncio.Event()
+        self.en_vuelo += 1
+        self.max_en_vuelo = max(self.max_en_vuelo, self.en_vuelo)
+        if self.en_vuelo == self.grupo:
+            self._completo.set()
+        try:
+            await asyncio.wait_for(self._completo.wait(), 5)
+            return await super().agenerar(modelo, prompt, **params)
+        finally:
+            self.en_vuelo -= 1
+
+
+class StreamTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = RespuestaCache(":memory:")
+        self.stub = TransporteStub()
+        self.api = GeminiAPI(cache=self.cache, transporte=self.stub)
+
+    def tearDown(self):
+        self.cache.cerrar()
+
+    def test_fragmentos_en_orden(self):
+        fragmentos = list(self.api.generar_stream("uno dos tres"))
+        self.assertEqual(fragmentos, ["[gemini-1.5-flash] ", "uno ", "dos ", "tres"])
+        # La respuesta completa queda en la caché y llega en un solo fragmento
+        self.assertEqual(list(self.api.generar_stream("uno dos tres")), ["".join(fragmentos)])
+        self.assertEqual(self.stub.llamadas, ["uno dos tres"])
+
+    def test_stream_interrumpido_no_se_guarda(self):
+        stream = self.api.generar_stream("uno dos tres")
+        next(stream)
+        stream.close()
+        self.assertEqual(len(list(self.api.generar_stream("uno dos tres"))), 4)
+        self.assertEqual(len(self.stub.llamadas), 2)
+
+    def test_error_a_mitad_del_stream(self):
+        api = GeminiAPI(cache=self.cache, transporte=TransporteRoto(correctos=2))
+        recibidos = []
+        with self.assertRaises(RuntimeError) as error:
+            for fragmento in api.generar_stream("uno dos tres"):
+                recibidos.append(fragmento)
+        self.assertEqual(recibidos, ["[gemini-1.5-flash] ", "uno "])
+        self.assertIsInstance(error.exception.__cause__, ConnectionError)
+        # Una respuesta incompleta no llega a la caché
+        self.assertFalse(self.cache.contiene(RespuestaCache.clave("gemini-1.5-flash", "uno dos tres", {})))
+
+
+class AsyncTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = RespuestaCache(":memory:")
+        self.stub = TransporteStub(latencia=0.05)
+        self.api = GeminiAPI(cache=self.cache, transporte=self.stub)
+
+    def tearDown(self):
+        self.cache.cerrar()
+
+    def test_astream_en_orden_y_cache(self):
+        async def recoger():
+            return [fragmento async for fragmento in self.api.astream("a b c")]
+
+        fragmentos = asyncio.run(recoger())
+        self.assertEqual(fragmentos, ["[gemini-1.5-flash] ", "a ", "b ", "c"])
+        self.assertEqual(asyncio.run(self.api.agenerar_texto("a b c")), "".join(fragmentos))
+        self.assertEqual(self.stub.llamadas, ["a b c"])
+
+    def test_cancelacion(self):
+        recibidos = []
+
+        async def consumir():
+            async for fragmento in self.api.astream("uno dos tres cuatro"):
+                recibidos.append(fragmento)
+
+        async def principal():
+            tarea = asyncio.create_task(consumir())
+            while not recibidos:
+                await asyncio.sleep(0.001)
+            tarea.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await tarea
+
+        asyncio.run(principal())
+        self.assertLess(len(recibidos), 5)
+        # Una respuesta incompleta no llega a la caché
+        self.assertFalse(self.cache.contiene(RespuestaCache.clave("gemini-1.5-flash", "uno dos tres cuatro", {})))
+
+    def test_errores_asincronos(self):
+        api = GeminiAPI(transporte=TransporteRoto(correctos=1))
+
+        async def recoger():
+            return [fragmento async for fragmento in api.astream("uno dos")]
+
+        with self.assertRaises(RuntimeError) as error:
+            asyncio.run(recoger())
+        self.assertIsInstance(error.exception.__cause__, ConnectionError)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(api.agenerar_texto("uno"))
+
+    def test_lote_concurrente_en_orden(self):
+        prompts = [f"p{i}" for i in range(10)]
+        stub = TransporteBarrera(len(prompts))
+        api = GeminiAPI(transporte=stub)
+        respuestas = asyncio.run(api.agenerar_lote(prompts, max_concurrencia=10))
+        self.assertEqual(respuestas, [f"[gemini-1.5-flash] {p}" for p in prompts])
+        # Ninguna petición termina hasta que han empezado todas
+        self.assertEqual(stub.max_en_vuelo, len(prompts))
+
+    def test_lote_respeta_max_concurrencia(self):
+        stub = TransporteBarrera(3)
+        api = GeminiAPI(transporte=stub)
+        asyncio.run(api.agenerar_lote([f"p{i}" for i in range(9)], max_concurrencia=3))
+        self.assertEqual(stub.max_en_vuelo, 3)
+        self.assertEqual(len(stub.llamadas), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Prueba del resumen map-reduce de `resumir.py` con un modelo stub, sobre un árbol temporal."""
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gemini import GeminiAPI, RespuestaCache, TransporteStub
+from resumir import extraer_bloques, fusionar, resumir_bloques
+
+
+def resumen_hash(modelo, prompt, params):
+    """Cualquier cambio en el prompt cambia el resumen, así que se propaga por toda la rama."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class ResumirTest(unittest.TestCase):
+    def setUp(self):
+        self.temporal = tempfile.TemporaryDirectory()
+        self.repo = os.path.join(self.temporal.name, "repo")
+        os.makedirs(self.repo)
+        for nombre in ("a.py", "b.py", "c.py", "d.py"):
+            with open(os.path.join(self.repo, nombre), "w", encoding="utf-8") as f:
+                f.write(f"# {nombre}\nprint('{nombre}')\n")
+        self.cache = RespuestaCache(":memory:")
+        self.stub = TransporteStub(resumen_hash)
+        self.api = GeminiAPI(modelo="stub", cache=self.cache, transporte=self.stub)
+
+    def tearDown(self):
+        self.cache.cerrar()
+        self.temporal.cleanup()
+
+    def resumir(self):
+        with redirect_stdout(io.StringIO()):
+            bloques = extraer_bloques(self.repo, por_archivo=True, rules=None)
+        resumenes = resumir_bloques(self.api, bloques)
+        return bloques, fusionar(self.api, resumenes, grupo=2)
+
+    def contar(self):
+        """(aciertos, fallos) desde la última llamada."""
+        actual = (self.cache.aciertos, self.cache.fallos)
+        anterior = getattr(self, "_anterior", (0, 0))
+        self._anterior = actual
+        return actual[0] - anterior[0], actual[1] - anterior[1]
+
+    def test_solo_se_repiten_el_bloque_cambiado_y_su_rama(self):
+        bloques, final = self.resumir()
+        self.assertEqual([nombre for nombre, _ in bloques], ["a.py", "b.py", "c.py", "d.py"])
+        # 4 bloques + 2 fusiones + la fusión final
+        self.assertEqual(self.contar(), (0, 7))
+
+        _, igual = self.resumir()
+        self.assertEqual(igual, final)
+        self.assertEqual(self.contar(), (7, 0))
+
+        with open(os.path.join(self.repo, "c.py"), "a", encoding="utf-8") as f:
+            f.write("print('cambio')\n")
+        _, nuevo = self.resumir()
+        self.assertNotEqual(nuevo, final)
+        # c.py, la fusión (c, d) y la final; a, b, d y la fusión (a, b) vienen de la caché
+        self.assertEqual(self.contar(), (4, 3))
+
+    def test_tocar_un_archivo_no_invalida_su_resumen(self):
+        self.resumir()
+        self.contar()
+        ruta = os.path.join(self.repo, "a.py")
+        os.utime(ruta, (0, 0))
+        self.resumir()
+        self.assertEqual(self.contar(), (7, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""Tests for PyShell: the command-line parser, history compaction and job control."""
+import io
+import os
+import readline
+import signal
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import shell
+from shell import JobTable, PyShell, ShellCore, parse_pipeline
+
+
+class ParseTest(unittest.TestCase):
+    def stage(self, line):
+        pipeline = parse_pipeline(line)
+        self.assertEqual(len(pipeline.stages), 1)
+        return pipeline.stages[0]
+
+    def test_stderr_redirection(self):
+        stage = self.stage("ls /x 2> /dev/null")
+        self.assertEqual(stage.argv, ["ls", "/x"])
+        self.assertIsNone(stage.stdout)
+        self.assertEqual((stage.stderr, stage.stderr_append), ("/dev/null", False))
+
+    def test_stderr_append_and_stdout(self):
+        stage = self.stage("make 2>>err.log >out.log")
+        self.assertEqual(stage.argv, ["make"])
+        self.assertEqual((stage.stdout, stage.append), ("out.log", False))
+        self.assertEqual((stage.stderr, stage.stderr_append), ("err.log", True))
+
+    def test_two_inside_a_word_is_not_an_operator(self):
+        stage = self.stage("echo x2>y")
+        self.assertEqual(stage.argv, ["echo", "x2"])
+        self.assertEqual(stage.stdout, "y")
+        self.assertIsNone(stage.stderr)
+        self.assertEqual(self.stage("echo a 2").argv, ["echo", "a", "2"])
+
+    def test_last_stderr_redirection_wins(self):
+        stage = self.stage("cmd 2> err 2>&1")
+        self.assertTrue(stage.stderr_to_stdout)
+        self.assertIsNone(stage.stderr)
+        stage = self.stage("cmd 2>&1 2> err")
+        self.assertFalse(stage.stderr_to_stdout)
+        self.assertEqual(stage.stderr, "err")
+
+    def test_unsupported_duplications(self):
+        for line in ("cmd >&2", "cmd 2>&2", "cmd >>&1"):
+            with self.assertRaisesRegex(ValueError, "is not supported"):
+                parse_pipeline(line)
+
+    def test_redirection_needs_a_file(self):
+        with self.assertRaisesRegex(ValueError, "needs a file name"):
+            parse_pipeline("cmd 2>")
+
+
+class ShellTestCase(unittest.TestCase):
+    """Runs each test with an empty readline history and a temporary home."""
+
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+        patcher = mock.patch.dict(os.environ, {"HOME": self.home.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.home.cleanup)
+        readline.clear_history()
+        self.addCleanup(readline.clear_history)
+
+
+class HistoryTest(ShellTestCase):
+    def history_lines(self, core):
+        # libedit writes a header line that GNU readline does not
+        return [line for line in core.history_file.read_text().splitlines()
+                if line != "_HiStOrY_V2_"]
+
+    @mock.patch.object(shell, "HISTORY_SIZE", 5)
+    def test_appends_until_twice_the_size_then_compacts(self):
+        core = ShellCore()
+        for i in range(10):
+            readline.add_history(f"cmd {i}")
+            core.save_history()
+        # 10 entries is exactly 2 * HISTORY_SIZE: still appended
+        self.assertEqual(self.history_lines(core), [f"cmd {i}" for i in range(10)])
+
+        readline.add_history("cmd 10")
+        core.save_history()
+        self.assertEqual(self.history_lines(core), [f"cmd {i}" for i in range(6, 11)])
+        # The in-memory history is not truncated
+        self.assertEqual(readline.get_current_history_length(), 11)
+
+    @mock.patch.object(shell, "HISTORY_SIZE", 5)
+    def test_counts_the_entries_loaded_from_the_file(self):
+        core = ShellCore()
+        for i in range(8):
+            readline.add_history(f"old {i}")
+        core.save_history()
+        readline.clear_history()
+
+        core = ShellCore()
+        self.assertEqual(readline.get_current_history_length(), 8)
+        for i in range(3):
+            readline.add_history(f"new {i}")
+            core.save_history()
+        self.assertEqual(self.history_lines(core), ["old 6", "old 7", "new 0", "new 1", "new 2"])
+
+    def test_nothing_new_writes_nothing(self):
+        core = ShellCore()
+        core.save_history()
+        self.assertFalse(core.history_file.exists())
+
+
+class JobTableTest(unittest.TestCase):
+    def setUp(self):
+        self.jobs = JobTable()
+        self.processes = []
+
+    def tearDown(self):
+        for process in self.processes:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+    def start(self, *argv):
+        process = subprocess.Popen(argv, start_new_session=True)
+        self.processes.append(process)
+        return process
+
+    def test_get(self):
+        with self.assertRaisesRegex(KeyError, "no current job"):
+            self.jobs.get()
+        first = self.jobs.add([self.start("true")], "true &")
+        second = self.jobs.add([self.start("true")], "true &")
+        self.assertIs(self.jobs.get(), second)
+        self.assertIs(self.jobs.get("1"), first)
+        self.assertIs(self.jobs.get("%2"), second)
+        with self.assertRaisesRegex(KeyError, "%3: no such job"):
+            self.jobs.get("%3")
+        with self.assertRaisesRegex(KeyError, "x: no such job"):
+            self.jobs.get("x")
+
+    def test_reap_only_finished_jobs(self):
+        running = self.jobs.add([self.start("true"), self.start("sleep", "30")], "true | sleep 30 &")
+        done = self.jobs.add([self.start("sh", "-c", "exit 3")], "sh -c 'exit 3' &")
+        done.processes[0].wait()
+        running.processes[0].wait()
+        self.assertEqual(self.jobs.reap(), [done])
+        self.assertEqual(done.returncode, 3)
+        self.assertEqual(list(self.jobs.jobs), [running.id])
+
+    def test_wait(self):
+        job = self.jobs.add([self.start("sh", "-c", "sleep 0.1; exit 4")], "sh &")
+        previous = signal.getsignal(signal.SIGINT)
+        self.assertEqual(self.jobs.wait(job), 4)
+        self.assertEqual(self.jobs.jobs, {})
+        # The SIGINT handler is restored
+        self.assertIs(signal.getsignal(signal.SIGINT), previous)
+
+
+class PipelineTest(ShellTestCase):
+    def test_foreground_timeout_kills_the_pipeline(self):
+        core = ShellCore(timeout=0.2)
+        with self.assertLogs(level="ERROR") as logs:
+            statuses = core.execute_pipeline(parse_pipeline("sleep 30 | sleep 30"))
+        self.assertEqual(statuses, [-signal.SIGKILL, -signal.SIGKILL])
+        self.assertIn("timed out", logs.output[0])
+
+    def test_background_builtin_pipeline_keeps_its_line(self):
+        previous = signal.getsignal(signal.SIGINT)
+        self.addCleanup(signal.signal, signal.SIGINT, previous)
+        py_shell = PyShell()
+        output = os.path.join(self.home.name, "out")
+        line = f"history | cat > {output} &"
+        readline.add_history(line)
+        with redirect_stdout(io.StringIO()) as printed:
+            self.assertTrue(py_shell._process_builtin(parse_pipeline(line), line))
+        job = py_shell.core.jobs.get()
+        self.assertEqual(job.line, line)
+        self.assertIn(line, printed.getvalue())
+        py_shell.core.jobs.wait(job)
+        self.assertEqual(Path(output).read_text(), f"1 {line}\n")
+
+
+if __name__ == "__main__":
+    unittest.main()